@@ -0,0 +1,48 @@
+"""add duplicate_candidates table
+
+Revision ID: f2g3h4i5j6k7
+Revises: e1f2g3h4i5j6
+Create Date: 2025-10-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2g3h4i5j6k7"
+down_revision = "e1f2g3h4i5j6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Likely-duplicate pairs found by the on-write dedupe index
+    op.create_table(
+        "duplicate_candidates",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("id_a", sa.Integer(), nullable=False),
+        sa.Column("id_b", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("block", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(), server_default="pending", nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint("table_name", "id_a", "id_b", name="uq_duplicate_candidates_pair"),
+    )
+    op.create_index("ix_duplicate_candidates_id", "duplicate_candidates", ["id"])
+    op.create_index("ix_duplicate_candidates_table_name", "duplicate_candidates", ["table_name"])
+    op.create_index("ix_duplicate_candidates_id_a", "duplicate_candidates", ["id_a"])
+    op.create_index("ix_duplicate_candidates_id_b", "duplicate_candidates", ["id_b"])
+    op.create_index("ix_duplicate_candidates_block", "duplicate_candidates", ["block"])
+    op.create_index("ix_duplicate_candidates_status", "duplicate_candidates", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_duplicate_candidates_status", table_name="duplicate_candidates")
+    op.drop_index("ix_duplicate_candidates_block", table_name="duplicate_candidates")
+    op.drop_index("ix_duplicate_candidates_id_b", table_name="duplicate_candidates")
+    op.drop_index("ix_duplicate_candidates_id_a", table_name="duplicate_candidates")
+    op.drop_index("ix_duplicate_candidates_table_name", table_name="duplicate_candidates")
+    op.drop_index("ix_duplicate_candidates_id", table_name="duplicate_candidates")
+    op.drop_table("duplicate_candidates")
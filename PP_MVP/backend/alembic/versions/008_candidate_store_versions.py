@@ -0,0 +1,35 @@
+"""version duplicate_candidates and index them for keyset paging
+
+Revision ID: g3h4i5j6k7l8
+Revises: f2g3h4i5j6k7
+Create Date: 2025-10-21
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "g3h4i5j6k7l8"
+down_revision = "f2g3h4i5j6k7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Normalizer version the score was computed with (stale when behind)
+    op.add_column('duplicate_candidates', sa.Column('normalizer_version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('duplicate_candidates', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    
+    # Keyset pagination: ORDER BY score DESC, id within a table/status
+    op.create_index(
+        'ix_duplicate_candidates_page',
+        'duplicate_candidates',
+        ['table_name', 'status', 'score', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_duplicate_candidates_page', table_name='duplicate_candidates')
+    op.drop_column('duplicate_candidates', 'updated_at')
+    op.drop_column('duplicate_candidates', 'normalizer_version')
@@ -0,0 +1,27 @@
+"""track normalizer version of stored wine norms
+
+Revision ID: h4i5j6k7l8m9
+Revises: g3h4i5j6k7l8
+Create Date: 2025-10-22
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "h4i5j6k7l8m9"
+down_revision = "g3h4i5j6k7l8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NORMALIZER_VERSION the norm_* columns were built with (NULL = never/unknown)
+    op.add_column('wines', sa.Column('norm_version', sa.Integer(), nullable=True))
+    op.add_column('scraped_wines', sa.Column('norm_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scraped_wines', 'norm_version')
+    op.drop_column('wines', 'norm_version')
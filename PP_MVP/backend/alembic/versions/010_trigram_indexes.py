@@ -0,0 +1,46 @@
+"""pg_trgm GIN indexes for the similar-wines lookup
+
+Revision ID: i5j6k7l8m9n0
+Revises: h4i5j6k7l8m9
+Create Date: 2025-10-22
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "i5j6k7l8m9n0"
+down_revision = "h4i5j6k7l8m9"
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('wines', 'scraped_wines')
+COLUMNS = ('norm_producer', 'norm_cuvee')
+
+
+def upgrade() -> None:
+    # Trigram indexes are PostgreSQL-only (SQLite uses the in-memory index)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    
+    for table in TABLES:
+        for column in COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for table in TABLES:
+        for column in COLUMNS:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
@@ -0,0 +1,28 @@
+"""change-only product snapshots: last_seen_at range
+
+Revision ID: j6k7l8m9n0o1
+Revises: i5j6k7l8m9n0
+Create Date: 2025-10-23
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "j6k7l8m9n0o1"
+down_revision = "i5j6k7l8m9n0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Last scrape that saw the same price/stock/title as this snapshot
+    op.add_column('product_snapshots', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+    
+    # Existing rows were each seen exactly once
+    op.execute('UPDATE product_snapshots SET last_seen_at = fetched_at')
+
+
+def downgrade() -> None:
+    op.drop_column('product_snapshots', 'last_seen_at')
@@ -0,0 +1,40 @@
+"""raw HTML archive index
+
+Revision ID: k7l8m9n0o1p2
+Revises: j6k7l8m9n0o1
+Create Date: 2025-10-23
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "k7l8m9n0o1p2"
+down_revision = "j6k7l8m9n0o1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'archived_pages',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('source_id', sa.Integer(), sa.ForeignKey('sources.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False, server_default='product'),
+        sa.Column('digest', sa.String(40), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.UniqueConstraint('source_id', 'url', 'fetched_at', name='uq_archived_pages_key'),
+    )
+    op.create_index('ix_archived_pages_id', 'archived_pages', ['id'])
+    op.create_index('ix_archived_pages_source_id', 'archived_pages', ['source_id'])
+    op.create_index('ix_archived_pages_digest', 'archived_pages', ['digest'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_archived_pages_digest', table_name='archived_pages')
+    op.drop_index('ix_archived_pages_source_id', table_name='archived_pages')
+    op.drop_index('ix_archived_pages_id', table_name='archived_pages')
+    op.drop_table('archived_pages')
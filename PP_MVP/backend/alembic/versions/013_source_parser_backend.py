@@ -0,0 +1,24 @@
+"""per-source HTML parser backend
+
+Revision ID: l8m9n0o1p2q3
+Revises: k7l8m9n0o1p2
+Create Date: 2025-10-24
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "l8m9n0o1p2q3"
+down_revision = "k7l8m9n0o1p2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sources', sa.Column('parser_backend', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sources', 'parser_backend')
@@ -0,0 +1,24 @@
+"""per-source scrape strategy (HTML or JSON catalog)
+
+Revision ID: m9n0o1p2q3r4
+Revises: l8m9n0o1p2q3
+Create Date: 2025-10-25
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "m9n0o1p2q3r4"
+down_revision = "l8m9n0o1p2q3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sources', sa.Column('scrape_strategy', sa.String(), nullable=False, server_default='html'))
+
+
+def downgrade() -> None:
+    op.drop_column('sources', 'scrape_strategy')
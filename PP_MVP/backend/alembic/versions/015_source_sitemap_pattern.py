@@ -0,0 +1,24 @@
+"""sitemap discovery: per-source product URL pattern
+
+Revision ID: n0o1p2q3r4s5
+Revises: m9n0o1p2q3r4
+Create Date: 2025-10-26
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "n0o1p2q3r4s5"
+down_revision = "m9n0o1p2q3r4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sources', sa.Column('sitemap_url_pattern', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sources', 'sitemap_url_pattern')
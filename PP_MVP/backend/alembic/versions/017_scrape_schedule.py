@@ -0,0 +1,36 @@
+"""scheduled scrapes: source interval/priority, jobs.source_id
+
+Revision ID: p2q3r4s5t6u7
+Revises: o1p2q3r4s5t6
+Create Date: 2025-10-28
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "p2q3r4s5t6u7"
+down_revision = "o1p2q3r4s5t6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sources', sa.Column('scrape_interval_minutes', sa.Integer(), nullable=True))
+    op.add_column('sources', sa.Column('scrape_priority', sa.Integer(), nullable=False, server_default='0'))
+
+    op.add_column('jobs', sa.Column('source_id', sa.Integer(), nullable=True))
+    op.create_index('ix_jobs_source_id', 'jobs', ['source_id'])
+    # Backfill from params for jobs queued before the column existed
+    op.execute(
+        "UPDATE jobs SET source_id = CAST(params ->> 'source_id' AS INTEGER) "
+        "WHERE params ->> 'source_id' IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_source_id', table_name='jobs')
+    op.drop_column('jobs', 'source_id')
+    op.drop_column('sources', 'scrape_priority')
+    op.drop_column('sources', 'scrape_interval_minutes')
@@ -0,0 +1,40 @@
+"""crawl frontier
+
+Revision ID: q3r4s5t6u7v8
+Revises: p2q3r4s5t6u7
+Create Date: 2025-10-29
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "q3r4s5t6u7v8"
+down_revision = "p2q3r4s5t6u7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'crawl_frontier',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('source_id', sa.Integer(), sa.ForeignKey('sources.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False, server_default='product'),
+        sa.Column('depth', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('state', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_eligible_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('discovered_at', sa.DateTime(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('source_id', 'url', name='uq_crawl_frontier_url'),
+    )
+    op.create_index('ix_crawl_frontier_pending', 'crawl_frontier', ['source_id', 'state', 'next_eligible_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_crawl_frontier_pending', table_name='crawl_frontier')
+    op.drop_table('crawl_frontier')
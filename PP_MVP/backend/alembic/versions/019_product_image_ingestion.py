@@ -0,0 +1,28 @@
+"""product image ingestion: thumb_url, fetched_at, error
+
+Revision ID: r4s5t6u7v8w9
+Revises: q3r4s5t6u7v8
+Create Date: 2025-10-30
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "r4s5t6u7v8w9"
+down_revision = "q3r4s5t6u7v8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('product_images', sa.Column('thumb_url', sa.String(), nullable=True))
+    op.add_column('product_images', sa.Column('fetched_at', sa.DateTime(), nullable=True))
+    op.add_column('product_images', sa.Column('error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('product_images', 'error')
+    op.drop_column('product_images', 'fetched_at')
+    op.drop_column('product_images', 'thumb_url')
@@ -0,0 +1,23 @@
+"""latest snapshot index: product_snapshots (product_id, id)
+
+Revision ID: s5t6u7v8w9x0
+Revises: r4s5t6u7v8w9
+Create Date: 2025-10-31
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "s5t6u7v8w9x0"
+down_revision = "r4s5t6u7v8w9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_product_snapshots_latest', 'product_snapshots', ['product_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_snapshots_latest', table_name='product_snapshots')
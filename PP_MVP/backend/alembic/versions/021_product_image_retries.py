@@ -0,0 +1,28 @@
+"""product image retries: attempts, next_attempt_at
+
+Revision ID: t6u7v8w9x0y1
+Revises: s5t6u7v8w9x0
+Create Date: 2025-11-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "t6u7v8w9x0y1"
+down_revision = "s5t6u7v8w9x0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('product_images', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('product_images', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    # Errors so far included transient ones (timeouts, 5xx): retry every failed image once
+    op.execute("UPDATE product_images SET error = NULL WHERE stored_url IS NULL AND error IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('product_images', 'next_attempt_at')
+    op.drop_column('product_images', 'attempts')
@@ -5,23 +5,41 @@ These endpoints are admin-only for managing duplicate wines.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal
 from app.api.endpoints.scraper import require_admin
 from app.models.wine import Wine
 from app.models.scraper import ScrapedWine
+from app.models.dedupe import DedupeCandidate
 from app.services.dedupe import (
     normalize_and_block,
     find_duplicate_candidates,
     cluster_duplicates,
     select_master_wine,
     merge_duplicates,
+    merge_clusters,
     normalize_text,
-    create_blocking_key
+    create_blocking_key,
+    iter_blocks,
+    describe_wine
 )
+from app.services.dedupe_store import (
+    CANDIDATE_STATUSES,
+    refresh_candidate_store,
+    page_candidates,
+    load_wine_labels
+)
+from app.services.blocking import (
+    BLOCKERS,
+    make_blockers,
+    load_active_wines,
+    find_candidates_multi,
+    block_stats
+)
+from app.services.similar import find_similar_wines
 from app.services.wine_parser import parse_wine_name
 
 
@@ -46,6 +64,30 @@ class DuplicateCandidatesResponse(BaseModel):
     candidates: List[DuplicateCandidate]
 
 
+class StoredCandidate(BaseModel):
+    """Duplicate pair from the persistent candidate store."""
+    id: int
+    wine1_id: int
+    wine2_id: int
+    similarity_score: float
+    wine1_name: str
+    wine2_name: str
+    block: Optional[str] = None
+    status: str
+
+
+class StoredCandidatesPage(BaseModel):
+    """One keyset page of stored candidates (pass next_* to get the next page)."""
+    candidates: List[StoredCandidate]
+    next_after_score: Optional[float] = None
+    next_after_id: Optional[int] = None
+
+
+class CandidateStatusUpdate(BaseModel):
+    """Review decision for a stored candidate."""
+    status: str
+
+
 class MergeRequest(BaseModel):
     """Request to merge duplicates."""
     wine_ids: List[int]
@@ -59,6 +101,33 @@ class MergeResponse(BaseModel):
     merged_ids: List[int]
 
 
+class BatchMergeRequest(BaseModel):
+    """Request to merge many duplicate clusters at once."""
+    clusters: List[MergeRequest]
+
+
+class BatchMergeResponse(BaseModel):
+    """Counts after a batch merge."""
+    clusters: int
+    merged_count: int
+    missing_count: int
+
+
+class SimilarWine(BaseModel):
+    """A wine returned by the similar-wines lookup."""
+    id: int
+    producer: Optional[str]
+    cuvee: Optional[str]
+    vintage: Optional[str]
+    score: float
+
+
+class SimilarWinesResponse(BaseModel):
+    """Top-k similar wines for a query."""
+    table: str
+    results: List[SimilarWine]
+
+
 class ParseWineRequest(BaseModel):
     """Request to parse a wine name."""
     raw_name: str
@@ -93,11 +162,13 @@ def normalize_wines(
     
     # For MVP, run synchronously
     # In production, use Celery/background task
-    normalize_and_block(db, model_class, batch_size=500)
+    stats = normalize_and_block(db, model_class, batch_size=500)
     
     return {
         "message": f"Normalized {table} successfully",
-        "table": table
+        "table": table,
+        "processed": stats["processed"],
+        "updated": stats["updated"]
     }
 
 
@@ -106,6 +177,9 @@ def find_duplicates(
     table: str = Query("wines", regex="^(wines|scraped_wines)$"),
     threshold: float = Query(87.5, ge=0, le=100),
     limit: int = Query(100, ge=1, le=1000),
+    method: str = Query("loop", regex="^(loop|matrix)$"),
+    workers: int = Query(1, ge=-1, le=32),
+    blocking: Optional[str] = Query(None, description="Comma-separated blockers, e.g. first_word,minhash"),
     db: Session = Depends(get_db),
     current_user=Depends(require_admin),
 ):
@@ -113,59 +187,58 @@ def find_duplicates(
     Find duplicate wine candidates (admin only).
     
     Returns pairs of wines that are likely duplicates.
+    Use method=matrix for large blocks (vectorized rapidfuzz scoring,
+    `workers` threads, -1 = all cores). Pass `blocking` to union candidate
+    pairs from several blockers instead of scanning dedupe_block only.
     """
     model_class = Wine if table == "wines" else ScrapedWine
     
-    # Get all blocking keys
-    blocks = db.query(model_class.dedupe_block).filter(
-        model_class.is_active == True,
-        model_class.dedupe_block.isnot(None)
-    ).distinct().limit(50).all()  # Limit blocks for performance
-    
     all_candidates = []
     
-    for (block_key,) in blocks:
-        # Get wines in this block
-        wines = db.query(model_class).filter(
-            model_class.dedupe_block == block_key,
-            model_class.is_active == True
-        ).all()
+    if blocking:
+        blockers = _parse_blockers(blocking)
+        wine_dicts = load_active_wines(db, model_class)
+        wines_by_id = {w["id"]: w for w in wine_dicts}
         
-        if len(wines) < 2:
-            continue
+        for wine1_id, wine2_id, score, blocker_name in find_candidates_multi(
+            wine_dicts, blockers, threshold, workers=workers
+        )[:limit]:
+            all_candidates.append(DuplicateCandidate(
+                wine1_id=wine1_id,
+                wine2_id=wine2_id,
+                similarity_score=round(score, 2),
+                wine1_name=describe_wine(wines_by_id[wine1_id]),
+                wine2_name=describe_wine(wines_by_id[wine2_id]),
+                block=blocker_name
+            ))
         
-        # Convert to dicts
-        wine_dicts = []
-        for wine in wines:
-            wine_dicts.append({
-                "id": wine.id,
-                "norm_producer": wine.norm_producer,
-                "norm_cuvee": wine.norm_cuvee,
-                "vintage": wine.vintage,
-                "producer": wine.producer,
-                "cuvee": wine.cuvee or getattr(wine, 'name', None)
-            })
+        return DuplicateCandidatesResponse(
+            total=len(all_candidates),
+            candidates=all_candidates
+        )
+    
+    # One streamed query for all blocks (no per-block round trips)
+    for block_key, wine_dicts in iter_blocks(db, model_class):
+        block_candidates = find_duplicate_candidates(
+            wine_dicts, threshold, method=method, workers=workers
+        )
+        
+        if not block_candidates:
+            continue
         
-        # Find candidates
-        block_candidates = find_duplicate_candidates(wine_dicts, threshold)
+        wines_by_id = {w["id"]: w for w in wine_dicts}
         
         # Convert to response format
         for wine1_id, wine2_id, score in block_candidates:
             if len(all_candidates) >= limit:
                 break
             
-            wine1 = next(w for w in wines if w.id == wine1_id)
-            wine2 = next(w for w in wines if w.id == wine2_id)
-            
-            wine1_name = f"{wine1.producer or 'Unknown'} - {wine1.cuvee or getattr(wine1, 'name', 'N/A')} ({wine1.vintage or 'NV'})"
-            wine2_name = f"{wine2.producer or 'Unknown'} - {wine2.cuvee or getattr(wine2, 'name', 'N/A')} ({wine2.vintage or 'NV'})"
-            
             all_candidates.append(DuplicateCandidate(
                 wine1_id=wine1_id,
                 wine2_id=wine2_id,
                 similarity_score=round(score, 2),
-                wine1_name=wine1_name,
-                wine2_name=wine2_name,
+                wine1_name=describe_wine(wines_by_id[wine1_id]),
+                wine2_name=describe_wine(wines_by_id[wine2_id]),
                 block=block_key
             ))
         
@@ -178,6 +251,199 @@ def find_duplicates(
     )
 
 
+@router.get("/similar", response_model=SimilarWinesResponse)
+def similar_wines(
+    producer: Optional[str] = Query(None, description="Producer name"),
+    cuvee: Optional[str] = Query(None, description="Cuvee/wine name (or full label)"),
+    vintage: Optional[str] = Query(None, description="Only match this vintage"),
+    table: str = Query("wines", regex="^(wines|scraped_wines)$"),
+    limit: int = Query(10, ge=1, le=100),
+    min_score: float = Query(60.0, ge=0, le=100),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """
+    Find the wines most similar to a producer/cuvee/vintage (admin only).
+    
+    Uses trigram indexes instead of a block scan, so it is fast enough to
+    call at insert time.
+    """
+    if not (producer or cuvee):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide producer and/or cuvee"
+        )
+    
+    model_class = Wine if table == "wines" else ScrapedWine
+    
+    results = find_similar_wines(
+        db, model_class, producer, cuvee, vintage, limit=limit, min_score=min_score
+    )
+    
+    return SimilarWinesResponse(
+        table=table,
+        results=[SimilarWine(**result) for result in results]
+    )
+
+
+@router.get("/blocking-stats")
+def get_blocking_stats(
+    table: str = Query("wines", regex="^(wines|scraped_wines)$"),
+    blocking: str = Query("first_word,minhash,sorted_neighbourhood"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """
+    Block-size and candidate-pair statistics per blocker (admin only).
+    
+    Use to tune recall against cost before switching blockers on.
+    """
+    model_class = Wine if table == "wines" else ScrapedWine
+    blockers = _parse_blockers(blocking)
+    
+    stats = block_stats(load_active_wines(db, model_class), blockers)
+    stats["table"] = table
+    return stats
+
+
+def _parse_blockers(blocking: str) -> list:
+    """Build blockers from a comma-separated list of names (400 on unknown names)."""
+    try:
+        return make_blockers(name.strip() for name in blocking.split(",") if name.strip())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{e}. Available: {', '.join(BLOCKERS)}"
+        )
+
+
+def run_candidate_refresh(table: str, threshold: float, method: str):
+    """Background task: refresh the candidate store with its own DB session."""
+    model_class = Wine if table == "wines" else ScrapedWine
+    db = SessionLocal()
+    try:
+        stats = refresh_candidate_store(db, model_class, threshold, method=method)
+        print(f"Candidate store refreshed for {table}: {stats}")
+    except Exception as e:
+        db.rollback()
+        print(f"Candidate store refresh failed for {table}: {e}")
+    finally:
+        db.close()
+
+
+@router.post("/candidates/refresh", status_code=status.HTTP_202_ACCEPTED)
+def refresh_candidates(
+    background_tasks: BackgroundTasks,
+    table: str = Query("wines", regex="^(wines|scraped_wines)$"),
+    threshold: float = Query(87.5, ge=0, le=100),
+    method: str = Query("loop", regex="^(loop|matrix)$"),
+    current_user=Depends(require_admin),
+):
+    """
+    Rebuild the persistent candidate store in the background (admin only).
+    
+    Stored pairs are only rescored when their normalizer version is stale.
+    """
+    background_tasks.add_task(run_candidate_refresh, table, threshold, method)
+    
+    return {
+        "message": f"Candidate refresh started for {table}",
+        "table": table
+    }
+
+
+@router.get("/candidates", response_model=StoredCandidatesPage)
+def list_stored_candidates(
+    table: str = Query("wines", regex="^(wines|scraped_wines)$"),
+    candidate_status: str = Query("pending", alias="status", regex="^(pending|merged|rejected)$"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    block: Optional[str] = None,
+    after_score: Optional[float] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """
+    Page through stored duplicate candidates, highest score first (admin only).
+    
+    Keyset pagination: pass next_after_score/next_after_id from the previous
+    page as after_score/after_id.
+    """
+    model_class = Wine if table == "wines" else ScrapedWine
+    
+    rows, cursor = page_candidates(
+        db, table,
+        status=candidate_status,
+        min_score=min_score,
+        block=block,
+        after_score=after_score,
+        after_id=after_id,
+        limit=limit
+    )
+    
+    labels = load_wine_labels(
+        db, model_class, {row.id_a for row in rows} | {row.id_b for row in rows}
+    )
+    
+    return StoredCandidatesPage(
+        candidates=[
+            StoredCandidate(
+                id=row.id,
+                wine1_id=row.id_a,
+                wine2_id=row.id_b,
+                similarity_score=row.score,
+                wine1_name=labels.get(row.id_a, "N/A"),
+                wine2_name=labels.get(row.id_b, "N/A"),
+                block=row.block,
+                status=row.status
+            )
+            for row in rows
+        ],
+        next_after_score=cursor[0] if cursor else None,
+        next_after_id=cursor[1] if cursor else None
+    )
+
+
+@router.patch("/candidates/{candidate_id}", response_model=StoredCandidate)
+def update_candidate_status(
+    candidate_id: int,
+    payload: CandidateStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """Record a review decision (pending/rejected/merged) for a stored candidate (admin only)."""
+    if payload.status not in CANDIDATE_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status must be pending, merged or rejected"
+        )
+    
+    candidate = db.query(DedupeCandidate).filter(DedupeCandidate.id == candidate_id).first()
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    candidate.status = payload.status
+    db.commit()
+    
+    model_class = Wine if candidate.table_name == "wines" else ScrapedWine
+    labels = load_wine_labels(db, model_class, [candidate.id_a, candidate.id_b])
+    
+    return StoredCandidate(
+        id=candidate.id,
+        wine1_id=candidate.id_a,
+        wine2_id=candidate.id_b,
+        similarity_score=candidate.score,
+        wine1_name=labels.get(candidate.id_a, "N/A"),
+        wine2_name=labels.get(candidate.id_b, "N/A"),
+        block=candidate.block,
+        status=candidate.status
+    )
+
+
 @router.post("/merge", response_model=MergeResponse)
 def merge_duplicate_wines(
     payload: MergeRequest,
@@ -232,6 +498,58 @@ def merge_duplicate_wines(
     )
 
 
+@router.post("/merge-batch", response_model=BatchMergeResponse)
+def merge_duplicate_clusters(
+    payload: BatchMergeRequest,
+    table: str = Query("wines", regex="^(wines|scraped_wines)$"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """
+    Merge many duplicate clusters in one transaction (admin only).
+    
+    Masters are auto-selected from one bulk fetch unless given per cluster.
+    Wines that no longer exist are skipped and reported as missing.
+    """
+    seen = set()
+    masters = {}
+    
+    for index, cluster in enumerate(payload.clusters):
+        if len(set(cluster.wine_ids)) < 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cluster {index} needs at least 2 wines to merge"
+            )
+        if seen.intersection(cluster.wine_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cluster {index} shares wines with an earlier cluster"
+            )
+        if cluster.master_id:
+            if cluster.master_id not in cluster.wine_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Master ID of cluster {index} must be in its wine_ids list"
+                )
+            masters[index] = cluster.master_id
+        seen.update(cluster.wine_ids)
+    
+    model_class = Wine if table == "wines" else ScrapedWine
+    
+    result = merge_clusters(
+        db,
+        model_class,
+        [cluster.wine_ids for cluster in payload.clusters],
+        masters=masters
+    )
+    
+    return BatchMergeResponse(
+        clusters=result["clusters"],
+        merged_count=result["merged"],
+        missing_count=result["missing"]
+    )
+
+
 @router.post("/parse-wine", response_model=ParseWineResponse)
 async def parse_wine(
     payload: ParseWineRequest,
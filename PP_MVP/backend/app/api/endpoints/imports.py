@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.wine import Wine
 from app.schemas.wine import ImportResponse
+from app.services.dedupe_index import index_new_wines
 
 router = APIRouter()
 
@@ -48,6 +49,7 @@ async def import_csv(
     # Import rows
     imported_count = 0
     errors = []
+    new_wines = []
     
     for idx, row in df.iterrows():
         try:
@@ -65,12 +67,15 @@ async def import_csv(
                 notes=str(row['notes']).strip() if pd.notna(row.get('notes')) else None,
             )
             db.add(wine)
+            new_wines.append(wine)
             imported_count += 1
         except Exception as e:
             errors.append(f"Row {idx + 2}: {str(e)}")
     
-    # Commit all changes
+    # Commit all changes (flagging likely duplicates against existing wines)
     try:
+        db.flush()
+        index_new_wines(db, Wine, new_wines)
         db.commit()
     except Exception as e:
         db.rollback()
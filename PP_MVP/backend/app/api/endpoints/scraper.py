@@ -4,15 +4,15 @@ Admin endpoints for wine scraper management.
 These endpoints are admin-only for managing scraper sources and running scrape jobs.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-import uuid
-from datetime import datetime
+import re
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
-from app.models.scraper import Source, ScrapedWine, Product, ProductSnapshot
+from app.models.job import Job
+from app.models.scraper import Source, ScrapedWine, Product
 from app.models.user import User
 from app.schemas.scraper import (
     SourceCreate,
@@ -20,13 +20,16 @@ from app.schemas.scraper import (
     SourceResponse,
     ScrapedWineResponse,
     ProductResponse,
+    ProductWithSnapshotResponse,
+    PricePoint,
     ScrapeJobRequest,
     ScrapeJobResponse,
     DetectSelectorsRequest,
     DetectSelectorsResponse,
 )
-from app.services.scraper_service import WineScraperService
+from app.services.job_queue import enqueue_job, get_job, list_jobs
 from app.services.selector_detector import SelectorDetectorService
+from app.services.snapshots import price_history, with_latest_snapshot
 
 
 router = APIRouter()
@@ -52,6 +55,19 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
 
 # ===== Source Management =====
 
+def _validate_sitemap_pattern(pattern: Optional[str]) -> None:
+    """400 if a source's sitemap_url_pattern is not a valid regex."""
+    if not pattern:
+        return
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sitemap_url_pattern: {str(e)}"
+        )
+
+
 @router.post("/sources", response_model=SourceResponse, status_code=status.HTTP_201_CREATED)
 def create_source(
     payload: SourceCreate,
@@ -67,6 +83,8 @@ def create_source(
             detail=f"Source with URL {payload.base_url} already exists"
         )
 
+    _validate_sitemap_pattern(payload.sitemap_url_pattern)
+
     source = Source(**payload.model_dump())
     db.add(source)
     db.commit()
@@ -117,6 +135,8 @@ def update_source(
             detail="Source not found"
         )
 
+    _validate_sitemap_pattern(payload.sitemap_url_pattern)
+
     update_data = payload.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(source, field, value)
@@ -147,42 +167,38 @@ def delete_source(
 
 # ===== Scraper Jobs =====
 
-# In-memory job tracking (for MVP - use Redis/DB for production)
-_active_jobs = {}
-
-
-async def run_scrape_job(job_id: str, source_id: int, max_pages: int, db: Session):
-    """Background task to run scrape job."""
-    job = _active_jobs[job_id]
-    job["status"] = "running"
-
-    try:
-        scraper = WineScraperService(db)
-        stats = await scraper.scrape_source(source_id, max_pages)
-
-        job["status"] = "completed"
-        job["products_found"] = stats.get("products_found", 0)
-        job["wines_created"] = stats.get("wines_created", 0)
-        job["snapshots_created"] = stats.get("snapshots_created", 0)
-        job["completed_at"] = datetime.utcnow()
-
-        if stats.get("errors"):
-            job["error"] = "; ".join(stats["errors"][:5])  # First 5 errors
-
-    except Exception as e:
-        job["status"] = "failed"
-        job["error"] = str(e)
-        job["completed_at"] = datetime.utcnow()
+def _job_response(job: Job) -> ScrapeJobResponse:
+    """API view of a job row (final counters once finished, live progress before)."""
+    counters = job.result or job.progress or {}
+    http_cache = counters.get("http_cache") or {}
+    return ScrapeJobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        source_id=(job.params or {}).get("source_id"),
+        status=job.status,
+        products_found=counters.get("products_found", 0),
+        wines_created=counters.get("wines_created", 0),
+        snapshots_created=counters.get("snapshots_created", 0),
+        strategy=counters.get("strategy"),
+        cache_hit_rate=http_cache.get("hit_rate"),
+        bytes_saved=http_cache.get("bytes_saved"),
+        progress=job.progress,
+        attempts=job.attempts or 0,
+        error=job.error,
+        queued_at=job.created_at,
+        started_at=job.started_at,
+        heartbeat_at=job.heartbeat_at,
+        completed_at=job.completed_at,
+    )
 
 
 @router.post("/scrape", response_model=ScrapeJobResponse)
-async def start_scrape_job(
+def start_scrape_job(
     payload: ScrapeJobRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    """Start a scrape job for a source (admin only)."""
+    """Queue a scrape job for a source; a worker (python -m app.worker) runs it (admin only)."""
     # Verify source exists
     source = db.query(Source).filter(Source.id == payload.source_id).first()
     if not source:
@@ -197,40 +213,41 @@ async def start_scrape_job(
             detail="Source is disabled"
         )
 
-    # Create job
-    job_id = str(uuid.uuid4())
-    job_data = {
-        "job_id": job_id,
+    job = enqueue_job(db, "scrape", {
         "source_id": payload.source_id,
-        "status": "started",
-        "products_found": 0,
-        "wines_created": 0,
-        "snapshots_created": 0,
-        "error": None,
-        "started_at": datetime.utcnow(),
-        "completed_at": None,
-    }
-    _active_jobs[job_id] = job_data
+        "max_pages": payload.max_pages,
+        "concurrency": payload.concurrency,
+    })
+    return _job_response(job)
 
-    # Start background task
-    background_tasks.add_task(run_scrape_job, job_id, payload.source_id, payload.max_pages, db)
 
-    return ScrapeJobResponse(**job_data)
+@router.get("/jobs", response_model=List[ScrapeJobResponse])
+def list_job_statuses(
+    kind: Optional[str] = None,
+    job_status: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """List recent scrape/parse/image jobs, newest first (admin only)."""
+    return [_job_response(job) for job in list_jobs(db, kind=kind, status=job_status, limit=min(limit, 500))]
 
 
 @router.get("/jobs/{job_id}", response_model=ScrapeJobResponse)
 def get_job_status(
     job_id: str,
+    db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    """Get status of a scrape job (admin only)."""
-    if job_id not in _active_jobs:
+    """Get status of a scrape or parse job (admin only)."""
+    job = get_job(db, job_id)
+    if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
 
-    return ScrapeJobResponse(**_active_jobs[job_id])
+    return _job_response(job)
 
 
 # ===== Browse Scraped Data =====
@@ -256,7 +273,7 @@ def list_scraped_wines(
     return wines
 
 
-@router.get("/products", response_model=List[ProductResponse])
+@router.get("/products", response_model=List[ProductWithSnapshotResponse])
 def list_products(
     skip: int = 0,
     limit: int = 100,
@@ -264,14 +281,36 @@ def list_products(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    """List scraped products (admin only)."""
+    """List scraped products with their latest snapshot (admin only)."""
     query = db.query(Product)
 
     if source_id:
         query = query.filter(Product.source_id == source_id)
 
-    products = query.offset(skip).limit(limit).all()
-    return products
+    rows = with_latest_snapshot(query.order_by(Product.id)).offset(skip).limit(limit).all()
+    return [
+        ProductWithSnapshotResponse(
+            **ProductResponse.model_validate(product).model_dump(),
+            latest_snapshot=snapshot,
+        )
+        for product, snapshot in rows
+    ]
+
+
+@router.get("/products/{product_id}/price-history", response_model=List[PricePoint])
+def get_price_history(
+    product_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """Price and stock series of a product, oldest first (admin only)."""
+    if not db.query(Product.id).filter(Product.id == product_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+
+    return price_history(db, product_id)
 
 
 # ===== AI Selector Detection =====
@@ -301,21 +340,25 @@ async def test_selectors(
     """Test CSS selectors on a page without running a full scrape (admin only)."""
     try:
         import httpx
-        from bs4 import BeautifulSoup
+        from app.services.html_parser import parse_html
+        from app.services.rate_limit import make_rate_limited_transport
         
         url = payload.get("url")
         product_selector = payload.get("product_link_selector", "")
         pagination_selector = payload.get("pagination_next_selector", "")
+        parser_backend = payload.get("parser_backend")
         
         # Fetch page
-        async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
+        async with httpx.AsyncClient(
+            follow_redirects=True, timeout=15.0, transport=make_rate_limited_transport()
+        ) as client:
             headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
             response = await client.get(url, headers=headers)
             response.raise_for_status()
             html = response.text
         
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
+        # Parse the way the scraper parses listing pages
+        soup = parse_html(html, parser_backend, only=[product_selector, pagination_selector])
         
         # Test product selector
         product_count = 0
@@ -363,126 +406,45 @@ async def test_selectors(
 # ===== AI Wine Parsing =====
 
 @router.post("/parse-products")
-async def parse_products(
-    background_tasks: BackgroundTasks,
+def parse_products(
     source_id: int = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
     """
-    Trigger AI parsing of scraped products into structured wine entries (admin only).
+    Queue AI parsing of scraped products into structured wine entries (admin only).
     
-    Runs as a background task. Processes products that don't have associated wines yet.
+    A worker (python -m app.worker) processes products that don't have
+    associated wines yet; poll /scraper/jobs/{job_id} for progress.
     """
-    from app.services.wine_parser import parse_wine_name
-    
-    # Create a parsing job in the background
-    job_id = str(uuid.uuid4())
-    job_data = {
-        "job_id": job_id,
-        "status": "started",
-        "products_processed": 0,
-        "wines_created": 0,
-        "errors": [],
-        "started_at": datetime.utcnow(),
-        "completed_at": None,
+    job = enqueue_job(db, "parse", {"source_id": source_id})
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "message": "Wine parsing queued for a background worker"
     }
-    _active_jobs[f"parse_{job_id}"] = job_data
-    
-    async def run_parsing():
-        """Background task to parse products into wines."""
-        try:
-            # Query products that don't have associated scraped wines yet
-            query = db.query(Product).filter(
-                Product.wine_id.is_(None),  # No wine associated yet
-                Product.title_raw.isnot(None),
-                Product.title_raw != '',
-                # Filter out junk collection pages
-                Product.title_raw != 'Collection:Wine',
-                Product.title_raw != 'Wine',
-                Product.title_raw != 'Sparkling',
-                Product.title_raw != 'Champagne',
-                Product.title_raw != 'Pink',
-                Product.title_raw != 'Orange',
-                Product.title_raw != 'White',
-                Product.title_raw != 'Red',
-                Product.title_raw != 'Unicorn Wines',
-                Product.title_raw != 'Staff Favorites',
-                Product.title_raw != 'Merch + Lifestyle',
-                Product.title_raw != 'Gifts'
-            )
-            
-            if source_id:
-                query = query.filter(Product.source_id == source_id)
-            
-            # Get products with valid wine titles
-            products = query.all()
-            
-            job_data["status"] = "running"
-            processed = 0
-            created = 0
-            
-            for product in products:
-                try:
-                    # Get latest snapshot for pricing info
-                    snapshot = db.query(ProductSnapshot).filter(
-                        ProductSnapshot.product_id == product.id
-                    ).order_by(ProductSnapshot.fetched_at.desc()).first()
-                    
-                    # Parse wine name with AI
-                    parsed = await parse_wine_name(product.title_raw)
-                    
-                    # Create ScrapedWine entry
-                    wine = ScrapedWine(
-                        producer=parsed.get("producer"),
-                        cuvee=parsed.get("cuvee") or parsed.get("producer"),  # Fallback to producer if no cuvee
-                        vintage=str(parsed.get("vintage")) if parsed.get("vintage") else "NV",
-                        region=parsed.get("region"),
-                        appellation=parsed.get("appellation"),
-                        volume_ml=parsed.get("bottle_size_ml", 750),
-                        style=parsed.get("style"),
-                        created_at=datetime.utcnow()
-                    )
-                    
-                    db.add(wine)
-                    db.flush()
-                    
-                    # Link product to wine
-                    product.wine_id = wine.id
-                    
-                    created += 1
-                    processed += 1
-                    
-                    # Commit every 10 wines to avoid losing progress
-                    if created % 10 == 0:
-                        db.commit()
-                        
-                except Exception as e:
-                    job_data["errors"].append(f"Product {product.id}: {str(e)}")
-                    processed += 1
-                    continue
-            
-            # Final commit
-            db.commit()
-            
-            job_data["status"] = "completed"
-            job_data["products_processed"] = processed
-            job_data["wines_created"] = created
-            job_data["completed_at"] = datetime.utcnow()
-            
-        except Exception as e:
-            job_data["status"] = "failed"
-            job_data["error"] = str(e)
-            job_data["completed_at"] = datetime.utcnow()
-            db.rollback()
-    
-    # Start background task
-    background_tasks.add_task(run_parsing)
+
+
+@router.post("/images")
+def ingest_product_images(
+    source_id: int = None,
+    limit: int = 1000,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """
+    Queue download and thumbnailing of pending product images (admin only).
     
+    A worker stores our own copies (see app/services/image_pipeline.py) so
+    the frontend can use stored_url / thumb_url instead of retailer URLs.
+    """
+    job = enqueue_job(db, "images", {"source_id": source_id, "limit": max(1, min(limit, 10000))})
+
     return {
-        "job_id": job_id,
-        "status": "started",
-        "message": "Wine parsing started in background"
+        "job_id": job.id,
+        "status": job.status,
+        "message": "Image ingestion queued for a background worker"
     }
 
 
@@ -44,6 +44,37 @@ class Settings(BaseSettings):
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_S3_BUCKET: str = ""
+    AWS_S3_PUBLIC_URL: str = ""  # CDN/base URL of the bucket (default: https://<bucket>.s3.amazonaws.com)
+    
+    # Scraper
+    SCRAPER_SNAPSHOT_MODE: str = "changes"  # "changes" (new row only when price/stock/title change) or "append"
+    HTTP_CACHE_ENABLED: bool = True  # Conditional GETs (ETag/Last-Modified) for scraper fetches
+    HTTP_CACHE_DIR: str = ".cache/http"
+    HTTP_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # LRU-evicted above this (compressed size)
+    HTML_ARCHIVE_ENABLED: bool = False  # Keep raw pages for offline re-parsing (no retention: grows unbounded)
+    HTML_ARCHIVE_DIR: str = ".cache/html_archive"
+    RATE_LIMIT_DEFAULT_RPS: float = 2.0  # Starting requests/second per retailer host
+    RATE_LIMIT_MIN_RPS: float = 0.1  # Floor after repeated 429/503 backoffs
+    RATE_LIMIT_MAX_RPS: float = 8.0  # Ramp-up ceiling (robots.txt Crawl-delay may lower it)
+    RATE_LIMIT_BURST: int = 4
+    RATE_LIMIT_RESPECT_ROBOTS: bool = True  # Read Crawl-delay from robots.txt
+    
+    # Product images (python -m app.worker, "images" jobs)
+    IMAGE_STORAGE: str = "local"  # "local" (IMAGE_STORAGE_DIR served at IMAGE_BASE_URL) or "s3" (AWS_S3_BUCKET)
+    IMAGE_STORAGE_DIR: str = "media/images"
+    IMAGE_BASE_URL: str = "/media/images"
+    IMAGE_THUMBNAIL_SIZE: int = 400  # Square thumbnail edge in pixels
+    IMAGE_CONCURRENCY: int = 8  # Downloads in flight
+    IMAGE_PROCESS_WORKERS: int = 0  # Thumbnail processes (0 = one per CPU)
+    
+    # Background jobs (python -m app.worker)
+    JOB_LEASE_SECONDS: int = 120  # A job is reclaimed if its worker misses heartbeats this long
+    JOB_HEARTBEAT_SECONDS: int = 20
+    JOB_POLL_SECONDS: float = 2.0  # Idle worker poll interval
+    SCHEDULER_TICK_SECONDS: float = 30.0  # How often python -m app.scheduler looks for due sources
+    SCHEDULER_MAX_ACTIVE_SCRAPES: int = 4  # Queued + running scrape jobs allowed at once
+    SCHEDULER_JITTER_FRACTION: float = 0.1  # Per-source offset, as a fraction of its interval
+    SCHEDULER_MAX_PAGES: int = 5
     
     # Azure Document Intelligence (OCR)
     AZURE_DOC_INTEL_ENDPOINT: str = ""
@@ -8,6 +8,11 @@ from app.models.wine import Wine  # noqa
 from app.models.password_reset import PasswordReset  # noqa
 from app.models.ocr_feedback import OcrFeedback  # noqa
 from app.models.tasting_note import TastingNote  # noqa
-from app.models.scraper import Source, ScrapedWine, Product, ProductSnapshot, ProductImage  # noqa
+from app.models.scraper import Source, ScrapedWine, Product, ProductSnapshot, ProductImage, ArchivedPage, CrawlFrontierEntry  # noqa
 from app.models.merchant import Merchant  # noqa
+from app.models.dedupe import DedupeCandidate  # noqa
+from app.models.job import Job  # noqa
+
+# Register write-path listeners that keep dedupe columns up to date
+import app.services.dedupe_index  # noqa
 
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 import json
 import os
 from app.core.config import settings
@@ -51,6 +52,11 @@ app.include_router(scraper.router, prefix=f"{settings.API_V1_STR}/scraper", tags
 app.include_router(dedupe_admin.router, prefix=f"{settings.API_V1_STR}/dedupe", tags=["dedupe"])
 app.include_router(sync.router, prefix=f"{settings.API_V1_STR}/sync", tags=["sync"])
 
+# Ingested product images (local storage; with S3 they are served by the bucket/CDN)
+if settings.IMAGE_STORAGE == "local" and settings.IMAGE_BASE_URL.startswith("/"):
+    os.makedirs(settings.IMAGE_STORAGE_DIR, exist_ok=True)
+    app.mount(settings.IMAGE_BASE_URL, StaticFiles(directory=settings.IMAGE_STORAGE_DIR), name="images")
+
 
 @app.get("/")
 def root():
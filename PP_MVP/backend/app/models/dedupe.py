@@ -0,0 +1,36 @@
+"""
+SQLAlchemy model for stored duplicate-wine candidates.
+
+Rows are written by the on-write dedupe index (new wines scored against their
+block) and by the candidate-store refresh job, then paged, reviewed and merged
+by admins. A row is stale once its normalizer_version falls behind
+NORMALIZER_VERSION; pending rows are dropped when a member wine changes.
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class DedupeCandidate(Base):
+    """Likely-duplicate pair of wines (id_a < id_b) within one table."""
+    __tablename__ = "duplicate_candidates"
+    __table_args__ = (
+        UniqueConstraint("table_name", "id_a", "id_b", name="uq_duplicate_candidates_pair"),
+        # Keyset pagination: WHERE table_name/status ... ORDER BY score DESC, id
+        Index("ix_duplicate_candidates_page", "table_name", "status", "score", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    table_name = Column(String, nullable=False, index=True)  # "wines" or "scraped_wines"
+    id_a = Column(Integer, nullable=False, index=True)  # Lower wine ID of the pair
+    id_b = Column(Integer, nullable=False, index=True)  # Higher wine ID of the pair
+    score = Column(Float, nullable=False)  # Similarity score (0-100)
+    block = Column(Text, nullable=True, index=True)  # Blocking key both wines share
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, merged, rejected
+    normalizer_version = Column(Integer, nullable=False, default=1)  # NORMALIZER_VERSION the score was computed with
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DedupeCandidate(table={self.table_name}, id_a={self.id_a}, id_b={self.id_b}, score={self.score})>"
@@ -0,0 +1,41 @@
+"""
+SQLAlchemy model for background jobs (scrape and parse).
+
+Jobs are queued by the API and run by `python -m app.worker` processes. A
+worker claims a queued job with SELECT ... FOR UPDATE SKIP LOCKED and holds a
+lease it renews with heartbeats; a job whose lease expires (worker died) is
+claimed again until max_attempts is reached.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Job(Base):
+    """Queued, running or finished background job."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim query: WHERE status ... ORDER BY created_at
+        Index("ix_jobs_status_created", "status", "created_at"),
+    )
+
+    id = Column(String(36), primary_key=True)  # UUID, returned to API clients as job_id
+    kind = Column(String, nullable=False, index=True)  # "scrape", "parse" or "images"
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    params = Column(JSON, nullable=False, default=dict)  # Handler arguments (source_id, max_pages, ...)
+    source_id = Column(Integer, nullable=True, index=True)  # Copy of params["source_id"] (scheduler lookups)
+    progress = Column(JSON, nullable=True)  # Live counters, updated with each heartbeat
+    result = Column(JSON, nullable=True)  # Final counters
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    locked_by = Column(String, nullable=True)  # Worker ID holding the lease
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
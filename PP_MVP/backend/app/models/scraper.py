@@ -7,10 +7,12 @@ Tables:
 - products: Specific product listings from sources
 - product_snapshots: Price/availability history
 - product_images: Product images
+- archived_pages: Raw HTML fetched by the scraper (bodies live on disk)
+- crawl_frontier: Per-source queue of listing/product URLs of the current crawl
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -26,7 +28,12 @@ class Source(Base):
     product_link_selector = Column(String, nullable=True)
     pagination_next_selector = Column(String, nullable=True)
     use_playwright = Column(Boolean, default=False)
+    parser_backend = Column(String, nullable=True)  # "html.parser", "lxml" or "selectolax" (None = default)
+    scrape_strategy = Column(String, nullable=False, default="html", server_default="html")  # "html", "sitemap", "auto", "shopify" or "woocommerce"
+    sitemap_url_pattern = Column(String, nullable=True)  # Regex selecting product URLs in sitemaps
     enabled = Column(Boolean, default=True)
+    scrape_interval_minutes = Column(Integer, nullable=True)  # Scheduled scrape interval (None = manual only)
+    scrape_priority = Column(Integer, nullable=False, default=0, server_default="0")  # Higher runs first when due
     last_run_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -56,6 +63,7 @@ class ScrapedWine(Base):
     norm_producer = Column(Text, nullable=True, index=True)  # Normalized producer name
     norm_cuvee = Column(Text, nullable=True)  # Normalized cuvee/wine name
     dedupe_block = Column(Text, nullable=True, index=True)  # Blocking key for dedupe
+    norm_version = Column(Integer, nullable=True)  # NORMALIZER_VERSION the norm_* columns were built with
     is_active = Column(Boolean, default=True, nullable=False, index=True)  # False if duplicate
     duplicate_of = Column(Integer, ForeignKey("scraped_wines.id", ondelete="SET NULL"), nullable=True, index=True)  # Points to master wine if duplicate
 
@@ -89,10 +97,15 @@ class Product(Base):
 class ProductSnapshot(Base):
     """Price and availability snapshot for a product at a specific time."""
     __tablename__ = "product_snapshots"
+    __table_args__ = (
+        # Latest snapshot per product (max id): one backward index probe each
+        Index("ix_product_snapshots_latest", "product_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
-    fetched_at = Column(DateTime, server_default=func.now(), index=True)
+    fetched_at = Column(DateTime, server_default=func.now(), index=True)  # First seen with these values
+    last_seen_at = Column(DateTime, nullable=True)  # Last scrape that saw the same price/stock/title
     price_cents = Column(Integer)  # Store as cents to avoid float issues
     currency = Column(String, default="USD")
     in_stock = Column(Boolean)
@@ -111,11 +124,53 @@ class ProductImage(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
     src_url = Column(String)
-    stored_url = Column(String)  # S3/CDN URL if stored
+    stored_url = Column(String)  # Our copy (see app/services/image_storage.py); None until ingested
+    thumb_url = Column(String)  # Fixed-size thumbnail of stored_url
     sha1 = Column(String, index=True)  # For deduplication
     width = Column(Integer)
     height = Column(Integer)
+    fetched_at = Column(DateTime, nullable=True)  # Last ingestion attempt
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")  # Transient failures so far
+    next_attempt_at = Column(DateTime, nullable=True)  # Retry backoff after a transient failure
+    error = Column(Text, nullable=True)  # Why ingestion failed for good (not retried)
 
     # Relationships
     product = relationship("Product", back_populates="images")
 
+
+class ArchivedPage(Base):
+    """A fetched page in the raw HTML archive (body stored on disk by content hash)."""
+    __tablename__ = "archived_pages"
+    __table_args__ = (
+        UniqueConstraint("source_id", "url", "fetched_at", name="uq_archived_pages_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    source_id = Column(Integer, ForeignKey("sources.id", ondelete="CASCADE"), nullable=False, index=True)
+    url = Column(String, nullable=False)
+    fetched_at = Column(DateTime, nullable=False)
+    kind = Column(String, nullable=False, default="product")  # "listing" or "product"
+    digest = Column(String(40), nullable=False, index=True)  # sha1 of the body
+    size = Column(Integer)  # Uncompressed body size in bytes
+
+
+class CrawlFrontierEntry(Base):
+    """A canonical URL queued, fetched or failed in a source's current crawl."""
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (
+        UniqueConstraint("source_id", "url", name="uq_crawl_frontier_url"),
+        # Next-batch query: WHERE source_id AND state ... ORDER BY ...
+        Index("ix_crawl_frontier_pending", "source_id", "state", "next_eligible_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_id = Column(Integer, ForeignKey("sources.id", ondelete="CASCADE"), nullable=False)
+    url = Column(String, nullable=False)  # Canonical (see app.services.frontier.canonicalize_url)
+    kind = Column(String, nullable=False, default="product")  # "listing" or "product"
+    depth = Column(Integer, nullable=False, default=0)  # Listing page number - 1 it was found on
+    state = Column(String, nullable=False, default="queued")  # queued, fetched or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_eligible_at = Column(DateTime, nullable=True)  # Retry backoff (None = now)
+    last_error = Column(Text, nullable=True)
+    discovered_at = Column(DateTime, nullable=False)
+    fetched_at = Column(DateTime, nullable=True)
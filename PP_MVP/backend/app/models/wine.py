@@ -26,6 +26,7 @@ class Wine(Base):
     norm_producer = Column(Text, nullable=True, index=True)  # Normalized producer name
     norm_cuvee = Column(Text, nullable=True)  # Normalized cuvee/wine name
     dedupe_block = Column(Text, nullable=True, index=True)  # Blocking key for dedupe
+    norm_version = Column(Integer, nullable=True)  # NORMALIZER_VERSION the norm_* columns were built with
     is_active = Column(Boolean, default=True, nullable=False, index=True)  # False if duplicate
     duplicate_of = Column(Integer, ForeignKey("wines.id", ondelete="SET NULL"), nullable=True, index=True)  # Points to master wine if duplicate
     
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Recurring scrape scheduler process.
+
+Every SCHEDULER_TICK_SECONDS, queues scrape jobs for sources whose
+scrape_interval_minutes has elapsed (see app/services/scheduler.py); workers
+(python -m app.worker) run them. Run a single scheduler process.
+
+Usage:
+  python -m app.scheduler
+
+  # Show what would be queued now, without queuing
+  python -m app.scheduler --dry-run
+
+  # Run one tick, then exit (e.g. from cron)
+  python -m app.scheduler --once
+"""
+
+import argparse
+import signal
+import time
+
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.scheduler import make_scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Queue scrapes for sources that are due')
+    parser.add_argument('--once', action='store_true',
+                        help='Run one tick, then exit')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='List due sources without queuing jobs')
+
+    args = parser.parse_args()
+    scheduler = make_scheduler()
+
+    if args.dry_run:
+        db = SessionLocal()
+        try:
+            due = scheduler.due_sources(db)
+            print(f"🗓️  {len(due)} sources due (cap {scheduler.max_active} active scrapes)")
+            for source, due_at in due:
+                print(f"  [{source.scrape_priority}] {source.name} (due {due_at:%Y-%m-%d %H:%M})")
+        finally:
+            db.close()
+        return
+
+    stopping = []
+
+    def request_stop(signum, frame):
+        print(f"🛑 Signal {signum}: exiting")
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    print(f"🗓️  Scheduler checking for due sources every {settings.SCHEDULER_TICK_SECONDS:g}s")
+
+    while not stopping:
+        db = SessionLocal()
+        try:
+            jobs = scheduler.tick(db)
+            for job in jobs:
+                if job.source_id:
+                    print(f"➕ Queued {job.kind} job {job.id} for source {job.source_id}")
+                else:
+                    print(f"➕ Queued {job.kind} job {job.id}")
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Scheduler tick failed: {e}")
+        finally:
+            db.close()
+
+        if args.once:
+            break
+
+        # Sleep in short steps so signals stop the loop promptly
+        deadline = time.monotonic() + settings.SCHEDULER_TICK_SECONDS
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(min(1.0, deadline - time.monotonic()))
+
+
+if __name__ == "__main__":
+    main()
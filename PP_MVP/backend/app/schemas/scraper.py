@@ -1,8 +1,15 @@
 """Pydantic schemas for wine scraper system."""
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
+
+
+# HTML parser backends a source can use (see app/services/html_parser.py)
+ParserBackend = Literal["html.parser", "lxml", "selectolax"]
+
+# How a source is scraped (see app/services/catalog_api.py and sitemaps.py)
+ScrapeStrategy = Literal["html", "sitemap", "auto", "shopify", "woocommerce"]
 
 
 # ===== Source Schemas =====
@@ -12,6 +19,11 @@ class SourceBase(BaseModel):
     product_link_selector: Optional[str] = None
     pagination_next_selector: Optional[str] = None
     use_playwright: bool = False
+    parser_backend: Optional[ParserBackend] = None  # None = default backend
+    scrape_strategy: ScrapeStrategy = "html"  # JSON catalog strategies fall back to HTML
+    sitemap_url_pattern: Optional[str] = None  # Regex for product URLs (sitemap strategy)
+    scrape_interval_minutes: Optional[int] = Field(None, ge=5)  # None = scraped only on demand
+    scrape_priority: int = 0  # Higher is scheduled first
     enabled: bool = True
 
 
@@ -25,6 +37,11 @@ class SourceUpdate(BaseModel):
     product_link_selector: Optional[str] = None
     pagination_next_selector: Optional[str] = None
     use_playwright: Optional[bool] = None
+    parser_backend: Optional[ParserBackend] = None
+    scrape_strategy: Optional[ScrapeStrategy] = None
+    sitemap_url_pattern: Optional[str] = None
+    scrape_interval_minutes: Optional[int] = Field(None, ge=5)
+    scrape_priority: Optional[int] = None
     enabled: Optional[bool] = None
 
 
@@ -102,14 +119,27 @@ class ProductSnapshotResponse(ProductSnapshotBase):
     id: int
     product_id: int
     fetched_at: datetime
+    last_seen_at: Optional[datetime] = None
 
     model_config = {"from_attributes": True}
 
 
+class ProductWithSnapshotResponse(ProductResponse):
+    latest_snapshot: Optional[ProductSnapshotResponse] = None  # Current price/stock
+
+
+class PricePoint(BaseModel):
+    at: datetime
+    price_cents: Optional[int] = None
+    currency: Optional[str] = None
+    in_stock: Optional[bool] = None
+
+
 # ===== Product Image Schemas =====
 class ProductImageBase(BaseModel):
     src_url: Optional[str] = None
     stored_url: Optional[str] = None
+    thumb_url: Optional[str] = None
     sha1: Optional[str] = None
     width: Optional[int] = None
     height: Optional[int] = None
@@ -130,18 +160,27 @@ class ProductImageResponse(ProductImageBase):
 class ScrapeJobRequest(BaseModel):
     source_id: int
     max_pages: int = 5
+    concurrency: int = Field(8, ge=1, le=32)  # Product pages fetched in parallel
     force: bool = False  # Force run even if recently run
 
 
 class ScrapeJobResponse(BaseModel):
     job_id: str
-    source_id: int
-    status: str  # "started", "running", "completed", "failed"
+    kind: str = "scrape"  # "scrape", "parse" or "images"
+    source_id: Optional[int] = None
+    status: str  # "queued", "running", "completed", "failed"
     products_found: int = 0
     wines_created: int = 0
     snapshots_created: int = 0
+    strategy: Optional[str] = None  # "html", "sitemap", "shopify" or "woocommerce" (what actually ran)
+    cache_hit_rate: Optional[float] = None  # Share of fetches answered 304 Not Modified
+    bytes_saved: Optional[int] = None  # Body bytes not downloaded thanks to the HTTP cache
+    progress: Optional[Dict[str, Any]] = None  # Live counters from the worker's heartbeats
+    attempts: int = 0
     error: Optional[str] = None
-    started_at: datetime
+    queued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
 
@@ -156,6 +195,7 @@ class DetectSelectorsResponse(BaseModel):
     product_link_selector: Optional[str] = None
     pagination_next_selector: Optional[str] = None
     requires_playwright: bool = False
+    suggested_strategy: Optional[str] = None  # "shopify"/"woocommerce" when the JSON catalog can be used
     confidence: str  # "high", "medium", "low"
     notes: Optional[str] = None
 
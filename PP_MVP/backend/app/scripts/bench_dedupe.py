@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark for dedupe block scoring: pairwise loop vs. rapidfuzz cdist matrix.
+
+Builds synthetic blocks that look like our big real ones ("chateau_2015",
+"domaine_nv"): many distinct producers sharing a first word, plus near-duplicate
+spellings (typos, dropped words, swapped order) of a subset of them.
+
+Usage:
+  python -m app.scripts.bench_dedupe
+  python -m app.scripts.bench_dedupe --sizes 250,1000,3000 --threads -1
+"""
+
+import argparse
+import random
+import time
+from typing import List, Dict
+
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
+from app.services.dedupe import find_duplicate_candidates, normalize_text
+
+
+FIRST_WORDS = ["chateau", "domaine", "bodega"]
+NAME_WORDS = [
+    "la", "le", "les", "de", "du", "saint", "mont", "roche", "pierre", "fontaine",
+    "bois", "vigne", "clos", "haut", "grand", "petit", "belle", "vue", "rouge",
+    "blanc", "cote", "val", "moulin", "tour", "croix", "puy", "roc", "pins",
+]
+CUVEE_WORDS = [
+    "reserve", "cuvee", "vieilles", "vignes", "tradition", "prestige", "selection",
+    "grand", "vin", "rouge", "blanc", "brut", "nature", "rose", "premier", "cru",
+]
+
+
+def _mutate(text: str, rng: random.Random) -> str:
+    """Return a near-duplicate spelling of text."""
+    words = text.split()
+    choice = rng.random()
+    if choice < 0.4 and len(words) > 1:
+        # Typo: drop one character from a random word
+        i = rng.randrange(len(words))
+        if len(words[i]) > 3:
+            pos = rng.randrange(len(words[i]))
+            words[i] = words[i][:pos] + words[i][pos + 1:]
+    elif choice < 0.7 and len(words) > 2:
+        # Drop a word
+        del words[rng.randrange(1, len(words))]
+    else:
+        # Swap two words
+        i, j = rng.randrange(len(words)), rng.randrange(len(words))
+        words[i], words[j] = words[j], words[i]
+    return " ".join(words)
+
+
+def build_block(size: int, seed: int = 42, duplicate_rate: float = 0.3) -> List[Dict]:
+    """Build a synthetic single-block list of wine dicts."""
+    rng = random.Random(seed)
+    first_word = rng.choice(FIRST_WORDS)
+    wines = []
+
+    while len(wines) < size:
+        producer = " ".join([first_word] + rng.sample(NAME_WORDS, rng.randint(1, 3)))
+        cuvee = " ".join(rng.sample(CUVEE_WORDS, rng.randint(1, 3)))
+        variants = [(producer, cuvee)]
+        if rng.random() < duplicate_rate:
+            variants.append((_mutate(producer, rng), _mutate(cuvee, rng)))
+
+        for variant_producer, variant_cuvee in variants:
+            wines.append({
+                "id": len(wines) + 1,
+                "norm_producer": normalize_text(variant_producer),
+                "norm_cuvee": normalize_text(variant_cuvee),
+                "vintage": "2015",
+            })
+
+    return wines[:size]
+
+
+def _time(func, repeat: int) -> float:
+    """Best-of-N wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes: List[int], threshold: float, threads: int, repeat: int):
+    """Time both scoring methods on each block size and check they agree."""
+    print(f"{'size':>6} {'pairs':>10} {'loop (s)':>10} {'matrix (s)':>11} {'speedup':>8} {'hits':>7}  match")
+    print("-" * 66)
+
+    for size in sizes:
+        wines = build_block(size)
+        pairs = size * (size - 1) // 2
+
+        loop_result = find_duplicate_candidates(wines, threshold, method="loop")
+        matrix_result = find_duplicate_candidates(
+            wines, threshold, method="matrix", workers=threads
+        )
+
+        loop_time = _time(
+            lambda: find_duplicate_candidates(wines, threshold, method="loop"), repeat
+        )
+        matrix_time = _time(
+            lambda: find_duplicate_candidates(
+                wines, threshold, method="matrix", workers=threads
+            ),
+            repeat,
+        )
+
+        print(
+            f"{size:>6} {pairs:>10} {loop_time:>10.3f} {matrix_time:>11.3f} "
+            f"{loop_time / matrix_time:>7.1f}x {len(loop_result):>7}  "
+            f"{'✅' if loop_result == matrix_result else '❌'}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dedupe block scoring')
+    parser.add_argument('--sizes', type=str, default='100,500,1500',
+                        help='Comma-separated block sizes (default: 100,500,1500)')
+    parser.add_argument('--threshold', type=float, default=87.5,
+                        help='Similarity threshold (default: 87.5)')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Threads for matrix scoring (-1 = all cores, default: 1)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per measurement, best is reported (default: 3)')
+
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    print("=" * 66)
+    print("⏱️  DEDUPE SCORING BENCHMARK")
+    print("=" * 66)
+    run_benchmark(sizes, args.threshold, args.threads, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
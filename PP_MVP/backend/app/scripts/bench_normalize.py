@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for wine name normalization.
+
+Times the shared normalizer (app.utils.normalize) with and without its LRU
+cache against the two implementations it replaced, over a synthetic corpus
+that looks like our catalog: a limited set of producers repeated across many
+cuvées and vintages, with accents, apostrophes, quotes and hyphens.
+
+Usage:
+  python -m app.scripts.bench_normalize
+  python -m app.scripts.bench_normalize --names 200000 --producers 5000 --repeat 5
+"""
+
+import argparse
+import random
+import re
+import time
+import unicodedata
+from typing import Callable, List
+
+from app.utils import normalize
+
+
+PRODUCER_PREFIXES = [
+    "Château", "Domaine", "Bodegas", "Weingut", "Cantina", "Tenuta", "Maison",
+    "Quinta", "Clos", "Mas", "Celler", "Schloss", "Azienda Agricola",
+]
+PRODUCER_WORDS = [
+    "d'Yquem", "Léoville-Las Cases", "Müller-Catoir", "Raventós", "Gatinois",
+    "de la Romanée-Conti", "Dönnhoff", "Ca' del Bosc", "Vega Sicilia", "Pétrus",
+    "l'Église-Clinet", "Señorío", "Prüm", "Lafon", "Huët", "Coche-Dury",
+    "Schäfer-Fröhlich", "Roagna", "Fèlsina", "Niepoort", "Mascarello", "Ostertag",
+]
+CUVEE_WORDS = [
+    "Grand Cru", "1er Cru", "\"Vieilles Vignes\"", "Réserve", "Brut Nature",
+    "Cuvée Prestige", "Grüner Veltliner", "Riesling Kabinett", "Spätlese",
+    "Blanc de Blancs", "Rosé", "Clos Saint-Jacques", "Gran Selección", "Ribera del Duero",
+    "Montrachet", "Côte-Rôtie", "L'Ermita", "Crémant d'Alsace", "Sélection de Grains Nobles",
+]
+
+
+def _legacy_normalize_text(text):
+    """dedupe.normalize_text before the shared normalizer (drops accented letters)."""
+    if not text:
+        return ""
+    text = text.lower()
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def _legacy_normalize_name(name):
+    """utils.normalize.normalize_name before the translation tables."""
+    if not name:
+        return ""
+    normalized = unicodedata.normalize('NFD', name.lower())
+    normalized = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
+    normalized = re.sub(r'[^a-z0-9\s]', ' ', normalized)
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+def build_corpus(names: int, producers: int, seed: int = 42) -> List[str]:
+    """Producer and cuvée strings in catalog proportions (producers repeat a lot)."""
+    rng = random.Random(seed)
+    producer_pool = [
+        f"{rng.choice(PRODUCER_PREFIXES)} {' '.join(rng.sample(PRODUCER_WORDS, rng.randint(1, 2)))}"
+        for _ in range(producers)
+    ]
+
+    corpus = []
+    for _ in range(names // 2):
+        corpus.append(rng.choice(producer_pool))
+        corpus.append(" ".join(rng.sample(CUVEE_WORDS, rng.randint(1, 3))) + f" {rng.randint(1990, 2022)}")
+    return corpus
+
+
+def _time(func: Callable, corpus: List[str], repeat: int) -> float:
+    """Best-of-N wall time in seconds for one pass over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(names: int, producers: int, repeat: int):
+    """Time each normalizer over the corpus."""
+    corpus = build_corpus(names, producers)
+
+    normalize.set_cache_size(normalize.DEFAULT_CACHE_SIZE)
+    candidates = [
+        ("legacy normalize_text", _legacy_normalize_text),
+        ("legacy normalize_name", _legacy_normalize_name),
+        ("shared, no cache", lambda text: normalize.normalize_name(text, cache=False)),
+        ("shared, LRU cache", normalize.normalize_name),
+    ]
+
+    print(f"{'normalizer':<24} {'time (s)':>9} {'names/s':>12} {'vs legacy':>10}")
+    print("-" * 58)
+
+    baseline = None
+    for label, func in candidates:
+        elapsed = _time(func, corpus, repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<24} {elapsed:>9.3f} {len(corpus) / elapsed:>12,.0f} {baseline / elapsed:>9.1f}x")
+
+    info = normalize.cache_info()
+    if info:
+        print(f"\nCache: {info.hits:,} hits, {info.misses:,} misses, {info.currsize:,}/{info.maxsize:,} entries")
+
+    disagreements = sum(
+        1 for text in corpus
+        if _legacy_normalize_name(text) != normalize.normalize_name(text)
+    )
+    print(f"Differs from legacy normalize_name on {disagreements:,} of {len(corpus):,} names (apostrophes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wine name normalization')
+    parser.add_argument('--names', type=int, default=100000,
+                        help='Strings in the corpus (default: 100000)')
+    parser.add_argument('--producers', type=int, default=2000,
+                        help='Distinct producer strings (default: 2000)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per measurement, best is reported (default: 3)')
+
+    args = parser.parse_args()
+
+    print("=" * 58)
+    print("⏱️  NORMALIZER BENCHMARK")
+    print("=" * 58)
+    run_benchmark(args.names, args.producers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
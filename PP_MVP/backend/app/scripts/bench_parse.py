@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Parse-throughput benchmark for the HTML parser backends.
+
+Times each backend in app.services.html_parser on the work the scraper does
+per page: selecting product links and the next-page link on listing pages
+(full parse and, for bs4 backends, the strained partial parse) and extracting
+title and price from product pages.
+
+Pages come from the raw HTML archive (HTML_ARCHIVE_DIR), a directory of
+saved .html files, or, when neither has pages, a synthetic retailer corpus.
+
+Usage:
+  python -m app.scripts.bench_parse
+  python -m app.scripts.bench_parse --pages-dir ./saved_pages --link-selector "a.product-link"
+  python -m app.scripts.bench_parse --synthetic 200 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import time
+import zlib
+from typing import Callable, List
+
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
+from app.core.config import settings
+from app.services.extract import extract_product_details
+from app.services.html_parser import available_backends, listing_strainer, parse_html
+
+
+def load_archive_pages(directory: str, limit: int) -> List[str]:
+    """Decompressed bodies from an HtmlArchive directory (<sha1[:2]>/<sha1>.z)."""
+    pages = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.endswith(".z"):
+                continue
+            with open(os.path.join(root, name), "rb") as f:
+                pages.append(zlib.decompress(f.read()).decode("utf-8", errors="replace"))
+            if len(pages) >= limit:
+                return pages
+    return pages
+
+
+def load_saved_pages(directory: str, limit: int) -> List[str]:
+    """Contents of *.html / *.htm files in a directory."""
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+            if len(pages) >= limit:
+                break
+    return pages
+
+
+def build_synthetic_pages(count: int, products_per_page: int = 48, seed: int = 42) -> List[str]:
+    """Retailer-like listing pages: header, nav, product grid, footer, scripts."""
+    rng = random.Random(seed)
+    nav = "".join(f'<li class="nav-item"><a href="/c/{i}">Category {i}</a></li>' for i in range(40))
+    footer = "".join(f'<p class="footer-link"><a href="/info/{i}">Info {i}</a></p>' for i in range(30))
+    script = "<script>window.__STATE__ = {" + ",".join(f'"k{i}": {i}' for i in range(300)) + "};</script>"
+
+    pages = []
+    for page in range(count):
+        cards = "".join(
+            f'<div class="product-card" data-sku="{rng.randint(10000, 99999)}">'
+            f'<img src="/img/{page}-{i}.jpg" alt="Wine {i}">'
+            f'<h3 class="product-title"><a class="product-link" href="/wines/{page}-{i}">'
+            f'Domaine {rng.choice(["Roulot", "Lafon", "Raveneau", "Dauvissat"])} {2000 + i % 23}</a></h3>'
+            f'<span class="price">${rng.randint(15, 400)}.{rng.randint(0, 99):02d}</span>'
+            f'<button class="add-to-cart">Add</button></div>'
+            for i in range(products_per_page)
+        )
+        pages.append(
+            f"<html><head><title>Wines page {page}</title>{script}</head><body>"
+            f'<header><ul class="nav">{nav}</ul></header>'
+            f"<h1>All wines</h1><main><div class=\"grid\">{cards}</div>"
+            f'<nav class="pagination"><a class="next" href="/wines?page={page + 2}">Next</a></nav></main>'
+            f"<footer>{footer}</footer></body></html>"
+        )
+    return pages
+
+
+def _time(func: Callable, pages: List[str], repeat: int) -> float:
+    """Best-of-N wall time in seconds for one pass over the pages."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(pages: List[str], link_selector: str, next_selector: str, repeat: int):
+    """Time listing and product workloads on every installed backend."""
+    megabytes = sum(len(html) for html in pages) / 1_000_000
+    strained = listing_strainer([link_selector, next_selector]) is not None
+
+    def listing(backend: str, partial: bool) -> Callable:
+        only = [link_selector, next_selector] if partial else None
+
+        def parse(html: str):
+            doc = parse_html(html, backend, only=only)
+            links = [link.get("href") for link in doc.select(link_selector)]
+            doc.select_one(next_selector)
+            return links
+        return parse
+
+    candidates = []
+    for backend in available_backends():
+        candidates.append((f"listing {backend}", listing(backend, False)))
+        if strained and backend != "selectolax":
+            candidates.append((f"listing {backend} strained", listing(backend, True)))
+    for backend in available_backends():
+        candidates.append((f"product {backend}", lambda html, backend=backend: extract_product_details(html, backend)))
+
+    print(f"{len(pages)} pages, {megabytes:.1f} MB, backends: {', '.join(available_backends())}")
+    if not strained:
+        print("Selectors use combinators: strained listing parse not available")
+    print()
+    print(f"{'workload':<30} {'time (s)':>9} {'pages/s':>10} {'MB/s':>8} {'vs html.parser':>15}")
+    print("-" * 76)
+
+    baselines = {}
+    for label, func in candidates:
+        elapsed = _time(func, pages, repeat)
+        workload = label.split()[0]
+        baselines.setdefault(workload, elapsed)
+        print(
+            f"{label:<30} {elapsed:>9.3f} {len(pages) / elapsed:>10,.0f} "
+            f"{megabytes / elapsed:>8.1f} {baselines[workload] / elapsed:>14.1f}x"
+        )
+
+    # Every backend must find the same product links
+    results = {label: [listing_func(html) for html in pages] for label, listing_func in candidates if label.startswith("listing")}
+    reference = next(iter(results.values()))
+    mismatched = [label for label, links in results.items() if links != reference]
+    if mismatched:
+        print(f"\n⚠️  Product links differ from html.parser for: {', '.join(mismatched)}")
+    else:
+        print(f"\n✅ All listing parsers found the same {sum(len(links) for links in reference):,} product links")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends')
+    parser.add_argument('--archive-dir', type=str, default=settings.HTML_ARCHIVE_DIR,
+                        help=f'HTML archive to read pages from (default: {settings.HTML_ARCHIVE_DIR})')
+    parser.add_argument('--pages-dir', type=str, default=None,
+                        help='Directory of saved .html pages (overrides the archive)')
+    parser.add_argument('--limit', type=int, default=500,
+                        help='Maximum pages to load (default: 500)')
+    parser.add_argument('--synthetic', type=int, default=100,
+                        help='Synthetic pages when no saved pages are found (default: 100)')
+    parser.add_argument('--link-selector', type=str, default='a.product-link',
+                        help='Product link selector (default: a.product-link)')
+    parser.add_argument('--next-selector', type=str, default='a.next',
+                        help='Pagination selector (default: a.next)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per measurement, best is reported (default: 3)')
+
+    args = parser.parse_args()
+
+    print("=" * 76)
+    print("⏱️  HTML PARSER BENCHMARK")
+    print("=" * 76)
+
+    if args.pages_dir:
+        pages = load_saved_pages(args.pages_dir, args.limit)
+    elif os.path.isdir(args.archive_dir):
+        pages = load_archive_pages(args.archive_dir, args.limit)
+    else:
+        pages = []
+
+    if not pages:
+        print(f"No saved pages found, using {args.synthetic} synthetic listing pages")
+        pages = build_synthetic_pages(args.synthetic)
+
+    run_benchmark(pages, args.link_selector, args.next_selector, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
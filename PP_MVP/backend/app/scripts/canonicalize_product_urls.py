@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Rewrite stored product URLs to their canonical form.
+
+Products scraped before URL canonicalization keep their original URLs
+(mixed-case host, tracking or variant parameters), so the next crawl would
+store them again under the canonical URL. This renames each product to
+app.services.frontier.canonical_product_url() and merges rows that collapse
+onto the same URL (snapshots and images move to the surviving row).
+
+Usage:
+  # Preview how many products would be renamed / merged
+  python -m app.scripts.canonicalize_product_urls --dry-run
+  
+  # Rewrite in batches of 500 products
+  python -m app.scripts.canonicalize_product_urls --batch-size 500
+"""
+
+import argparse
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
+from app.core.config import settings
+from app.services.frontier import RECANONICALIZE_BATCH_SIZE, recanonicalize_products
+
+
+def get_db_session():
+    """Create database session."""
+    engine = create_engine(settings.DATABASE_URL)
+    SessionLocal = sessionmaker(bind=engine)
+    return SessionLocal()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Canonicalize stored product URLs')
+    parser.add_argument('--batch-size', type=int, default=RECANONICALIZE_BATCH_SIZE,
+                        help=f'Products per batch/commit (default: {RECANONICALIZE_BATCH_SIZE})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count what would change without writing')
+    
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🔗 PRODUCT URL CANONICALIZATION")
+    print("=" * 60)
+    
+    db = get_db_session()
+    started = time.perf_counter()
+    
+    stats = recanonicalize_products(db, batch_size=args.batch_size, dry_run=args.dry_run)
+    
+    elapsed = time.perf_counter() - started
+    verb = "Would rename" if args.dry_run else "Renamed"
+    print(f"✅ {verb} {stats['renamed']} and merged {stats['merged']} of {stats['products']} products "
+          f"in {elapsed:.1f}s")
+    if stats["frontier_cleared"]:
+        print(f"   Cleared {stats['frontier_cleared']} crawl frontier entries (next runs start fresh)")
+    
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Collapse runs of identical product snapshots.
+
+Before change-only snapshots every scrape stored a full row per product. This
+keeps the first row of each run of identical price/stock/title snapshots,
+extends its last_seen_at to the end of the run and deletes the rest. Price
+history (app.services.snapshots.price_history) is unchanged.
+
+Usage:
+  # Preview how many rows would go
+  python -m app.scripts.compact_snapshots --dry-run
+  
+  # Compact in batches of 1000 products
+  python -m app.scripts.compact_snapshots --batch-size 1000
+"""
+
+import argparse
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
+from app.core.config import settings
+from app.services.snapshots import COMPACT_BATCH_PRODUCTS, compact_snapshots
+
+
+def get_db_session():
+    """Create database session."""
+    engine = create_engine(settings.DATABASE_URL)
+    SessionLocal = sessionmaker(bind=engine)
+    return SessionLocal()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact product snapshot history')
+    parser.add_argument('--batch-size', type=int, default=COMPACT_BATCH_PRODUCTS,
+                        help=f'Products per batch/commit (default: {COMPACT_BATCH_PRODUCTS})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count what would be removed without writing')
+    
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🗜️  SNAPSHOT COMPACTION")
+    print("=" * 60)
+    
+    db = get_db_session()
+    started = time.perf_counter()
+    
+    stats = compact_snapshots(db, batch_products=args.batch_size, dry_run=args.dry_run)
+    
+    elapsed = time.perf_counter() - started
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"✅ {verb} {stats['deleted']} snapshots from {stats['products']} products "
+          f"({stats['runs']} runs kept) in {elapsed:.1f}s")
+    
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,27 +9,63 @@ Usage:
   # Apply merges
   python -m app.scripts.dedupe_wines --threshold 88 --apply --out-csv merged.csv
   
+  # Vectorized scoring for large blocks (rapidfuzz cdist, 4 threads)
+  python -m app.scripts.dedupe_wines --method matrix --threads 4
+  
+  # Union candidates from several blockers (and print block statistics)
+  python -m app.scripts.dedupe_wines --blocking first_word,minhash,sorted_neighbourhood
+  
+  # Refresh the persistent candidate store used by the admin UI
+  python -m app.scripts.dedupe_wines --refresh-store --method matrix
+  
+  # Score blocks in parallel on 8 processes (nightly run)
+  python -m app.scripts.dedupe_wines --workers 8 --out-csv candidates.csv
+  
   # Normalize wines first (recommended before first run)
   python -m app.scripts.dedupe_wines --normalize-only
+  
+  # Resumable backfill: rerun the same command after a crash to continue
+  python -m app.scripts.dedupe_wines --normalize-only --batch-size 5000 --checkpoint normalize.json
+  
+  # After a normalizer version bump: only renormalize wines with stale norms
+  python -m app.scripts.dedupe_wines --normalize-only --stale-only
 """
 
 import argparse
 import csv
 import sys
-from typing import List, Dict
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterator, Tuple
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
 from app.core.config import settings
 from app.models.wine import Wine
 from app.models.scraper import ScrapedWine
 from app.services.dedupe import (
+    SCORING_METHODS,
     normalize_and_block,
-    find_duplicate_candidates,
     cluster_duplicates,
-    select_master_wine,
-    merge_duplicates
+    merge_clusters,
+    iter_blocks,
+    score_block,
+    describe_wine
 )
+from app.services.dedupe_store import refresh_candidate_store
+from app.services.blocking import (
+    BLOCKERS,
+    make_blockers,
+    load_active_wines,
+    find_candidates_multi,
+    block_stats
+)
+
+
+# Blocks queued per worker process (keeps the pool busy without buffering the table)
+BLOCKS_IN_FLIGHT_PER_WORKER = 4
 
 
 def get_db_session():
@@ -39,20 +75,77 @@ def get_db_session():
     return SessionLocal()
 
 
-def normalize_all_wines(table: str):
+def normalize_all_wines(table: str, batch_size: int = 1000, checkpoint: str = None, stale_only: bool = False):
     """Normalize and create blocking keys for all wines."""
     db = get_db_session()
     
     model_class = Wine if table == "wines" else ScrapedWine
     
     print(f"🔄 Normalizing {table}...")
-    normalize_and_block(db, model_class)
-    print(f"✅ Normalization complete!")
+    started = time.perf_counter()
+    stats = normalize_and_block(
+        db, model_class, batch_size=batch_size, checkpoint_path=checkpoint, stale_only=stale_only
+    )
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"⏱️  {stats['processed']} wines in {elapsed:.1f}s ({stats['processed'] / elapsed:,.0f} wines/s)")
+    print("✅ Normalization complete!")
     
     db.close()
 
 
-def find_duplicates(table: str, threshold: float, limit: int = None) -> List[Dict]:
+def score_blocks(
+    blocks: Iterator[Tuple[str, List[Dict]]],
+    threshold: float,
+    method: str = "loop",
+    threads: int = 1,
+    workers: int = 1
+) -> Iterator[Tuple[str, List[Dict], List[Tuple[int, int, float]], int]]:
+    """
+    Score blocks serially or on a process pool, yielding results in block order.
+    
+    Workers receive compact (id, norm_producer, norm_cuvee, vintage) tuples
+    instead of ORM objects. At most BLOCKS_IN_FLIGHT_PER_WORKER blocks per
+    worker are pending at once, and results are consumed in submission order,
+    so output is deterministic and identical to a serial run.
+    
+    Yields:
+        (block_key, wine_dicts, candidates, pairs_compared)
+    """
+    def make_task(block_key, wine_dicts):
+        rows = [(w["id"], w["norm_producer"], w["norm_cuvee"], w["vintage"]) for w in wine_dicts]
+        return (block_key, rows, threshold, method, threads)
+    
+    if workers <= 1:
+        for block_key, wine_dicts in blocks:
+            _, candidates, pairs = score_block(make_task(block_key, wine_dicts))
+            yield block_key, wine_dicts, candidates, pairs
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        
+        for block_key, wine_dicts in blocks:
+            pending.append((wine_dicts, pool.submit(score_block, make_task(block_key, wine_dicts))))
+            
+            if len(pending) >= workers * BLOCKS_IN_FLIGHT_PER_WORKER:
+                wine_dicts, future = pending.popleft()
+                block_key, candidates, pairs = future.result()
+                yield block_key, wine_dicts, candidates, pairs
+        
+        while pending:
+            wine_dicts, future = pending.popleft()
+            block_key, candidates, pairs = future.result()
+            yield block_key, wine_dicts, candidates, pairs
+
+
+def find_duplicates(
+    table: str,
+    threshold: float,
+    limit: int = None,
+    method: str = "loop",
+    threads: int = 1,
+    workers: int = 1
+) -> List[Dict]:
     """
     Find duplicate candidates.
     
@@ -63,63 +156,49 @@ def find_duplicates(table: str, threshold: float, limit: int = None) -> List[Dic
     
     model_class = Wine if table == "wines" else ScrapedWine
     
-    print(f"\n🔍 Finding duplicates in {table} (threshold: {threshold})...")
-    
-    # Get all blocking keys
-    blocks = db.query(model_class.dedupe_block).filter(
-        model_class.is_active == True,
-        model_class.dedupe_block.isnot(None)
-    ).distinct().all()
+    print(f"\n🔍 Finding duplicates in {table} (threshold: {threshold}, method: {method}, workers: {workers})...")
     
     all_candidates = []
-    total_blocks = len(blocks)
-    
-    for idx, (block_key,) in enumerate(blocks, 1):
-        if idx % 100 == 0:
-            print(f"  Processed {idx}/{total_blocks} blocks...")
-        
-        # Get wines in this block
-        wines = db.query(model_class).filter(
-            model_class.dedupe_block == block_key,
-            model_class.is_active == True
-        ).all()
+    total_blocks = 0
+    total_pairs = 0
+    started = time.perf_counter()
+    
+    # Stream all blocks in one query (server-side cursor, grouped by key)
+    results = score_blocks(
+        iter_blocks(db, model_class), threshold,
+        method=method, threads=threads, workers=workers
+    )
+    
+    for block_key, wine_dicts, block_candidates, pairs in results:
+        total_blocks += 1
+        total_pairs += pairs
         
-        if len(wines) < 2:
-            continue  # Need at least 2 wines to find duplicates
-        
-        # Convert to dicts for dedupe service
-        wine_dicts = []
-        for wine in wines:
-            wine_dicts.append({
-                "id": wine.id,
-                "norm_producer": wine.norm_producer,
-                "norm_cuvee": wine.norm_cuvee,
-                "vintage": wine.vintage,
-                "producer": wine.producer,
-                "cuvee": wine.cuvee or getattr(wine, 'name', None)
-            })
-        
-        # Find candidates in this block
-        block_candidates = find_duplicate_candidates(wine_dicts, threshold)
+        wines_by_id = {w["id"]: w for w in wine_dicts}
         
         # Convert to output format
         for wine1_id, wine2_id, score in block_candidates:
-            wine1 = next(w for w in wines if w.id == wine1_id)
-            wine2 = next(w for w in wines if w.id == wine2_id)
-            
-            wine1_name = f"{wine1.producer or 'Unknown'} - {wine1.cuvee or getattr(wine1, 'name', 'N/A')} ({wine1.vintage or 'NV'})"
-            wine2_name = f"{wine2.producer or 'Unknown'} - {wine2.cuvee or getattr(wine2, 'name', 'N/A')} ({wine2.vintage or 'NV'})"
-            
             all_candidates.append({
                 "wine1_id": wine1_id,
                 "wine2_id": wine2_id,
                 "score": round(score, 2),
-                "wine1_name": wine1_name,
-                "wine2_name": wine2_name,
+                "wine1_name": describe_wine(wines_by_id[wine1_id]),
+                "wine2_name": describe_wine(wines_by_id[wine2_id]),
                 "block": block_key
             })
-    
+        
+        print(
+            f"\r  Block {total_blocks}: {block_key[:30]:<30} "
+            f"{len(wine_dicts):>6} wines | {len(all_candidates)} candidates so far",
+            end="", flush=True
+        )
+    
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print()
     print(f"✅ Found {len(all_candidates)} duplicate pairs")
+    print(
+        f"⏱️  {total_blocks} blocks, {total_pairs:,} pairs in {elapsed:.1f}s "
+        f"({total_pairs / elapsed:,.0f} pairs/s, {total_blocks / elapsed:,.1f} blocks/s)"
+    )
     
     if limit:
         all_candidates = all_candidates[:limit]
@@ -128,6 +207,52 @@ def find_duplicates(table: str, threshold: float, limit: int = None) -> List[Dic
     return all_candidates
 
 
+def find_duplicates_multi(table: str, threshold: float, blocking: List[str], threads: int = 1) -> List[Dict]:
+    """
+    Find duplicate candidates using the union of several blockers.
+    
+    Returns:
+        List of candidate dicts (same keys as find_duplicates; block = blocker name)
+    """
+    db = get_db_session()
+    
+    model_class = Wine if table == "wines" else ScrapedWine
+    
+    print(f"\n🔍 Finding duplicates in {table} (threshold: {threshold}, blocking: {', '.join(blocking)})...")
+    
+    blockers = make_blockers(blocking)
+    wines = load_active_wines(db, model_class)
+    db.close()
+    
+    stats = block_stats(wines, blockers)
+    print(f"  {stats['total_wines']} wines, {stats['all_pairs']:,} possible pairs")
+    for name, blocker_stats in stats["blockers"].items():
+        print(
+            f"  {name:<22} {blocker_stats['blocks']:>7} blocks "
+            f"(max {blocker_stats['max_block_size']}, mean {blocker_stats['mean_block_size']}) "
+            f"{blocker_stats['candidate_pairs']:>10,} pairs"
+        )
+    print(f"  total: at most {stats['candidate_pairs']:,} pairs ({stats['reduction_ratio']:.2%} reduction)")
+    
+    wines_by_id = {w["id"]: w for w in wines}
+    all_candidates = [
+        {
+            "wine1_id": wine1_id,
+            "wine2_id": wine2_id,
+            "score": round(score, 2),
+            "wine1_name": describe_wine(wines_by_id[wine1_id]),
+            "wine2_name": describe_wine(wines_by_id[wine2_id]),
+            "block": blocker_name
+        }
+        for wine1_id, wine2_id, score, blocker_name in find_candidates_multi(
+            wines, blockers, threshold, workers=threads
+        )
+    ]
+    
+    print(f"✅ Found {len(all_candidates)} duplicate pairs")
+    return all_candidates
+
+
 def apply_merges(table: str, candidates: List[Dict]) -> int:
     """
     Apply duplicate merges.
@@ -149,17 +274,12 @@ def apply_merges(table: str, candidates: List[Dict]) -> int:
     
     print(f"  Found {len(clusters)} duplicate clusters")
     
-    total_merged = 0
+    # Pick all masters from one bulk fetch and merge in a single transaction
+    result = merge_clusters(db, model_class, clusters)
+    total_merged = result["merged"]
     
-    for cluster in clusters:
-        # Select master wine
-        master_id = select_master_wine(cluster, db, model_class)
-        
-        # Merge duplicates
-        merged = merge_duplicates(cluster, master_id, db, model_class)
-        total_merged += merged
-        
-        print(f"  Merged {merged} wines into master {master_id}")
+    if result["missing"]:
+        print(f"  ⚠️  {result['missing']} wines no longer exist and were skipped")
     
     print(f"✅ Total wines merged: {total_merged}")
     
@@ -167,10 +287,28 @@ def apply_merges(table: str, candidates: List[Dict]) -> int:
     return total_merged
 
 
+def refresh_store(table: str, threshold: float, method: str, threads: int):
+    """Fill the persistent duplicate-candidate store."""
+    db = get_db_session()
+    
+    model_class = Wine if table == "wines" else ScrapedWine
+    
+    print(f"\n🗄️  Refreshing candidate store for {table}...")
+    started = time.perf_counter()
+    stats = refresh_candidate_store(db, model_class, threshold, method=method, workers=threads)
+    
+    print(
+        f"✅ {stats['blocks']} blocks scanned in {time.perf_counter() - started:.1f}s: "
+        f"{stats['inserted']} new, {stats['rescored']} rescored, {stats['removed']} stale removed"
+    )
+    
+    db.close()
+
+
 def save_to_csv(candidates: List[Dict], output_file: str):
     """Save candidates to CSV file."""
     if not candidates:
-        print(f"⚠️  No candidates to save")
+        print("⚠️  No candidates to save")
         return
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
@@ -195,6 +333,22 @@ def main():
                         help='Output CSV file for candidates')
     parser.add_argument('--normalize-only', action='store_true',
                         help='Only normalize wines (no deduplication)')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Rows per normalize batch (default: 1000)')
+    parser.add_argument('--checkpoint', type=str, default=None,
+                        help='Checkpoint file for resumable --normalize-only runs')
+    parser.add_argument('--stale-only', action='store_true',
+                        help='With --normalize-only, skip wines already at the current normalizer version')
+    parser.add_argument('--blocking', type=str, default=None,
+                        help=f"Comma-separated blockers to union ({', '.join(BLOCKERS)})")
+    parser.add_argument('--refresh-store', action='store_true',
+                        help='Fill the persistent candidate store (no CSV/merge)')
+    parser.add_argument('--method', choices=list(SCORING_METHODS), default='loop',
+                        help='Pair scoring backend (default: loop)')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Threads for matrix scoring (-1 = all cores, default: 1)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes scoring blocks in parallel (default: 1)')
     
     args = parser.parse_args()
     
@@ -204,11 +358,28 @@ def main():
     
     # Normalize-only mode
     if args.normalize_only:
-        normalize_all_wines(args.table)
+        normalize_all_wines(args.table, args.batch_size, args.checkpoint, args.stale_only)
+        return
+    
+    # Candidate store refresh mode
+    if args.refresh_store:
+        refresh_store(args.table, args.threshold, args.method, args.threads)
         return
     
     # Find duplicates
-    candidates = find_duplicates(args.table, args.threshold, args.limit)
+    if args.blocking:
+        candidates = find_duplicates_multi(
+            args.table, args.threshold,
+            [name.strip() for name in args.blocking.split(',') if name.strip()],
+            threads=args.threads
+        )
+        if args.limit:
+            candidates = candidates[:args.limit]
+    else:
+        candidates = find_duplicates(
+            args.table, args.threshold, args.limit,
+            method=args.method, threads=args.threads, workers=args.workers
+        )
     
     if not candidates:
         print("\n✅ No duplicates found!")
@@ -219,7 +390,7 @@ def main():
         save_to_csv(candidates, args.out_csv)
     
     # Display sample
-    print(f"\n📋 Sample duplicate pairs (showing first 10):")
+    print("\n📋 Sample duplicate pairs (showing first 10):")
     print("-" * 60)
     for c in candidates[:10]:
         print(f"  Score: {c['score']}")
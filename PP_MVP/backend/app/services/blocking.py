@@ -0,0 +1,338 @@
+"""
+Pluggable multi-key blocking for wine deduplication.
+
+The original dedupe_block (first producer word + vintage) creates a few huge
+blocks ("chateau", "domaine", "bodega") and misses duplicates whose first
+producer token is spelled differently. Here each blocker proposes candidate
+pairs on its own, and each blocker's pairs are scored group by group (no
+global pair set is built, so memory stays bounded by SCORE_CHUNK_PAIRS):
+
+- first_word: the current dedupe_block key
+- minhash: MinHash LSH bands over character shingles of
+  norm_producer + norm_cuvee (similar names collide in at least one band)
+- sorted_neighbourhood: sort by name and pair wines within a sliding window
+
+first_word keeps every block, as dedupe_block always has (scoring is
+chunked, so a huge block costs time, not memory). MinHash buckets larger than
+max_block_size (DEFAULT_MAX_BLOCK_SIZE) are skipped: a band shared by
+thousands of wines (a common "chateau ..." prefix) adds pairs without recall.
+
+block_stats() reports per-blocker block sizes and pair counts (computed as
+n * (n - 1) / 2 per block, without enumerating pairs) so recall can be tuned
+against cost.
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Dict, Tuple, Set, Iterable, Iterator, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.dedupe import (
+    DEFAULT_THRESHOLD,
+    create_blocking_key,
+    cuvee_column,
+    score_pairs,
+)
+
+
+Pair = Tuple[int, int]  # (index1, index2) into the wine list, index1 < index2
+
+# MinHash buckets with more wines are skipped (500 wines = 124,750 pairs)
+DEFAULT_MAX_BLOCK_SIZE = 500
+
+# Candidate pairs scored per score_pairs() call
+SCORE_CHUNK_PAIRS = 50000
+
+
+class KeyBlocker(ABC):
+    """Base class for blockers that assign one or more keys per wine."""
+
+    name = "key"
+
+    def __init__(self, max_block_size: Optional[int] = None):
+        self.max_block_size = max_block_size
+
+    @abstractmethod
+    def keys(self, wine: Dict) -> List:
+        """Blocking keys of a wine (wines sharing a key are compared)."""
+
+    def groups(self, wines: List[Dict]) -> List[List[int]]:
+        """Wine indexes grouped by key."""
+        groups: Dict = {}
+        for index, wine in enumerate(wines):
+            for key in self.keys(wine):
+                groups.setdefault(key, []).append(index)
+        return list(groups.values())
+
+    def _kept(self, size: int) -> bool:
+        return size > 1 and not (self.max_block_size and size > self.max_block_size)
+
+    def iter_pair_groups(self, wines: List[Dict]) -> Iterator[List[Pair]]:
+        """Pairs of each block within max_block_size, one block at a time."""
+        for members in self.groups(wines):
+            if self._kept(len(members)):
+                yield [
+                    (members[a], members[b])
+                    for a in range(len(members))
+                    for b in range(a + 1, len(members))
+                ]
+
+    def pair_count(self, wines: List[Dict], groups: List[List[int]]) -> int:
+        """Pairs proposed (a pair sharing several keys counts once per key)."""
+        return sum(len(g) * (len(g) - 1) // 2 for g in groups if self._kept(len(g)))
+
+
+class FirstWordBlocker(KeyBlocker):
+    """The existing dedupe_block key: first producer word + vintage."""
+
+    name = "first_word"
+
+    def keys(self, wine: Dict) -> List:
+        return [wine.get("dedupe_block") or create_blocking_key(wine.get("producer"), wine.get("vintage"))]
+
+
+class MinHashLSHBlocker(KeyBlocker):
+    """
+    MinHash LSH over character shingles of the normalized full name.
+
+    Signatures of num_perm hashes are split into bands; wines with the same
+    vintage and an identical band collide. More bands (fewer rows per band)
+    raises recall and cost. Buckets over max_block_size are skipped.
+    """
+
+    name = "minhash"
+
+    # Mersenne prime 2^31 - 1: (a * x + b) stays below 2^64 for 32-bit x
+    _PRIME = (1 << 31) - 1
+
+    def __init__(
+        self,
+        num_perm: int = 32,
+        bands: int = 8,
+        shingle_size: int = 3,
+        seed: int = 1,
+        max_block_size: Optional[int] = DEFAULT_MAX_BLOCK_SIZE
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        super().__init__(max_block_size)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, self._PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, self._PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        text = f" {text} "
+        k = self.shingle_size
+        return {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        if not text:
+            return None
+
+        hashes = np.array(
+            [zlib.crc32(s.encode("utf-8")) for s in self.shingles(text)],
+            dtype=np.uint64
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(self._PRIME)
+        return permuted.min(axis=1)
+
+    def keys(self, wine: Dict) -> List:
+        text = f"{wine.get('norm_producer') or ''} {wine.get('norm_cuvee') or ''}".strip()
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        vintage = wine.get("vintage") or "nv"
+        return [
+            (band, vintage, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+
+class SortedNeighbourhoodBlocker:
+    """
+    Sorted-neighbourhood windows within each vintage.
+
+    Wines are sorted by "producer cuvee" and, in a second pass, by
+    "cuvee producer"; each wine is paired with the next window - 1 wines.
+    """
+
+    name = "sorted_neighbourhood"
+
+    def __init__(self, window: int = 10):
+        self.window = window
+
+    def groups(self, wines: List[Dict]) -> List[List[int]]:
+        """Each sliding window, reported as a group for stats."""
+        groups = []
+        for ordering in self._orderings(wines):
+            for start in range(max(len(ordering) - self.window + 1, 1)):
+                groups.append(ordering[start:start + self.window])
+        return groups
+
+    def iter_pair_groups(self, wines: List[Dict]) -> Iterator[List[Pair]]:
+        """Each wine paired with the next window - 1 wines, one ordering at a time."""
+        for ordering in self._orderings(wines):
+            yield [
+                (min(index, other), max(index, other))
+                for position, index in enumerate(ordering)
+                for other in ordering[position + 1:position + self.window]
+            ]
+
+    def pair_count(self, wines: List[Dict], groups: List[List[int]]) -> int:
+        """Pairs proposed over both orderings (a pair in both counts twice)."""
+        count = 0
+        for ordering in self._orderings(wines):
+            # Pairs at distance 1..span, with len - distance pairs at each distance
+            span = min(self.window - 1, len(ordering) - 1)
+            count += span * len(ordering) - span * (span + 1) // 2
+        return count
+
+    def _orderings(self, wines: List[Dict]) -> List[List[int]]:
+        by_vintage: Dict = {}
+        for index, wine in enumerate(wines):
+            by_vintage.setdefault(wine.get("vintage"), []).append(index)
+
+        orderings = []
+        for indexes in by_vintage.values():
+            for first, second in (("norm_producer", "norm_cuvee"), ("norm_cuvee", "norm_producer")):
+                orderings.append(sorted(
+                    indexes,
+                    key=lambda i: (wines[i].get(first) or "", wines[i].get(second) or "")
+                ))
+        return orderings
+
+
+BLOCKERS = {
+    FirstWordBlocker.name: FirstWordBlocker,
+    MinHashLSHBlocker.name: MinHashLSHBlocker,
+    SortedNeighbourhoodBlocker.name: SortedNeighbourhoodBlocker,
+}
+
+
+def make_blockers(names: Iterable[str]) -> List:
+    """Instantiate blockers by name with default settings."""
+    blockers = []
+    for name in names:
+        if name not in BLOCKERS:
+            raise ValueError(f"Unknown blocker: {name}")
+        blockers.append(BLOCKERS[name]())
+    return blockers
+
+
+def load_active_wines(db: Session, model_class) -> List[Dict]:
+    """Fetch all active wines as dicts in one streamed query."""
+    rows = db.query(
+        model_class.id,
+        model_class.dedupe_block,
+        model_class.norm_producer,
+        model_class.norm_cuvee,
+        model_class.vintage,
+        model_class.producer,
+        cuvee_column(model_class),
+    ).filter(
+        model_class.is_active == True
+    ).order_by(model_class.id).yield_per(2000)
+
+    return [
+        {
+            "id": wine_id,
+            "dedupe_block": dedupe_block,
+            "norm_producer": norm_producer,
+            "norm_cuvee": norm_cuvee,
+            "vintage": vintage,
+            "producer": producer,
+            "cuvee": cuvee
+        }
+        for wine_id, dedupe_block, norm_producer, norm_cuvee, vintage, producer, cuvee in rows
+    ]
+
+
+def _iter_pair_chunks(wines: List[Dict], blocker, chunk_pairs: int) -> Iterator[List[Pair]]:
+    """A blocker's candidate pairs in chunks of about chunk_pairs (duplicates removed per chunk)."""
+    chunk: Set[Pair] = set()
+    for pairs in blocker.iter_pair_groups(wines):
+        chunk.update(pairs)
+        if len(chunk) >= chunk_pairs:
+            yield sorted(chunk)
+            chunk = set()
+    if chunk:
+        yield sorted(chunk)
+
+
+def find_candidates_multi(
+    wines: List[Dict],
+    blockers: List,
+    threshold: float = DEFAULT_THRESHOLD,
+    workers: int = 1,
+    chunk_pairs: int = SCORE_CHUNK_PAIRS
+) -> List[Tuple[int, int, float, str]]:
+    """
+    Find duplicate candidates using several blockers.
+
+    Each blocker's pairs are scored a chunk of blocks at a time; only pairs
+    over the threshold are kept, so a pair proposed by several blockers may
+    be scored more than once but is reported once.
+
+    Returns:
+        List of (wine1_id, wine2_id, similarity_score, blocker_name), highest score first
+    """
+    hits: Dict[Tuple[int, int], Tuple[float, str]] = {}
+    for blocker in blockers:
+        for pairs in _iter_pair_chunks(wines, blocker, chunk_pairs):
+            for wine1_id, wine2_id, score in score_pairs(wines, pairs, threshold, workers):
+                hits.setdefault((wine1_id, wine2_id), (score, blocker.name))
+
+    candidates = [
+        (wine1_id, wine2_id, score, blocker_name)
+        for (wine1_id, wine2_id), (score, blocker_name) in hits.items()
+    ]
+    candidates.sort(key=lambda c: (-c[2], c[0], c[1]))
+    return candidates
+
+
+def block_stats(wines: List[Dict], blockers: List) -> Dict:
+    """
+    Block-size and pair-count statistics per blocker.
+
+    Pair counts are n * (n - 1) / 2 per kept block, so a pair proposed by
+    several keys or blockers is counted each time: candidate_pairs is an
+    upper bound on the pairs actually scored.
+
+    Returns:
+        Dict with total_wines, all_pairs, candidate_pairs, reduction_ratio and
+        a per-blocker dict of blocks, skipped_blocks, max/mean block size and
+        candidate pairs
+    """
+    total_pairs = len(wines) * (len(wines) - 1) // 2
+    candidate_pairs = 0
+    per_blocker = {}
+
+    for blocker in blockers:
+        groups = blocker.groups(wines)
+        sizes = [len(group) for group in groups if len(group) > 1]
+        max_block_size = getattr(blocker, "max_block_size", None)
+        pairs = blocker.pair_count(wines, groups)
+        candidate_pairs += pairs
+        per_blocker[blocker.name] = {
+            "blocks": len(sizes),
+            "skipped_blocks": sum(1 for size in sizes if max_block_size and size > max_block_size),
+            "max_block_size": max(sizes) if sizes else 0,
+            "mean_block_size": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+            "candidate_pairs": pairs,
+        }
+
+    return {
+        "total_wines": len(wines),
+        "all_pairs": total_pairs,
+        "candidate_pairs": candidate_pairs,
+        "reduction_ratio": round(max(0.0, 1 - candidate_pairs / total_pairs), 4) if total_pairs else 0,
+        "blockers": per_blocker,
+    }
@@ -0,0 +1,213 @@
+"""
+Structured catalog endpoints for Shopify and WooCommerce stores.
+
+Instead of crawling listing and product pages, sources on these platforms can
+be scraped from the store's JSON catalog, one request per page of products:
+
+- Shopify: /products.json (or /collections/<handle>/products.json when the
+  source URL is a collection), up to 250 products per page.
+- WooCommerce: the Store API, /wp-json/wc/store/v1/products, up to 100
+  products per page.
+
+Each product comes back as the same details dict the HTML scraper produces
+(title_raw, price_cents) plus currency, stock, SKU, image URLs and a trimmed
+copy of the raw record for Product.data_raw.
+
+Sources choose a strategy (sources.scrape_strategy): "html" (default),
+"sitemap" (see sitemaps.py), "shopify", "woocommerce" or "auto" (try
+Shopify, then WooCommerce). When the catalog endpoint is not served, the
+scraper falls back to HTML.
+"""
+
+import html
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+
+# Platforms tried, in order, by the "auto" strategy
+CATALOG_PLATFORMS = ("shopify", "woocommerce")
+
+# Maximum page sizes each platform accepts
+SHOPIFY_PAGE_SIZE = 250
+WOOCOMMERCE_PAGE_SIZE = 100
+
+
+class CatalogUnavailable(Exception):
+    """The store does not serve the platform's catalog endpoint."""
+
+
+def detect_platform(page_html: str) -> str:
+    """E-commerce platform guessed from page markup: Shopify, WooCommerce, Magento or Custom."""
+    html_lower = page_html.lower()
+    return (
+        'Shopify' if 'shopify' in html_lower else
+        'WooCommerce' if 'woocommerce' in html_lower else
+        'Magento' if 'magento' in html_lower else
+        'Custom'
+    )
+
+
+def _store_root(base_url: str) -> str:
+    parsed = urlparse(base_url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def shopify_products_url(base_url: str) -> str:
+    """products.json of the source's collection, or of the whole store."""
+    parts = [part for part in urlparse(base_url).path.split("/") if part]
+    if len(parts) >= 2 and parts[0] == "collections":
+        return f"{_store_root(base_url)}/collections/{parts[1]}/products.json"
+    return f"{_store_root(base_url)}/products.json"
+
+
+def woocommerce_products_url(base_url: str) -> str:
+    return f"{_store_root(base_url)}/wp-json/wc/store/v1/products"
+
+
+def _decimal_to_cents(value) -> Optional[int]:
+    try:
+        return int((Decimal(str(value)) * 100).quantize(Decimal(1)))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def parse_shopify_product(item: Dict, store_url: str) -> Dict:
+    """Details dict for one products.json entry (price of the first available variant)."""
+    variants = item.get("variants") or []
+    available = [variant for variant in variants if variant.get("available", True)]
+    variant = (available or variants or [{}])[0]
+    in_stock = bool(available)
+
+    return {
+        "product_url": urljoin(store_url, f"/products/{item.get('handle')}"),
+        "title_raw": (item.get("title") or "").strip(),
+        "price_cents": _decimal_to_cents(variant.get("price")),
+        "currency": "USD",  # products.json carries no currency; same assumption as HTML pages
+        "in_stock": in_stock,
+        "availability_raw": "In Stock" if in_stock else "Out of Stock",
+        "external_sku": variant.get("sku") or None,
+        "images": [image["src"] for image in item.get("images") or [] if image.get("src")],
+        "data_raw": {
+            "platform": "shopify",
+            "id": item.get("id"),
+            "vendor": item.get("vendor"),
+            "product_type": item.get("product_type"),
+            "variants": [
+                {
+                    "id": variant.get("id"),
+                    "title": variant.get("title"),
+                    "sku": variant.get("sku"),
+                    "price_cents": _decimal_to_cents(variant.get("price")),
+                    "available": variant.get("available"),
+                }
+                for variant in variants
+            ],
+        },
+    }
+
+
+def parse_woocommerce_product(item: Dict) -> Dict:
+    """Details dict for one Store API product (prices come in minor units)."""
+    prices = item.get("prices") or {}
+    minor_unit = int(prices.get("currency_minor_unit", 2))
+    try:
+        price_minor = int(prices.get("price"))
+        price_cents = price_minor * 10 ** (2 - minor_unit) if minor_unit <= 2 else price_minor // 10 ** (minor_unit - 2)
+    except (TypeError, ValueError):
+        price_cents = None
+    in_stock = bool(item.get("is_in_stock", True))
+
+    return {
+        "product_url": item.get("permalink"),
+        "title_raw": html.unescape(item.get("name") or "").strip(),
+        "price_cents": price_cents,
+        "currency": prices.get("currency_code") or "USD",
+        "in_stock": in_stock,
+        "availability_raw": "In Stock" if in_stock else "Out of Stock",
+        "external_sku": item.get("sku") or None,
+        "images": [image["src"] for image in item.get("images") or [] if image.get("src")],
+        "data_raw": {
+            "platform": "woocommerce",
+            "id": item.get("id"),
+            "type": item.get("type"),
+            "variations": [variation.get("id") for variation in item.get("variations") or []],
+        },
+    }
+
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: Dict, first_page: bool):
+    """GET a catalog page; on the first page, anything but JSON means no catalog."""
+    response = await client.get(url, params=params, headers={"Accept": "application/json"})
+    if first_page and response.status_code in (401, 403, 404, 405):
+        raise CatalogUnavailable(f"{url} returned {response.status_code}")
+    response.raise_for_status()
+
+    try:
+        return response.json()
+    except ValueError:
+        if first_page:
+            raise CatalogUnavailable(f"{url} did not return JSON")
+        raise
+
+
+async def iter_catalog_pages(
+    client: httpx.AsyncClient,
+    platform: str,
+    base_url: str,
+    max_pages: int
+) -> AsyncIterator[List[Dict]]:
+    """
+    Yield the store's products a page at a time.
+
+    Args:
+        client: HTTP client
+        platform: "shopify" or "woocommerce"
+        base_url: Source URL (a Shopify collection URL limits the catalog to it)
+        max_pages: Maximum number of catalog pages
+
+    Raises:
+        CatalogUnavailable: The first page is missing or not a catalog
+    """
+    if platform == "shopify":
+        url, page_size = shopify_products_url(base_url), SHOPIFY_PAGE_SIZE
+        size_param = "limit"
+    elif platform == "woocommerce":
+        url, page_size = woocommerce_products_url(base_url), WOOCOMMERCE_PAGE_SIZE
+        size_param = "per_page"
+    else:
+        raise ValueError(f"Unknown catalog platform: {platform}")
+
+    for page in range(1, max_pages + 1):
+        data = await _get_json(client, url, {size_param: page_size, "page": page}, first_page=page == 1)
+
+        if platform == "shopify":
+            items = data.get("products") if isinstance(data, dict) else None
+        else:
+            items = data if isinstance(data, list) else None
+        if items is None:
+            if page == 1:
+                raise CatalogUnavailable(f"{url} is not a {platform} catalog")
+            return
+
+        products = [
+            parse_shopify_product(item, url) if platform == "shopify" else parse_woocommerce_product(item)
+            for item in items
+        ]
+        products = [product for product in products if product["product_url"]]
+        if products:
+            yield products
+
+        if len(items) < page_size:
+            return
+
+
+def catalog_platforms(strategy: Optional[str]) -> Tuple[str, ...]:
+    """Catalog platforms to try for a source strategy (empty for HTML)."""
+    if strategy == "auto":
+        return CATALOG_PLATFORMS
+    if strategy in CATALOG_PLATFORMS:
+        return (strategy,)
+    return ()
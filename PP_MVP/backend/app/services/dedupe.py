@@ -8,22 +8,39 @@ Strategy:
 4. Merge duplicates above threshold
 """
 
-import re
-from typing import List, Tuple, Dict, Optional
-from rapidfuzz import fuzz
+import json
+import os
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Tuple, Dict, Optional, Iterator
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import update, values, column, case, or_, Integer, Text
 from sqlalchemy.orm import Session
 
+from app.utils.normalize import NORMALIZER_VERSION, normalize_name
+
+
+# Default similarity score (0-100) above which two wines are duplicate candidates
+DEFAULT_THRESHOLD = 87.5
+
+# Scoring backends accepted by find_duplicate_candidates()
+SCORING_METHODS = ("loop", "matrix")
+
+# Rows scored per cdist() call in matrix mode (bounds memory on huge blocks)
+MATRIX_CHUNK_ROWS = 512
+
+# Rows fetched per round trip by the streaming block loader
+BLOCK_STREAM_BATCH = 2000
+
 
 def normalize_text(text: Optional[str]) -> str:
     """
     Normalize text for deduplication matching.
     
-    Rules:
-    - Lowercase
-    - Remove accents/diacritics
-    - Remove punctuation except spaces
-    - Collapse multiple spaces
-    - Trim
+    Thin wrapper over app.utils.normalize.normalize_name (the shared, cached
+    normalizer): lowercase, diacritics folded to ASCII, apostrophes dropped,
+    other punctuation turned into spaces, whitespace collapsed.
     
     Args:
         text: Raw text
@@ -31,26 +48,7 @@ def normalize_text(text: Optional[str]) -> str:
     Returns:
         Normalized text
     """
-    if not text:
-        return ""
-    
-    # Lowercase
-    text = text.lower()
-    
-    # Remove accents (simple ASCII conversion)
-    # For production, use unidecode library for better handling
-    text = text.encode('ascii', 'ignore').decode('ascii')
-    
-    # Remove punctuation except spaces
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    # Collapse multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Trim
-    text = text.strip()
-    
-    return text
+    return normalize_name(text)
 
 
 def create_blocking_key(producer: Optional[str], vintage: Optional[str]) -> str:
@@ -117,8 +115,8 @@ def calculate_similarity(
         ))
     
     # Compare full normalized name (producer + cuvee)
-    full1 = f"{wine1.get('norm_producer', '')} {wine1.get('norm_cuvee', '')}".strip()
-    full2 = f"{wine2.get('norm_producer', '')} {wine2.get('norm_cuvee', '')}".strip()
+    full1 = _full_name(wine1)
+    full2 = _full_name(wine2)
     
     if full1 and full2:
         scores.extend([
@@ -133,9 +131,16 @@ def calculate_similarity(
     return sum(scores) / len(scores)
 
 
+def _full_name(wine: Dict[str, str]) -> str:
+    """Full normalized name (producer + cuvee) used by the full-name scorers."""
+    return f"{wine.get('norm_producer', '')} {wine.get('norm_cuvee', '')}".strip()
+
+
 def find_duplicate_candidates(
     wines: List[Dict],
-    threshold: float = 87.5
+    threshold: float = DEFAULT_THRESHOLD,
+    method: str = "loop",
+    workers: int = 1
 ) -> List[Tuple[int, int, float]]:
     """
     Find duplicate wine candidates within a block.
@@ -143,10 +148,18 @@ def find_duplicate_candidates(
     Args:
         wines: List of wine dicts (must have: id, norm_producer, norm_cuvee, vintage)
         threshold: Minimum similarity score to consider duplicates (0-100)
+        method: "loop" (pairwise calculate_similarity) or "matrix" (rapidfuzz cdist)
+        workers: Threads used by cdist in matrix mode (-1 = all cores)
         
     Returns:
         List of tuples: (wine1_id, wine2_id, similarity_score)
     """
+    if method not in SCORING_METHODS:
+        raise ValueError(f"Unknown scoring method: {method}")
+    
+    if method == "matrix":
+        return _matrix_candidates(wines, threshold, workers)
+    
     candidates = []
     
     # Compare each pair
@@ -171,6 +184,277 @@ def find_duplicate_candidates(
     return candidates
 
 
+def find_matches(
+    wine: Dict,
+    members: List[Dict],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Tuple[int, float]]:
+    """
+    Score one wine against the members of its block.
+    
+    Args:
+        wine: Wine dict (id, norm_producer, norm_cuvee, vintage)
+        members: Other wine dicts from the same block (wine itself is skipped)
+        threshold: Minimum similarity score to consider duplicates (0-100)
+        
+    Returns:
+        List of (member_id, similarity_score), highest score first
+    """
+    matches = []
+    
+    for member in members:
+        if member["id"] == wine["id"] or member.get("vintage") != wine.get("vintage"):
+            continue
+        
+        score = calculate_similarity(wine, member)
+        if score >= threshold:
+            matches.append((member["id"], score))
+    
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches
+
+
+def _matrix_candidates(
+    wines: List[Dict],
+    threshold: float,
+    workers: int
+) -> List[Tuple[int, int, float]]:
+    """
+    Score every pair in a block with rapidfuzz.process.cdist.
+    
+    Produces exactly the same scores as calculate_similarity(): the four
+    component matrices are summed in the same order and divided by the number
+    of components present for each pair. Wines are grouped by vintage first
+    since pairs across vintages are never candidates.
+    
+    Any single component below 4 * threshold - 300 caps the average below
+    threshold (the other three can contribute at most 100 each), so that value
+    is passed to cdist as score_cutoff to let rapidfuzz skip hopeless pairs.
+    
+    Returns:
+        List of (wine1_id, wine2_id, similarity_score), sorted by score with
+        ties in the same pair order as the loop implementation
+    """
+    by_vintage = {}
+    for index, wine in enumerate(wines):
+        by_vintage.setdefault(wine.get("vintage"), []).append(index)
+    
+    score_cutoff = max(0.0, 4 * threshold - 300)
+    hits = []  # (wine1_index, wine2_index, score)
+    
+    for indexes in by_vintage.values():
+        n = len(indexes)
+        if n < 2:
+            continue
+        
+        group = [wines[i] for i in indexes]
+        producers = [w.get("norm_producer") or "" for w in group]
+        cuvees = [w.get("norm_cuvee") or "" for w in group]
+        fulls = [_full_name(w) for w in group]
+        
+        # (texts, scorers) in the order calculate_similarity() appends them
+        components = [
+            (producers, [fuzz.token_set_ratio]),
+            (cuvees, [fuzz.token_set_ratio]),
+            (fulls, [fuzz.partial_ratio, fuzz.token_sort_ratio]),
+        ]
+        present = [np.array([bool(v) for v in texts]) for texts, _ in components]
+        
+        for start in range(0, n, MATRIX_CHUNK_ROWS):
+            stop = min(start + MATRIX_CHUNK_ROWS, n)
+            
+            # Only columns >= start can hold pairs (i < j) for these rows
+            total = np.zeros((stop - start, n - start))
+            count = np.zeros((stop - start, n - start))
+            
+            for (texts, scorers), has_value in zip(components, present):
+                mask = np.outer(has_value[start:stop], has_value[start:])
+                for scorer in scorers:
+                    scores = process.cdist(
+                        texts[start:stop],
+                        texts[start:],
+                        scorer=scorer,
+                        score_cutoff=score_cutoff,
+                        dtype=np.float64,
+                        workers=workers,
+                    )
+                    total += np.where(mask, scores, 0.0)
+                count += mask * len(scorers)
+            
+            average = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+            
+            rows = np.arange(start, stop)[:, None]
+            cols = np.arange(start, n)[None, :]
+            keep = (cols > rows) & (average >= threshold)
+            
+            for i, j in zip(*np.nonzero(keep)):
+                hits.append((indexes[start + i], indexes[start + j], float(average[i, j])))
+    
+    hits.sort(key=lambda hit: (-hit[2], hit[0], hit[1]))
+    
+    return [(wines[i]["id"], wines[j]["id"], score) for i, j, score in hits]
+
+
+def score_pairs(
+    wines: List[Dict],
+    pairs: List[Tuple[int, int]],
+    threshold: float = DEFAULT_THRESHOLD,
+    workers: int = 1
+) -> List[Tuple[int, int, float]]:
+    """
+    Score an explicit list of pairs with rapidfuzz.process.cpdist.
+    
+    Same scores as calculate_similarity(); used when candidate pairs come from
+    several blocking keys instead of one all-pairs block.
+    
+    Args:
+        wines: List of wine dicts (id, norm_producer, norm_cuvee, vintage)
+        pairs: (index1, index2) positions into wines
+        threshold: Minimum similarity score to consider duplicates (0-100)
+        workers: Threads used by cpdist (-1 = all cores)
+        
+    Returns:
+        List of (wine1_id, wine2_id, similarity_score), highest score first
+    """
+    pairs = [(i, j) for i, j in pairs if wines[i].get("vintage") == wines[j].get("vintage")]
+    if not pairs:
+        return []
+    
+    left = [wines[i] for i, _ in pairs]
+    right = [wines[j] for _, j in pairs]
+    
+    components = [
+        (lambda w: w.get("norm_producer") or "", [fuzz.token_set_ratio]),
+        (lambda w: w.get("norm_cuvee") or "", [fuzz.token_set_ratio]),
+        (_full_name, [fuzz.partial_ratio, fuzz.token_sort_ratio]),
+    ]
+    score_cutoff = max(0.0, 4 * threshold - 300)
+    total = np.zeros(len(pairs))
+    count = np.zeros(len(pairs))
+    
+    for value_of, scorers in components:
+        left_values = [value_of(w) for w in left]
+        right_values = [value_of(w) for w in right]
+        mask = np.array([bool(a) and bool(b) for a, b in zip(left_values, right_values)])
+        for scorer in scorers:
+            scores = process.cpdist(
+                left_values,
+                right_values,
+                scorer=scorer,
+                score_cutoff=score_cutoff,
+                dtype=np.float64,
+                workers=workers,
+            )
+            total += np.where(mask, scores, 0.0)
+        count += mask * len(scorers)
+    
+    average = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+    
+    hits = [
+        (pairs[k][0], pairs[k][1], float(average[k]))
+        for k in np.nonzero(average >= threshold)[0]
+    ]
+    hits.sort(key=lambda hit: (-hit[2], hit[0], hit[1]))
+    
+    return [(wines[i]["id"], wines[j]["id"], score) for i, j, score in hits]
+
+
+def cuvee_column(model_class):
+    """Column holding the cuvee (ScrapedWine.cuvee, or Wine.name for user wines)."""
+    return model_class.cuvee if hasattr(model_class, "cuvee") else model_class.name
+
+
+def iter_blocks(
+    db: Session,
+    model_class,
+    min_size: int = 2,
+    batch_size: int = BLOCK_STREAM_BATCH,
+    block_keys: Optional[List[str]] = None
+) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Stream active wines grouped by blocking key in a single query.
+    
+    Rows are fetched as plain tuples through a server-side cursor ordered by
+    dedupe_block, and consecutive rows are grouped into blocks, so memory stays
+    bounded by the largest block instead of the whole table.
+    
+    Args:
+        db: Database session
+        model_class: SQLAlchemy model class (Wine or ScrapedWine)
+        min_size: Skip blocks with fewer wines than this
+        batch_size: Rows fetched per round trip
+        block_keys: Only stream these blocks (all blocks if None)
+        
+    Yields:
+        (block_key, wine dicts with: id, norm_producer, norm_cuvee, vintage, producer, cuvee)
+    """
+    rows = db.query(
+        model_class.id,
+        model_class.dedupe_block,
+        model_class.norm_producer,
+        model_class.norm_cuvee,
+        model_class.vintage,
+        model_class.producer,
+        cuvee_column(model_class),
+    ).filter(
+        model_class.is_active == True,
+        model_class.dedupe_block.isnot(None)
+    )
+    
+    if block_keys is not None:
+        rows = rows.filter(model_class.dedupe_block.in_(block_keys))
+    
+    rows = rows.order_by(
+        model_class.dedupe_block,
+        model_class.id
+    ).yield_per(batch_size)
+    
+    for block_key, block_rows in groupby(rows, key=itemgetter(1)):
+        wines = [
+            {
+                "id": wine_id,
+                "norm_producer": norm_producer,
+                "norm_cuvee": norm_cuvee,
+                "vintage": vintage,
+                "producer": producer,
+                "cuvee": cuvee
+            }
+            for wine_id, _, norm_producer, norm_cuvee, vintage, producer, cuvee in block_rows
+        ]
+        
+        if len(wines) >= min_size:
+            yield block_key, wines
+
+
+def score_block(
+    task: Tuple[str, List[Tuple], float, str, int]
+) -> Tuple[str, List[Tuple[int, int, float]], int]:
+    """
+    Score one block from a compact, picklable task (process-pool entry point).
+    
+    Args:
+        task: (block_key, [(id, norm_producer, norm_cuvee, vintage), ...],
+               threshold, method, workers)
+        
+    Returns:
+        (block_key, candidates, pairs_compared)
+    """
+    block_key, rows, threshold, method, workers = task
+    
+    wines = [
+        {"id": wine_id, "norm_producer": norm_producer, "norm_cuvee": norm_cuvee, "vintage": vintage}
+        for wine_id, norm_producer, norm_cuvee, vintage in rows
+    ]
+    candidates = find_duplicate_candidates(wines, threshold, method=method, workers=workers)
+    
+    return block_key, candidates, len(rows) * (len(rows) - 1) // 2
+
+
+def describe_wine(wine: Dict) -> str:
+    """Human-readable label for a wine dict, e.g. "Leroy - Les Beaux Monts (2019)"."""
+    return f"{wine.get('producer') or 'Unknown'} - {wine.get('cuvee') or 'N/A'} ({wine.get('vintage') or 'NV'})"
+
+
 def merge_duplicates(
     wine_ids: List[int],
     master_id: int,
@@ -180,6 +464,9 @@ def merge_duplicates(
     """
     Merge duplicate wines by marking them as inactive and pointing to master.
     
+    Stored candidate pairs among the wines are marked merged in the same
+    transaction.
+    
     Args:
         wine_ids: List of duplicate wine IDs
         master_id: ID of the master wine to keep
@@ -189,19 +476,27 @@ def merge_duplicates(
     Returns:
         Number of wines merged
     """
+    from app.services.dedupe_store import mark_merged
+    
     merged_count = 0
     
-    for wine_id in wine_ids:
-        if wine_id == master_id:
-            continue  # Don't merge master with itself
+    try:
+        for wine_id in wine_ids:
+            if wine_id == master_id:
+                continue  # Don't merge master with itself
+            
+            wine = db.query(model_class).filter(model_class.id == wine_id).first()
+            if wine:
+                wine.is_active = False
+                wine.duplicate_of = master_id
+                merged_count += 1
         
-        wine = db.query(model_class).filter(model_class.id == wine_id).first()
-        if wine:
-            wine.is_active = False
-            wine.duplicate_of = master_id
-            merged_count += 1
+        mark_merged(db, model_class.__tablename__, wine_ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     
-    db.commit()
     return merged_count
 
 
@@ -256,6 +551,55 @@ def cluster_duplicates(candidates: List[Tuple[int, int, float]]) -> List[List[in
     return [list(members) for members in cluster_members.values()]
 
 
+# Fields counted when picking the master of a duplicate cluster (missing ones are skipped)
+MASTER_FIELDS = ['producer', 'cuvee', 'vintage', 'region', 'appellation', 'grapes', 'volume_ml']
+
+# IDs per IN (...) list when bulk-fetching merge candidates
+MERGE_FETCH_CHUNK = 5000
+
+
+def _fetch_master_ranks(db: Session, model_class, wine_ids: List[int]) -> Dict[int, Tuple]:
+    """
+    Bulk-fetch ranking tuples for master selection (higher sorts first).
+    
+    Returns:
+        Dict of wine ID -> (field_count, -created_timestamp, -id)
+    """
+    fields = [getattr(model_class, f) for f in MASTER_FIELDS if hasattr(model_class, f)]
+    wine_ids = list(wine_ids)
+    ranks = {}
+    
+    for start in range(0, len(wine_ids), MERGE_FETCH_CHUNK):
+        rows = db.query(
+            model_class.id,
+            model_class.created_at,
+            *fields
+        ).filter(model_class.id.in_(wine_ids[start:start + MERGE_FETCH_CHUNK]))
+        
+        for wine_id, created_at, *field_values in rows:
+            # Count non-null fields
+            field_count = sum(1 for value in field_values if value is not None)
+            
+            # Prefer older wines (lower timestamp = earlier)
+            timestamp = created_at.timestamp() if created_at else 0
+            
+            ranks[wine_id] = (
+                field_count,  # More fields is better (descending)
+                -timestamp,   # Earlier is better (ascending)
+                -wine_id      # Lower ID is better (ascending)
+            )
+    
+    return ranks
+
+
+def _pick_master(wine_ids: List[int], ranks: Dict[int, Tuple]) -> int:
+    """Best-ranked wine of a cluster (first ID if none were found)."""
+    found = [wine_id for wine_id in wine_ids if wine_id in ranks]
+    if not found:
+        return wine_ids[0]  # Fallback
+    return max(found, key=lambda wine_id: ranks[wine_id])
+
+
 def select_master_wine(wine_ids: List[int], db: Session, model_class) -> int:
     """
     Select the master wine from a cluster of duplicates.
@@ -273,71 +617,240 @@ def select_master_wine(wine_ids: List[int], db: Session, model_class) -> int:
     Returns:
         ID of the selected master wine
     """
-    wines = db.query(model_class).filter(model_class.id.in_(wine_ids)).all()
+    return _pick_master(wine_ids, _fetch_master_ranks(db, model_class, wine_ids))
+
+
+def merge_clusters(
+    db: Session,
+    model_class,
+    clusters: List[List[int]],
+    masters: Optional[Dict[int, int]] = None
+) -> Dict[str, int]:
+    """
+    Merge many duplicate clusters in one transaction.
     
-    if not wines:
-        return wine_ids[0]  # Fallback
+    Masters are picked for every cluster from a single bulk fetch (same
+    criteria as select_master_wine), then all duplicates are retired with one
+    UPDATE ... SET is_active = false, duplicate_of = CASE id ... END, and the
+    stored candidate pairs inside each cluster are marked merged.
     
-    # Score each wine
-    scores = []
-    for wine in wines:
-        # Count non-null fields
-        field_count = sum([
-            1 for field in ['producer', 'cuvee', 'vintage', 'region', 'appellation', 'grapes', 'volume_ml']
-            if getattr(wine, field, None) is not None
-        ])
+    Args:
+        db: Database session
+        model_class: SQLAlchemy model class (Wine or ScrapedWine)
+        clusters: Disjoint lists of duplicate wine IDs
+        masters: Optional explicit master per cluster index (auto-selected otherwise)
         
-        # Prefer older wines (lower timestamp = earlier)
-        timestamp = wine.created_at.timestamp() if wine.created_at else 0
+    Returns:
+        Dict with counts: clusters, merged, missing
+    """
+    from app.services.dedupe_store import mark_clusters_merged
+    
+    clusters = [list(dict.fromkeys(cluster)) for cluster in clusters]
+    masters = masters or {}
+    
+    all_ids = [wine_id for cluster in clusters for wine_id in cluster]
+    if len(all_ids) != len(set(all_ids)):
+        raise ValueError("Clusters must not share wine IDs")
+    
+    ranks = _fetch_master_ranks(db, model_class, all_ids)
+    
+    duplicate_of = {}  # duplicate ID -> master ID
+    for index, cluster in enumerate(clusters):
+        if len(cluster) < 2:
+            continue
+        master_id = masters.get(index) or _pick_master(cluster, ranks)
+        for wine_id in cluster:
+            if wine_id != master_id and wine_id in ranks:
+                duplicate_of[wine_id] = master_id
+    
+    try:
+        merged = 0
+        if duplicate_of:
+            table = model_class.__table__
+            merged = db.execute(
+                update(table)
+                .where(table.c.id.in_(list(duplicate_of)))
+                .values(
+                    is_active=False,
+                    duplicate_of=case(duplicate_of, value=table.c.id)
+                )
+            ).rowcount
         
-        scores.append((
-            field_count,  # More fields is better (descending)
-            -timestamp,   # Earlier is better (ascending)
-            -wine.id,     # Lower ID is better (ascending)
-            wine.id
-        ))
+        mark_clusters_merged(db, model_class.__tablename__, clusters)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return {
+        "clusters": sum(1 for cluster in clusters if len(cluster) >= 2),
+        "merged": merged,
+        "missing": len(all_ids) - len(ranks),
+    }
+
+
+def _bulk_update_norms(db: Session, model_class, updates: List[Dict]) -> None:
+    """
+    Write normalized columns for many rows in one statement.
+    
+    PostgreSQL gets a single UPDATE ... FROM (VALUES ...) join; other
+    databases (SQLite in tests) fall back to an executemany by primary key.
+    """
+    if not updates:
+        return
+    
+    if db.get_bind().dialect.name == "postgresql":
+        table = model_class.__table__
+        batch = values(
+            column("id", Integer),
+            column("norm_producer", Text),
+            column("norm_cuvee", Text),
+            column("dedupe_block", Text),
+            column("norm_version", Integer),
+            name="batch"
+        ).data([
+            (u["id"], u["norm_producer"], u["norm_cuvee"], u["dedupe_block"], u["norm_version"])
+            for u in updates
+        ])
+        db.execute(
+            update(table)
+            .where(table.c.id == batch.c.id)
+            .values(
+                norm_producer=batch.c.norm_producer,
+                norm_cuvee=batch.c.norm_cuvee,
+                dedupe_block=batch.c.dedupe_block,
+                norm_version=batch.c.norm_version
+            )
+        )
+    else:
+        db.execute(update(model_class), updates)
+
+
+def _load_checkpoint(path: Optional[str], table_name: str) -> int:
+    """Last processed ID from a checkpoint file (0 if missing or for another table/version)."""
+    if not path or not os.path.exists(path):
+        return 0
+    
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
     
-    # Sort by criteria and return best
-    scores.sort(reverse=True)
-    return scores[0][3]  # Return the wine ID
+    if checkpoint.get("table") != table_name or checkpoint.get("normalizer_version") != NORMALIZER_VERSION:
+        return 0
+    return int(checkpoint.get("last_id", 0))
+
+
+def _save_checkpoint(path: Optional[str], table_name: str, last_id: int) -> None:
+    """Atomically record the last committed ID."""
+    if not path:
+        return
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"table": table_name, "last_id": last_id, "normalizer_version": NORMALIZER_VERSION}, f)
+    os.replace(tmp_path, path)
 
 
 # Utility function for external use
-def normalize_and_block(db: Session, model_class, batch_size: int = 1000):
+def normalize_and_block(
+    db: Session,
+    model_class,
+    batch_size: int = 1000,
+    start_after_id: int = 0,
+    checkpoint_path: Optional[str] = None,
+    stale_only: bool = False
+) -> Dict[str, int]:
     """
     Normalize all wines and update their blocking keys.
     
-    This should be run once after adding the dedupe columns.
+    This should be run once after adding the dedupe columns (new rows are
+    normalized on write). Pages by primary key (keyset, no OFFSET rescans),
+    reads only the needed columns, writes changed rows with one set-based
+    UPDATE per batch and commits per batch. With checkpoint_path, the last
+    committed ID is saved after every batch and a rerun resumes from it.
     
     Args:
         db: Database session
         model_class: SQLAlchemy model class (Wine or ScrapedWine)
         batch_size: Number of wines to process per batch
+        start_after_id: Only process wines with a higher ID
+        checkpoint_path: Optional JSON file used to resume an interrupted run
+        stale_only: Only visit wines whose norm_version is not NORMALIZER_VERSION
+        
+    Returns:
+        Dict with counts: processed, updated, last_id
     """
-    offset = 0
+    from app.services.dedupe_store import invalidate_candidates
+    
+    table_name = model_class.__tablename__
+    last_id = max(start_after_id, _load_checkpoint(checkpoint_path, table_name))
     total_processed = 0
+    total_updated = 0
+    
+    if last_id:
+        print(f"Resuming after id {last_id}...")
     
     while True:
-        wines = db.query(model_class).filter(
-            model_class.is_active == True
-        ).offset(offset).limit(batch_size).all()
+        rows = db.query(
+            model_class.id,
+            model_class.producer,
+            cuvee_column(model_class),
+            model_class.vintage,
+            model_class.norm_producer,
+            model_class.norm_cuvee,
+            model_class.dedupe_block,
+            model_class.norm_version,
+        ).filter(
+            model_class.is_active == True,
+            model_class.id > last_id
+        )
         
-        if not wines:
+        if stale_only:
+            rows = rows.filter(or_(
+                model_class.norm_version.is_(None),
+                model_class.norm_version != NORMALIZER_VERSION
+            ))
+        
+        rows = rows.order_by(model_class.id).limit(batch_size).all()
+        
+        if not rows:
             break
         
-        for wine in wines:
-            # Normalize
-            wine.norm_producer = normalize_text(wine.producer)
-            wine.norm_cuvee = normalize_text(wine.cuvee or wine.name if hasattr(wine, 'name') else wine.cuvee)
-            
-            # Create blocking key
-            wine.dedupe_block = create_blocking_key(wine.producer, wine.vintage)
+        updates = []
+        changed_ids = []
         
+        for wine_id, producer, cuvee, vintage, old_producer, old_cuvee, old_block, old_version in rows:
+            norm = {
+                "id": wine_id,
+                "norm_producer": normalize_text(producer),
+                "norm_cuvee": normalize_text(cuvee),
+                "dedupe_block": create_blocking_key(producer, vintage),
+                "norm_version": NORMALIZER_VERSION,
+            }
+            values_changed = (norm["norm_producer"], norm["norm_cuvee"], norm["dedupe_block"]) != (old_producer, old_cuvee, old_block)
+            if values_changed or old_version != NORMALIZER_VERSION:
+                updates.append(norm)
+                if values_changed and old_block is not None:
+                    changed_ids.append(wine_id)
+        
+        _bulk_update_norms(db, model_class, updates)
+        invalidate_candidates(db, table_name, changed_ids)
         db.commit()
-        total_processed += len(wines)
-        offset += batch_size
         
-        print(f"Processed {total_processed} wines...")
+        last_id = rows[-1][0]
+        _save_checkpoint(checkpoint_path, table_name, last_id)
+        
+        total_processed += len(rows)
+        total_updated += len(updates)
+        
+        print(f"Processed {total_processed} wines ({total_updated} updated)...")
     
-    print(f"Normalization complete! Processed {total_processed} wines.")
-
+    print(f"Normalization complete! Processed {total_processed} wines, updated {total_updated}.")
+    
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    
+    return {
+        "processed": total_processed,
+        "updated": total_updated,
+        "last_id": last_id,
+    }
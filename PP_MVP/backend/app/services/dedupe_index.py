@@ -0,0 +1,159 @@
+"""
+On-write dedupe indexing for Wine and ScrapedWine.
+
+- Mapper listeners fill norm_producer, norm_cuvee and dedupe_block (stamped
+  with norm_version) whenever a wine is inserted or its producer/cuvee/vintage
+  changes, so new rows never need the full-table normalize pass.
+- index_new_wines() scores freshly written wines against their own block only
+  and stores hits as pending DedupeCandidate rows.
+- When an existing wine's normalized fields change, its pending candidates are
+  invalidated (they were scored against the old values).
+
+The listeners are registered on import (see app/db/base.py).
+"""
+
+from typing import List, Dict
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import Session
+
+from app.models.wine import Wine
+from app.models.scraper import ScrapedWine
+from app.models.dedupe import DedupeCandidate
+from app.services.dedupe import (
+    DEFAULT_THRESHOLD,
+    NORMALIZER_VERSION,
+    normalize_text,
+    create_blocking_key,
+    find_matches,
+)
+from app.services.dedupe_store import invalidate_candidates
+
+
+# Raw fields the normalized columns are derived from
+_SOURCE_FIELDS = ("producer", "cuvee", "name", "vintage")
+
+
+def apply_normalization(wine) -> None:
+    """Set norm_producer, norm_cuvee and dedupe_block from the raw fields."""
+    cuvee = wine.cuvee if hasattr(wine, "cuvee") else wine.name
+    
+    wine.norm_producer = normalize_text(wine.producer)
+    wine.norm_cuvee = normalize_text(cuvee)
+    wine.dedupe_block = create_blocking_key(wine.producer, wine.vintage)
+    wine.norm_version = NORMALIZER_VERSION
+
+
+def _source_fields_changed(wine) -> bool:
+    """True if any raw field feeding the normalized columns changed."""
+    attrs = inspect(wine).attrs
+    return any(
+        attrs[field].history.has_changes()
+        for field in _SOURCE_FIELDS
+        if field in attrs.keys()
+    )
+
+
+def _normalize_before_insert(mapper, connection, target):
+    apply_normalization(target)
+
+
+def _normalize_before_update(mapper, connection, target):
+    if not _source_fields_changed(target):
+        return
+    
+    before = (target.norm_producer, target.norm_cuvee, target.dedupe_block)
+    apply_normalization(target)
+    
+    if (target.norm_producer, target.norm_cuvee, target.dedupe_block) != before:
+        invalidate_candidates(connection, mapper.local_table.name, [target.id])
+
+
+for _model in (Wine, ScrapedWine):
+    event.listen(_model, "before_insert", _normalize_before_insert)
+    event.listen(_model, "before_update", _normalize_before_update)
+
+
+def index_new_wines(
+    db: Session,
+    model_class,
+    wines: List,
+    threshold: float = DEFAULT_THRESHOLD
+) -> int:
+    """
+    Score newly written wines against their block and save pending candidates.
+    
+    Wines must already be flushed (have IDs and normalized columns). Each block
+    is queried once, and pairs already stored are left alone. The caller commits.
+    
+    Args:
+        db: Database session
+        model_class: SQLAlchemy model class (Wine or ScrapedWine)
+        wines: Newly inserted or updated wine objects
+        threshold: Minimum similarity score to consider duplicates (0-100)
+        
+    Returns:
+        Number of candidates saved
+    """
+    by_block: Dict[str, List] = {}
+    for wine in wines:
+        if wine.id is not None and wine.dedupe_block and wine.is_active is not False:
+            by_block.setdefault(wine.dedupe_block, []).append(wine)
+    
+    if not by_block:
+        return 0
+    
+    table_name = model_class.__tablename__
+    hits = {}  # (id_a, id_b) -> (score, block)
+    
+    for block_key, block_wines in by_block.items():
+        members = [
+            {"id": wine_id, "norm_producer": norm_producer, "norm_cuvee": norm_cuvee, "vintage": vintage}
+            for wine_id, norm_producer, norm_cuvee, vintage in db.query(
+                model_class.id,
+                model_class.norm_producer,
+                model_class.norm_cuvee,
+                model_class.vintage,
+            ).filter(
+                model_class.dedupe_block == block_key,
+                model_class.is_active == True
+            )
+        ]
+        
+        for wine in block_wines:
+            target = {
+                "id": wine.id,
+                "norm_producer": wine.norm_producer,
+                "norm_cuvee": wine.norm_cuvee,
+                "vintage": wine.vintage,
+            }
+            for member_id, score in find_matches(target, members, threshold):
+                pair = (min(wine.id, member_id), max(wine.id, member_id))
+                hits.setdefault(pair, (score, block_key))
+    
+    if not hits:
+        return 0
+    
+    # Skip pairs that are already stored (pending, merged or rejected)
+    new_ids = {wine.id for block_wines in by_block.values() for wine in block_wines}
+    existing = set(db.query(DedupeCandidate.id_a, DedupeCandidate.id_b).filter(
+        DedupeCandidate.table_name == table_name,
+        or_(DedupeCandidate.id_a.in_(new_ids), DedupeCandidate.id_b.in_(new_ids))
+    ).all())
+    
+    saved = 0
+    for (id_a, id_b), (score, block_key) in hits.items():
+        if (id_a, id_b) in existing:
+            continue
+        db.add(DedupeCandidate(
+            table_name=table_name,
+            id_a=id_a,
+            id_b=id_b,
+            score=round(score, 2),
+            block=block_key,
+            status="pending",
+            normalizer_version=NORMALIZER_VERSION
+        ))
+        saved += 1
+    
+    db.flush()
+    return saved
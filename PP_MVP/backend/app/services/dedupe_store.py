@@ -0,0 +1,282 @@
+"""
+Persistent duplicate-candidate store.
+
+Candidate pairs live in the duplicate_candidates table so the admin UI can page
+through them without rescoring every block on each request.
+
+- refresh_candidate_store() is the background job that fills the table from a
+  full block scan, a batch of blocks (and one commit) at a time. Pairs already stored at the current NORMALIZER_VERSION are
+  left untouched, older versions are rescored in place, and pending rows that
+  stay stale after the scan are removed.
+- invalidate_candidates() drops pending rows for wines whose normalized fields
+  changed (called from the on-write listeners).
+- page_candidates() serves keyset-paginated, filtered reads.
+"""
+
+from typing import List, Dict, Optional, Iterable, Tuple
+from sqlalchemy import func, insert, update, delete, case, or_, and_
+from sqlalchemy.orm import Session
+
+from app.models.dedupe import DedupeCandidate
+from app.services.dedupe import (
+    DEFAULT_THRESHOLD,
+    NORMALIZER_VERSION,
+    iter_blocks,
+    find_duplicate_candidates,
+    cuvee_column,
+    describe_wine,
+)
+
+
+CANDIDATE_STATUSES = ("pending", "merged", "rejected")
+
+# Blocks scored and committed per refresh_candidate_store() batch
+REFRESH_BATCH_BLOCKS = 200
+
+
+def invalidate_candidates(executor, table_name: str, wine_ids: Iterable[int]) -> None:
+    """
+    Delete pending candidates involving any of the given wines.
+
+    Args:
+        executor: Session or Connection (works inside flush-time listeners)
+        table_name: "wines" or "scraped_wines"
+        wine_ids: IDs of wines whose normalized fields changed
+    """
+    wine_ids = list(wine_ids)
+    if not wine_ids:
+        return
+
+    executor.execute(
+        delete(DedupeCandidate.__table__).where(
+            DedupeCandidate.table_name == table_name,
+            DedupeCandidate.status == "pending",
+            or_(DedupeCandidate.id_a.in_(wine_ids), DedupeCandidate.id_b.in_(wine_ids))
+        )
+    )
+
+
+def mark_merged(db: Session, table_name: str, wine_ids: Iterable[int]) -> None:
+    """Mark stored pairs whose members were merged together as merged."""
+    wine_ids = list(wine_ids)
+    if len(wine_ids) < 2:
+        return
+
+    db.execute(
+        update(DedupeCandidate.__table__).where(
+            DedupeCandidate.table_name == table_name,
+            DedupeCandidate.id_a.in_(wine_ids),
+            DedupeCandidate.id_b.in_(wine_ids)
+        ).values(status="merged")
+    )
+
+
+def mark_clusters_merged(db: Session, table_name: str, clusters: List[List[int]]) -> None:
+    """
+    Mark stored pairs merged when both members belong to the same cluster.
+
+    One UPDATE for all clusters: each side of a pair is mapped to its cluster
+    number with a CASE and the pair is marked when both numbers match.
+    """
+    cluster_of = {wine_id: index for index, cluster in enumerate(clusters) for wine_id in cluster}
+    if len(cluster_of) < 2:
+        return
+
+    wine_ids = list(cluster_of)
+    db.execute(
+        update(DedupeCandidate.__table__).where(
+            DedupeCandidate.table_name == table_name,
+            DedupeCandidate.id_a.in_(wine_ids),
+            DedupeCandidate.id_b.in_(wine_ids),
+            case(cluster_of, value=DedupeCandidate.id_a) == case(cluster_of, value=DedupeCandidate.id_b)
+        ).values(status="merged")
+    )
+
+
+def refresh_candidate_store(
+    db: Session,
+    model_class,
+    threshold: float = DEFAULT_THRESHOLD,
+    method: str = "loop",
+    workers: int = 1,
+    batch_blocks: int = REFRESH_BATCH_BLOCKS
+) -> Dict[str, int]:
+    """
+    Scan all blocks and bring the candidate store up to date.
+
+    Pages through block keys in order (keyset, no OFFSET rescans), loads the
+    stored pairs of each batch's wines only, and commits per batch, so memory
+    and transaction size stay bounded on large tables.
+
+    Args:
+        db: Database session
+        model_class: SQLAlchemy model class (Wine or ScrapedWine)
+        threshold: Minimum similarity score to store (0-100)
+        method: Scoring backend passed to find_duplicate_candidates()
+        workers: Threads for matrix scoring
+        batch_blocks: Blocks scored and committed per batch
+
+    Returns:
+        Dict with counts: blocks, inserted, rescored, removed
+    """
+    table_name = model_class.__tablename__
+    last_block = None
+    blocks = 0
+    inserted = 0
+    rescored = 0
+
+    while True:
+        keys = db.query(model_class.dedupe_block).filter(
+            model_class.is_active == True,
+            model_class.dedupe_block.isnot(None)
+        )
+        if last_block is not None:
+            keys = keys.filter(model_class.dedupe_block > last_block)
+        keys = [key for key, in keys.group_by(model_class.dedupe_block).having(
+            func.count() > 1
+        ).order_by(model_class.dedupe_block).limit(batch_blocks)]
+
+        if not keys:
+            break
+
+        batch = list(iter_blocks(db, model_class, block_keys=keys))
+        wine_ids = [wine["id"] for _, wines in batch for wine in wines]
+
+        # (id_a, id_b) -> (row id, normalizer_version); both members share a block
+        existing = {
+            (id_a, id_b): (row_id, version)
+            for row_id, id_a, id_b, version in db.query(
+                DedupeCandidate.id,
+                DedupeCandidate.id_a,
+                DedupeCandidate.id_b,
+                DedupeCandidate.normalizer_version,
+            ).filter(
+                DedupeCandidate.table_name == table_name,
+                DedupeCandidate.id_a.in_(wine_ids)
+            )
+        }
+
+        inserts = []
+        updates = []
+        for block_key, wines in batch:
+            blocks += 1
+
+            for wine1_id, wine2_id, score in find_duplicate_candidates(
+                wines, threshold, method=method, workers=workers
+            ):
+                pair = (min(wine1_id, wine2_id), max(wine1_id, wine2_id))
+                stored = existing.get(pair)
+
+                if stored is None:
+                    inserts.append({
+                        "table_name": table_name,
+                        "id_a": pair[0],
+                        "id_b": pair[1],
+                        "score": round(score, 2),
+                        "block": block_key,
+                        "status": "pending",
+                        "normalizer_version": NORMALIZER_VERSION,
+                    })
+                    existing[pair] = (None, NORMALIZER_VERSION)
+                elif stored[1] != NORMALIZER_VERSION:
+                    updates.append({
+                        "id": stored[0],
+                        "score": round(score, 2),
+                        "block": block_key,
+                        "normalizer_version": NORMALIZER_VERSION,
+                    })
+                    existing[pair] = (stored[0], NORMALIZER_VERSION)
+
+        if inserts:
+            db.execute(insert(DedupeCandidate), inserts)
+        if updates:
+            db.execute(update(DedupeCandidate), updates)
+        db.commit()
+
+        inserted += len(inserts)
+        rescored += len(updates)
+        last_block = keys[-1]
+
+    # Pending pairs that did not survive rescoring at the current version
+    removed = db.execute(
+        delete(DedupeCandidate.__table__).where(
+            DedupeCandidate.table_name == table_name,
+            DedupeCandidate.status == "pending",
+            DedupeCandidate.normalizer_version != NORMALIZER_VERSION
+        )
+    ).rowcount
+
+    db.commit()
+
+    return {
+        "blocks": blocks,
+        "inserted": inserted,
+        "rescored": rescored,
+        "removed": removed or 0,
+    }
+
+
+def load_wine_labels(db: Session, model_class, wine_ids: Iterable[int]) -> Dict[int, str]:
+    """Fetch display labels (see describe_wine) for a set of wine IDs in one query."""
+    wine_ids = list(wine_ids)
+    if not wine_ids:
+        return {}
+
+    rows = db.query(
+        model_class.id,
+        model_class.producer,
+        cuvee_column(model_class),
+        model_class.vintage,
+    ).filter(model_class.id.in_(wine_ids))
+
+    return {
+        wine_id: describe_wine({"producer": producer, "cuvee": cuvee, "vintage": vintage})
+        for wine_id, producer, cuvee, vintage in rows
+    }
+
+
+def page_candidates(
+    db: Session,
+    table_name: str,
+    status: str = "pending",
+    min_score: Optional[float] = None,
+    block: Optional[str] = None,
+    after_score: Optional[float] = None,
+    after_id: Optional[int] = None,
+    limit: int = 100
+) -> Tuple[List[DedupeCandidate], Optional[Tuple[float, int]]]:
+    """
+    Read one page of current-version candidates, highest score first.
+
+    Uses keyset pagination on (score DESC, id ASC): pass the cursor returned
+    for the previous page as after_score/after_id.
+
+    Returns:
+        (candidates, next cursor as (score, id) or None on the last page)
+    """
+    query = db.query(DedupeCandidate).filter(
+        DedupeCandidate.table_name == table_name,
+        DedupeCandidate.status == status,
+        DedupeCandidate.normalizer_version == NORMALIZER_VERSION
+    )
+
+    if min_score is not None:
+        query = query.filter(DedupeCandidate.score >= min_score)
+    if block:
+        query = query.filter(DedupeCandidate.block == block)
+    if after_score is not None and after_id is not None:
+        query = query.filter(or_(
+            DedupeCandidate.score < after_score,
+            and_(DedupeCandidate.score == after_score, DedupeCandidate.id > after_id)
+        ))
+
+    rows = query.order_by(
+        DedupeCandidate.score.desc(),
+        DedupeCandidate.id.asc()
+    ).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1].score, rows[-1].id)
+
+    return rows, None
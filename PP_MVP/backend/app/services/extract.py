@@ -0,0 +1,252 @@
+"""
+Product page extraction.
+
+Pure functions (HTML in, fields out) shared by the live scraper and the
+offline archive re-parse. No database or network access, so they can run in
+worker processes.
+
+extract_product_details() runs an extractor chain; each field comes from the
+first extractor that finds it:
+
+1. JSON-LD: schema.org Product/Offer in <script type="application/ld+json">
+   (read with a regex and json, no DOM parse)
+2. Microdata: itemprop attributes
+3. Selectors: first <h1> and PRICE_SELECTORS
+
+The page is only parsed into a DOM when JSON-LD leaves a core field
+(title, price, availability) missing.
+"""
+
+import json
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, List, Optional
+
+from app.services.html_parser import parse_html
+
+
+# Price selectors tried in order on product pages
+PRICE_SELECTORS = ['.price', '.product-price', '[itemprop="price"]']
+
+# Fields whose absence after JSON-LD triggers the DOM extractors
+CORE_FIELDS = ("title_raw", "price_cents", "in_stock")
+
+# schema.org availability values (last path segment) counted as in stock
+IN_STOCK_AVAILABILITY = {"instock", "instoreonly", "onlineonly", "limitedavailability", "preorder", "presale", "backorder"}
+
+_JSON_LD_SCRIPT = re.compile(
+    r'<script[^>]+type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def parse_price(price_text) -> Optional[int]:
+    """
+    Parse price text to cents.
+
+    Only the first number is read, so sale ("Was $30 Now $25") and range
+    ("$20 - $30") text yields the first price. Within it, the last "." or
+    "," followed by one or two digits is the decimal separator; other
+    separators (including spaces between digit groups) are thousands
+    separators.
+
+    Args:
+        price_text: Price string like "$25.99", "25,99 €" or "1,299.00" (numbers accepted)
+
+    Returns:
+        Price in cents, or None if parse fails
+
+    Examples:
+        >>> parse_price("$25.99"), parse_price("25,99 €"), parse_price("1.299,00"), parse_price("$1,299")
+        (2599, 2599, 129900, 129900)
+        >>> parse_price("Was $30.00 Now $25.00"), parse_price("$20.00 - $30.00"), parse_price("1 299,00 €")
+        (3000, 2000, 129900)
+        >>> parse_price("Price: $25."), parse_price("Sold out")
+        (2500, None)
+    """
+    if price_text is None or price_text == "":
+        return None
+
+    # First number only (a space is a thousands separator before a 3-digit group)
+    first = re.search(r'\d(?:[\d.,]|[ \u00a0\u202f](?=\d{3}\b))*', str(price_text))
+    if not first:
+        return None
+    price_text = re.sub(r'[^\d.,]', '', first.group()).rstrip('.,')
+    match = re.search(r'[.,](\d{1,2})$', price_text)
+    if match:
+        whole, cents = price_text[:match.start()], match.group(1)
+    else:
+        whole, cents = price_text, "0"
+    whole = re.sub(r'[.,]', '', whole)
+
+    try:
+        return int((Decimal(whole or "0") + Decimal(cents) / (10 ** len(cents))) * 100)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _availability(value: Optional[str]) -> Optional[bool]:
+    """In stock per a schema.org availability URL/name (None if unknown)."""
+    if not value:
+        return None
+    name = re.sub(r'[^a-z]', '', str(value).rstrip('/').rsplit('/', 1)[-1].lower())
+    if not name:
+        return None
+    return name in IN_STOCK_AVAILABILITY
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _image_url(value) -> Optional[str]:
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("url") or value.get("contentUrl")
+    return value if isinstance(value, str) and value else None
+
+
+def _json_ld_products(data) -> List[Dict]:
+    """Product nodes anywhere in a JSON-LD document (@graph, lists, nesting)."""
+    products = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            types = node.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if any(t in ("Product", "ProductGroup", "IndividualProduct") for t in types):
+                products.append(node)
+            elif "@graph" in node:
+                stack.extend(reversed(node["@graph"] if isinstance(node["@graph"], list) else [node["@graph"]]))
+            elif "mainEntity" in node:
+                stack.append(node["mainEntity"])
+    return products
+
+
+def extract_json_ld(html: str) -> Dict[str, Any]:
+    """Fields of the first schema.org Product in the page's JSON-LD blocks."""
+    for block in _JSON_LD_SCRIPT.findall(html):
+        block = block.strip()
+        if block.startswith("<!--"):
+            block = block[4:].rsplit("-->", 1)[0]
+        try:
+            data = json.loads(block, strict=False)
+        except ValueError:
+            continue
+
+        for product in _json_ld_products(data):
+            offer = _first(product.get("offers")) or {}
+            if not isinstance(offer, dict):
+                offer = {}
+            # ProductGroup / AggregateOffer carry variant prices in nested offers or lowPrice
+            if isinstance(offer.get("offers"), list):
+                offer = {**offer, **(_first(offer["offers"]) or {})}
+
+            price = offer.get("price", offer.get("lowPrice"))
+            if price is None and isinstance(offer.get("priceSpecification"), dict):
+                price = offer["priceSpecification"].get("price")
+            brand = product.get("brand")
+
+            return {
+                "title_raw": (product.get("name") or "").strip() or None,
+                "price_cents": parse_price(price),
+                "currency": offer.get("priceCurrency"),
+                "in_stock": _availability(offer.get("availability")),
+                "availability_raw": offer.get("availability"),
+                "external_sku": str(product.get("sku") or offer.get("sku") or "") or None,
+                "gtin": product.get("gtin13") or product.get("gtin") or product.get("gtin12") or product.get("gtin14"),
+                "brand": (brand.get("name") if isinstance(brand, dict) else brand) or None,
+                "image_url": _image_url(product.get("image")),
+            }
+    return {}
+
+
+def _itemprop(doc, name: str, attrs=("content",)) -> Optional[str]:
+    node = doc.select_one(f'[itemprop="{name}"]')
+    if node is None:
+        return None
+    for attr in attrs:
+        value = node.get(attr)
+        if value:
+            return value.strip()
+    return node.get_text(strip=True) or None
+
+
+def extract_microdata(doc) -> Dict[str, Any]:
+    """Fields from itemprop microdata (first occurrence of each property)."""
+    if doc.select_one('[itemprop]') is None:
+        return {}
+
+    availability = _itemprop(doc, "availability", ("href", "content"))
+    return {
+        "title_raw": _itemprop(doc, "name"),
+        "price_cents": parse_price(_itemprop(doc, "price")),
+        "currency": _itemprop(doc, "priceCurrency"),
+        "in_stock": _availability(availability),
+        "availability_raw": availability,
+        "external_sku": _itemprop(doc, "sku"),
+        "gtin": _itemprop(doc, "gtin13") or _itemprop(doc, "gtin"),
+        "brand": _itemprop(doc, "brand"),
+        "image_url": _itemprop(doc, "image", ("src", "content", "href")),
+    }
+
+
+def extract_selectors(doc) -> Dict[str, Any]:
+    """Title from the first <h1>, price from PRICE_SELECTORS."""
+    # Extract basic data (this is a simple example - customize per source)
+    title = doc.select_one('h1')
+    title_text = title.get_text(strip=True) if title else ""
+
+    # Try to find price (common selectors)
+    price_text = None
+    for selector in PRICE_SELECTORS:
+        price_elem = doc.select_one(selector)
+        if price_elem:
+            price_text = price_elem.get_text(strip=True)
+            break
+
+    return {"title_raw": title_text or None, "price_cents": parse_price(price_text)}
+
+
+def extract_product_details(html: str, parser_backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract product data from a product page with the extractor chain.
+
+    Args:
+        html: Page markup
+        parser_backend: HTML parser backend (see app.services.html_parser)
+
+    Returns:
+        Dict with title_raw, price_cents, currency, in_stock, availability_raw,
+        external_sku, images and normalized (all structured fields plus
+        extracted_by: field -> extractor)
+    """
+    fields: Dict[str, Any] = {}
+    extracted_by: Dict[str, str] = {}
+
+    def merge(found: Dict[str, Any], extractor: str) -> None:
+        for field, value in found.items():
+            if value is not None and field not in fields:
+                fields[field] = value
+                extracted_by[field] = extractor
+
+    merge(extract_json_ld(html), "json-ld")
+
+    if any(field not in fields for field in CORE_FIELDS):
+        doc = parse_html(html, parser_backend)
+        merge(extract_microdata(doc), "microdata")
+        merge(extract_selectors(doc), "selectors")
+
+    return {
+        "title_raw": fields.get("title_raw", ""),
+        "price_cents": fields.get("price_cents"),
+        "currency": fields.get("currency") or "USD",
+        "in_stock": fields.get("in_stock"),
+        "availability_raw": fields.get("availability_raw"),
+        "external_sku": fields.get("external_sku"),
+        "images": [fields["image_url"]] if fields.get("image_url") else [],
+        "normalized": {**fields, "extracted_by": extracted_by} if fields else None,
+    }
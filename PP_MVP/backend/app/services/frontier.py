@@ -0,0 +1,358 @@
+"""
+Persistent crawl frontier and URL canonicalization.
+
+Each HTML or sitemap scrape of a source is a crawl pass over the
+crawl_frontier table instead of an in-memory loop:
+
+- start_pass() clears the previous pass and seeds it (base_url as a listing
+  page, or the sitemap's product URLs).
+- The scraper takes batches of eligible queued entries (listing pages first),
+  fetches them together, enqueues what listing pages link to and marks each
+  entry fetched, or failed: retried with exponential backoff
+  (next_eligible_at) until MAX_ATTEMPTS, except client errors like 404.
+- A run that completes closes the pass (finish_pass). A job that dies
+  mid-pass leaves its entries queued; the next run of the source sees them
+  (has_pending) and resumes instead of starting over.
+
+URLs are stored canonical (canonicalize_url): lowercase scheme/host, no
+default port, no fragment, tracking parameters removed and the rest sorted.
+Product URLs also drop variant parameters (VARIANT_PARAMS), so ?variant=,
+?ref= or ?utm_source= links all land on one product row, while shops that
+identify products by query (?p=123, ?product_id=42) keep one row each.
+recanonicalize_products() brings rows stored before this in line.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from sqlalchemy import case, delete, func, or_, update
+from sqlalchemy.orm import Session
+import httpx
+
+from app.models.scraper import CrawlFrontierEntry, Product, ProductImage, ProductSnapshot
+
+
+FRONTIER_STATES = ("queued", "fetched", "failed")
+
+# Entries fetched together (listing pages and products mixed)
+FRONTIER_BATCH_SIZE = 100
+
+# Failed fetches are retried after RETRY_BASE_SECONDS * 2^(attempts - 1)
+MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30
+
+# Query parameters that only track the visit
+TRACKING_PARAMS = {
+    "gclid", "gbraid", "wbraid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "srsltid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref", "ref_", "_pos", "_sid", "_ss", "_psq", "_fid", "_v",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+# Query parameters that select a variant of the same product page
+VARIANT_PARAMS = {"variant", "variant_id", "variation", "variation_id", "quantity", "qty"}
+VARIANT_PREFIXES = ("attribute_",)  # WooCommerce variation attributes
+
+# Products handled per recanonicalize_products() batch (one commit each)
+RECANONICALIZE_BATCH_SIZE = 1000
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def _is_variant(param: str) -> bool:
+    param = param.lower()
+    return param in VARIANT_PARAMS or param.startswith(VARIANT_PREFIXES)
+
+
+def canonicalize_url(url: str, base: Optional[str] = None, drop_variants: bool = False) -> str:
+    """
+    Canonical form of a URL, used as its identity in the frontier and products.
+
+    Args:
+        url: Absolute or relative URL
+        base: Resolve relative URLs against this
+        drop_variants: Also drop variant-selecting parameters (product URLs)
+
+    Examples:
+        >>> canonicalize_url("HTTPS://Shop.example.com:443/wine?utm_source=x&page=2&b=1#top")
+        'https://shop.example.com/wine?b=1&page=2'
+        >>> canonicalize_url("/products/red?variant=123", base="https://shop.example.com/list", drop_variants=True)
+        'https://shop.example.com/products/red'
+        >>> canonicalize_url("https://shop.example.com/index.php?route=product&product_id=42&ref=x", drop_variants=True)
+        'https://shop.example.com/index.php?product_id=42&route=product'
+    """
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    try:
+        host, port = (parts.hostname or ""), parts.port
+        netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    except ValueError:
+        pass  # Malformed port: keep the netloc as given
+
+    path = re.sub(r'/{2,}', '/', parts.path) or "/"
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(key) and not (drop_variants and _is_variant(key))
+    ]
+    query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def canonical_product_url(url: str, base: Optional[str] = None) -> str:
+    """Product URL identity: canonical, without tracking or variant parameters."""
+    return canonicalize_url(url, base, drop_variants=True)
+
+
+def _insert_ignore(db: Session, rows: List[Dict]) -> int:
+    """INSERT ... ON CONFLICT (source_id, url) DO NOTHING; returns rows inserted."""
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # Other dialects: plain insert of the URLs not yet queued
+        source_ids = {row["source_id"] for row in rows}
+        existing = set(
+            db.query(CrawlFrontierEntry.source_id, CrawlFrontierEntry.url).filter(
+                CrawlFrontierEntry.source_id.in_(source_ids),
+                CrawlFrontierEntry.url.in_([row["url"] for row in rows])
+            )
+        )
+        new_rows = [row for row in rows if (row["source_id"], row["url"]) not in existing]
+        db.add_all(CrawlFrontierEntry(**row) for row in new_rows)
+        db.flush()
+        return len(new_rows)
+
+    statement = dialect_insert(CrawlFrontierEntry).values(rows).on_conflict_do_nothing(
+        index_elements=["source_id", "url"]
+    ).returning(CrawlFrontierEntry.id)
+    return len(db.execute(statement).all())
+
+
+def enqueue(db: Session, source_id: int, urls: Iterable[str], kind: str, depth: int = 0) -> int:
+    """
+    Queue canonical URLs not yet in the source's frontier (flushes, no commit).
+
+    Returns:
+        Number of URLs added
+    """
+    now = datetime.utcnow()
+    rows = {
+        url: {"source_id": source_id, "url": url, "kind": kind, "depth": depth, "state": "queued",
+              "attempts": 0, "discovered_at": now}
+        for url in urls
+    }
+    return _insert_ignore(db, list(rows.values()))
+
+
+def has_pending(db: Session, source_id: int) -> bool:
+    """True if the source has an unfinished pass (queued entries)."""
+    return db.query(CrawlFrontierEntry.id).filter(
+        CrawlFrontierEntry.source_id == source_id,
+        CrawlFrontierEntry.state == "queued"
+    ).first() is not None
+
+
+def start_pass(db: Session, source_id: int, seeds: List[Tuple[str, str]]) -> int:
+    """
+    Replace the source's frontier with a new pass seeded with (url, kind) pairs.
+
+    Returns:
+        Number of seeds queued
+    """
+    db.execute(delete(CrawlFrontierEntry).where(CrawlFrontierEntry.source_id == source_id))
+    queued = 0
+    for kind in {kind for _, kind in seeds}:
+        queued += enqueue(db, source_id, [url for url, seed_kind in seeds if seed_kind == kind], kind)
+    db.commit()
+    return queued
+
+
+def next_batch(db: Session, source_id: int, now: datetime, limit: int = FRONTIER_BATCH_SIZE) -> List[CrawlFrontierEntry]:
+    """Eligible queued entries: listing pages first (in page order), then products in discovery order."""
+    return (
+        db.query(CrawlFrontierEntry)
+        .filter(
+            CrawlFrontierEntry.source_id == source_id,
+            CrawlFrontierEntry.state == "queued",
+            or_(CrawlFrontierEntry.next_eligible_at.is_(None), CrawlFrontierEntry.next_eligible_at <= now),
+        )
+        .order_by(
+            case((CrawlFrontierEntry.kind == "listing", 0), else_=1),
+            CrawlFrontierEntry.depth,
+            CrawlFrontierEntry.id,
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def next_eligible_at(db: Session, source_id: int) -> Optional[datetime]:
+    """Earliest retry time among queued entries (None if nothing is queued)."""
+    return db.query(func.min(func.coalesce(CrawlFrontierEntry.next_eligible_at, CrawlFrontierEntry.discovered_at))).filter(
+        CrawlFrontierEntry.source_id == source_id,
+        CrawlFrontierEntry.state == "queued"
+    ).scalar()
+
+
+def mark_fetched(db: Session, entry_ids: List[int], now: Optional[datetime] = None) -> None:
+    """Mark entries fetched (flushes, no commit)."""
+    if not entry_ids:
+        return
+    db.execute(
+        update(CrawlFrontierEntry)
+        .where(CrawlFrontierEntry.id.in_(entry_ids))
+        .values(state="fetched", fetched_at=now or datetime.utcnow(), last_error=None,
+                attempts=CrawlFrontierEntry.attempts + 1)
+    )
+
+
+def is_retryable(error: Exception) -> bool:
+    """False for client errors a retry cannot fix (404, 410, ...); 408 and 429 are retried."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return not (400 <= status < 500) or status in (408, 429)
+    return True
+
+
+def mark_failed(
+    db: Session,
+    failures: List[Tuple[CrawlFrontierEntry, str, bool]],
+    now: Optional[datetime] = None
+) -> None:
+    """
+    Record failed fetches as (entry, error, retryable) (flushes, no commit).
+
+    Retryable entries with attempts left are requeued with exponential
+    backoff; the rest become "failed".
+    """
+    now = now or datetime.utcnow()
+    updates = []
+    for entry, error, retryable in failures:
+        attempts = (entry.attempts or 0) + 1
+        if not retryable or attempts >= MAX_ATTEMPTS:
+            values = {"state": "failed", "next_eligible_at": None}
+        else:
+            values = {"state": "queued",
+                      "next_eligible_at": now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))}
+        updates.append({"id": entry.id, "attempts": attempts, "last_error": error[:1000], **values})
+
+    if updates:
+        db.execute(update(CrawlFrontierEntry), updates)
+
+
+def finish_pass(db: Session, source_id: int) -> int:
+    """
+    Close a pass at the end of a run: retries still waiting on backoff become failed.
+
+    Without this, the next run would see them as an interrupted pass and
+    resume only those instead of starting a fresh crawl.
+
+    Returns:
+        Number of entries given up on
+    """
+    result = db.execute(
+        update(CrawlFrontierEntry)
+        .where(CrawlFrontierEntry.source_id == source_id, CrawlFrontierEntry.state == "queued")
+        .values(state="failed")
+    )
+    db.commit()
+    return result.rowcount
+
+
+def frontier_counts(db: Session, source_id: int) -> Dict[str, int]:
+    """Entries of the current pass per state."""
+    counts = dict.fromkeys(FRONTIER_STATES, 0)
+    counts.update(
+        db.query(CrawlFrontierEntry.state, func.count(CrawlFrontierEntry.id))
+        .filter(CrawlFrontierEntry.source_id == source_id)
+        .group_by(CrawlFrontierEntry.state)
+        .all()
+    )
+    return counts
+
+
+def recanonicalize_products(
+    db: Session,
+    batch_size: int = RECANONICALIZE_BATCH_SIZE,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Rewrite stored product URLs to canonical_product_url().
+
+    Products stored before canonicalization (or under an older rule) would
+    otherwise get a second row on the next crawl. When a canonical URL is
+    already taken, the product is merged into that row: its snapshots and
+    images move over, the wine link is kept if the target has none, and the
+    duplicate row is deleted. Crawl passes are cleared so the next run of
+    each source starts fresh with canonical URLs. Commits once per batch.
+
+    Returns:
+        Dict with counts: products, renamed, merged, frontier_cleared
+    """
+    stats = {"products": 0, "renamed": 0, "merged": 0, "frontier_cleared": 0}
+    last_id = 0
+
+    while True:
+        batch = db.query(Product.id, Product.product_url, Product.wine_id).filter(
+            Product.id > last_id
+        ).order_by(Product.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        stats["products"] += len(batch)
+
+        changed = [
+            (product, canonical_product_url(product.product_url)) for product in batch
+            if canonical_product_url(product.product_url) != product.product_url
+        ]
+        targets = {
+            url: (product_id, wine_id) for product_id, url, wine_id in db.query(
+                Product.id, Product.product_url, Product.wine_id
+            ).filter(Product.product_url.in_({url for _, url in changed}))
+        }
+
+        for product, url in changed:
+            target = targets.get(url)
+            if target is None:
+                stats["renamed"] += 1
+                targets[url] = (product.id, product.wine_id)
+                if not dry_run:
+                    db.execute(update(Product).where(Product.id == product.id).values(product_url=url))
+                continue
+
+            stats["merged"] += 1
+            target_id, target_wine_id = target
+            if dry_run:
+                continue
+            for model in (ProductSnapshot, ProductImage):
+                db.execute(update(model).where(model.product_id == product.id).values(product_id=target_id))
+            if target_wine_id is None and product.wine_id is not None:
+                db.execute(update(Product).where(Product.id == target_id).values(wine_id=product.wine_id))
+                targets[url] = (target_id, product.wine_id)
+            db.execute(delete(Product).where(Product.id == product.id))
+
+        if not dry_run:
+            db.commit()
+        print(f"Checked {stats['products']} products ({stats['renamed']} renamed, {stats['merged']} merged)...")
+
+    if not dry_run and (stats["renamed"] or stats["merged"]):
+        stats["frontier_cleared"] = db.execute(delete(CrawlFrontierEntry)).rowcount
+        db.commit()
+
+    return stats
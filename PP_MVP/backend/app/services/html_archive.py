@@ -0,0 +1,205 @@
+"""
+Raw HTML archive and offline re-parse.
+
+When HTML_ARCHIVE_ENABLED is set (off by default: the archive has no
+retention and grows with every changed page), the scraper stores every page
+body it parses here so extraction changes can be re-run without re-crawling
+retailers:
+
+- Bodies are zlib-compressed files under <directory>/<sha1[:2]>/<sha1>.z,
+  stored once per content hash.
+- archived_pages rows key each fetch by (source_id, url, fetched_at) and
+  point at the body's digest.
+
+reparse_archive() runs extract_product_details() over the latest archived
+page of each product in a process pool (no network), reports throughput and
+how many products would change, and with apply=True writes the new values
+onto each product's latest snapshot.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.scraper import ArchivedPage, Source, Product, ProductSnapshot
+from app.services.extract import extract_product_details
+from app.services.snapshots import latest_snapshots
+
+
+# Pages handed to a worker process at a time
+REPARSE_CHUNK_SIZE = 32
+
+# Extracted snapshot columns compared and rewritten by reparse_archive()
+SNAPSHOT_FIELDS = ("title_raw", "price_cents", "currency", "in_stock", "availability_raw", "normalized")
+
+
+class HtmlArchive:
+    """Content-addressed, compressed page bodies on disk."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.z")
+
+    def put(self, body: bytes) -> str:
+        """Store a body (no-op if already archived) and return its sha1."""
+        digest = hashlib.sha1(body).hexdigest()
+        path = self._path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp_path, path)
+
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self._path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+
+def get_archive() -> Optional[HtmlArchive]:
+    """Archive in the configured directory, or None when disabled."""
+    from app.core.config import settings
+
+    if not settings.HTML_ARCHIVE_ENABLED:
+        return None
+    return HtmlArchive(settings.HTML_ARCHIVE_DIR)
+
+
+async def archive_page(archive: HtmlArchive, source_id: int, url: str, body: bytes, kind: str = "product") -> Optional[Dict]:
+    """
+    Store a body off the event loop and return the archived_pages row to insert
+    (see record_archived_pages).
+
+    A failed write (disk full, permissions) is logged and returns None: the
+    archive is best-effort and never fails the scrape.
+    """
+    try:
+        digest = await asyncio.to_thread(archive.put, body)
+    except OSError as e:
+        print(f"HTML archive error for {url}: {e}")
+        return None
+
+    return {
+        "source_id": source_id,
+        "url": url,
+        "fetched_at": datetime.utcnow(),
+        "kind": kind,
+        "digest": digest,
+        "size": len(body),
+    }
+
+
+def record_archived_pages(db: Session, rows: List[Dict]) -> None:
+    """Bulk insert archived_pages rows (the caller commits)."""
+    if rows:
+        db.execute(insert(ArchivedPage), rows)
+
+
+def _reparse_one(task: Tuple[str, str, str, Optional[str]]) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Worker: (directory, url, digest, parser_backend) -> (url, details, error)."""
+    directory, url, digest, parser_backend = task
+    try:
+        html = HtmlArchive(directory).get(digest).decode("utf-8", errors="replace")
+        return url, extract_product_details(html, parser_backend), None
+    except Exception as e:
+        return url, None, str(e)
+
+
+def reparse_archive(
+    db: Session,
+    archive: HtmlArchive,
+    source_id: Optional[int] = None,
+    workers: int = 1,
+    limit: Optional[int] = None,
+    apply: bool = False
+) -> Dict:
+    """
+    Re-run product extraction over the latest archived page of each product.
+
+    Args:
+        db: Database session
+        archive: Archive holding the page bodies
+        source_id: Only this source (all sources if None)
+        workers: Extraction processes (1 = in-process)
+        limit: Maximum number of pages
+        apply: Write changed fields onto each product's latest snapshot
+
+    Returns:
+        Dict with counts: pages, extracted, changed, applied, errors, seconds
+    """
+    latest_ids = db.query(func.max(ArchivedPage.id)).filter(ArchivedPage.kind == "product")
+    if source_id:
+        latest_ids = latest_ids.filter(ArchivedPage.source_id == source_id)
+    latest_ids = latest_ids.group_by(ArchivedPage.source_id, ArchivedPage.url)
+
+    query = db.query(ArchivedPage.url, ArchivedPage.digest, Source.parser_backend).join(
+        Source, Source.id == ArchivedPage.source_id
+    ).filter(
+        ArchivedPage.id.in_(latest_ids.scalar_subquery())
+    ).order_by(ArchivedPage.id)
+    if limit:
+        query = query.limit(limit)
+
+    tasks = [(archive.directory, url, digest, parser_backend) for url, digest, parser_backend in query]
+
+    started = time.perf_counter()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_reparse_one, tasks, chunksize=REPARSE_CHUNK_SIZE))
+    else:
+        results = [_reparse_one(task) for task in tasks]
+    elapsed = time.perf_counter() - started
+
+    extracted = {url: details for url, details, error in results if details is not None}
+    errors = [f"Error re-parsing {url}: {error}" for url, _, error in results if error]
+
+    # Compare with what is stored today
+    products = dict(db.query(Product.product_url, Product.id).filter(
+        Product.product_url.in_(list(extracted))
+    )) if extracted else {}
+    current = latest_snapshots(db, products.values())
+
+    snapshot_updates = []
+    title_updates = []
+    sku_updates = []
+    for url, details in extracted.items():
+        snapshot = current.get(products.get(url))
+        if snapshot is None:
+            continue
+        values = {field: details[field] for field in SNAPSHOT_FIELDS}
+        if any(getattr(snapshot, field) != value for field, value in values.items()):
+            snapshot_updates.append({"id": snapshot.id, **values})
+            if details["title_raw"]:
+                title_updates.append({"id": snapshot.product_id, "title_raw": details["title_raw"]})
+            if details["external_sku"]:
+                sku_updates.append({"id": snapshot.product_id, "external_sku": details["external_sku"]})
+
+    if apply:
+        if snapshot_updates:
+            db.execute(update(ProductSnapshot), snapshot_updates)
+        for product_updates in (title_updates, sku_updates):
+            if product_updates:
+                db.execute(update(Product), product_updates)
+        db.commit()
+
+    return {
+        "pages": len(tasks),
+        "extracted": len(extracted),
+        "changed": len(snapshot_updates),
+        "applied": len(snapshot_updates) if apply else 0,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(len(tasks) / elapsed, 1) if elapsed else 0.0,
+    }
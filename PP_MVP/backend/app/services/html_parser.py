@@ -0,0 +1,196 @@
+"""
+Pluggable HTML parser backends for scraping.
+
+The scraper only needs a handful of CSS selectors per page, so the parser is
+chosen per Source (sources.parser_backend) instead of always using the slow
+pure-Python 'html.parser':
+
+- "html.parser": BeautifulSoup with the stdlib parser (always available)
+- "lxml": BeautifulSoup on the lxml C parser (same API, several times faster)
+- "selectolax": selectolax's Lexbor engine (fastest; CSS selection only)
+
+parse_html() returns a Document with select()/select_one(), and nodes with
+get()/get_text(), whatever the backend. A missing optional dependency falls
+back to the next backend in FALLBACK_ORDER.
+
+For listing pages, parse_html(..., only=[selectors]) does a SoupStrainer
+partial parse when every selector is a simple compound (tag, .class, #id,
+[attr], [attr=value] with no combinators): only matching elements are built.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional, Iterable, Callable
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+# Backend used when a source has none set
+DEFAULT_BACKEND = "lxml"
+
+# Tried in order when the requested backend is not installed
+FALLBACK_ORDER = ("lxml", "html.parser")
+
+# tag? followed by any of .class #id [attr] [attr=value]
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+|#[\w-]+|\[[^\]]+\])*)$')
+_SELECTOR_PART = re.compile(r'\.([\w-]+)|#([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*["\']?([^"\'\]]*)["\']?\s*)?\]')
+
+
+@lru_cache(maxsize=None)
+def backend_available(backend: str) -> bool:
+    """True if the backend's library can be imported."""
+    try:
+        if backend == "lxml":
+            import lxml  # noqa: F401
+        elif backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif backend != "html.parser":
+            return False
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> List[str]:
+    return [backend for backend in PARSER_BACKENDS if backend_available(backend)]
+
+
+def resolve_backend(backend: Optional[str]) -> str:
+    """Requested backend if installed, else the first available fallback."""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    if backend_available(backend):
+        return backend
+    return next(fallback for fallback in FALLBACK_ORDER if backend_available(fallback))
+
+
+def make_soup(html: str, backend: Optional[str] = None, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Full BeautifulSoup tree on the fastest bs4-compatible backend.
+
+    For code that needs the bs4 API beyond selectors (find_all, parents,
+    str(tag)); selectolax requests use lxml here.
+    """
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        backend = resolve_backend("lxml")
+    return BeautifulSoup(html, backend, parse_only=parse_only)
+
+
+def _compile_simple(selector: str) -> Optional[Callable]:
+    """Matcher (tag name, attrs) -> bool for a simple compound selector, else None."""
+    selector = selector.strip()
+    match = _SIMPLE_SELECTOR.match(selector)
+    if not selector or not match:
+        return None
+
+    tag = (match.group(1) or "").lower()
+    classes, ids, attrs = [], [], []
+    for class_name, id_name, attr, value in _SELECTOR_PART.findall(match.group(2)):
+        if class_name:
+            classes.append(class_name)
+        elif id_name:
+            ids.append(id_name)
+        else:
+            attrs.append((attr, value or None))
+
+    def matches(name, tag_attrs) -> bool:
+        if tag and name != tag:
+            return False
+        tag_attrs = tag_attrs or {}
+        tag_classes = tag_attrs.get("class") or []
+        if isinstance(tag_classes, str):
+            tag_classes = tag_classes.split()
+        if any(class_name not in tag_classes for class_name in classes):
+            return False
+        if any(tag_attrs.get("id") != id_name for id_name in ids):
+            return False
+        return all(
+            attr in tag_attrs and (value is None or tag_attrs[attr] == value)
+            for attr, value in attrs
+        )
+
+    return matches
+
+
+def listing_strainer(selectors: Iterable[Optional[str]]) -> Optional[SoupStrainer]:
+    """
+    SoupStrainer keeping only elements matched by the given selectors.
+
+    Returns None (parse everything) if any selector uses combinators,
+    pseudo-classes or selector lists.
+    """
+    matchers = []
+    for selector in filter(None, selectors):
+        matcher = _compile_simple(selector)
+        if matcher is None:
+            return None
+        matchers.append(matcher)
+
+    if not matchers:
+        return None
+    return SoupStrainer(lambda name, attrs=None: any(matcher(name, attrs) for matcher in matchers))
+
+
+class Node:
+    """Backend-neutral element: get(attr) and get_text()."""
+
+    __slots__ = ("_node", "_selectolax")
+
+    def __init__(self, node, selectolax: bool = False):
+        self._node = node
+        self._selectolax = selectolax
+
+    def get(self, attr: str, default=None):
+        if self._selectolax:
+            value = self._node.attributes.get(attr)
+            return default if value is None else value
+        return self._node.get(attr, default)
+
+    def get_text(self, strip: bool = False) -> str:
+        if self._selectolax:
+            return self._node.text(deep=True, strip=strip)
+        return self._node.get_text(strip=strip)
+
+
+class Document:
+    """Parsed page with CSS selection."""
+
+    def __init__(self, tree, backend: str):
+        self.tree = tree
+        self.backend = backend
+        self._selectolax = backend == "selectolax"
+
+    def select(self, selector: str) -> List[Node]:
+        nodes = self.tree.css(selector) if self._selectolax else self.tree.select(selector)
+        return [Node(node, self._selectolax) for node in nodes]
+
+    def select_one(self, selector: str) -> Optional[Node]:
+        node = self.tree.css_first(selector) if self._selectolax else self.tree.select_one(selector)
+        return Node(node, self._selectolax) if node is not None else None
+
+
+def parse_html(html: str, backend: Optional[str] = None, only: Optional[Iterable[Optional[str]]] = None) -> Document:
+    """
+    Parse a page with the given backend.
+
+    Args:
+        html: Page markup
+        backend: One of PARSER_BACKENDS (DEFAULT_BACKEND if None)
+        only: Selectors the caller will use; enables a partial parse when
+            they are all simple (bs4 backends only)
+
+    Returns:
+        Document supporting select() / select_one()
+    """
+    backend = resolve_backend(backend)
+
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return Document(LexborHTMLParser(html), backend)
+
+    strainer = listing_strainer(only) if only is not None else None
+    return Document(BeautifulSoup(html, backend, parse_only=strainer), backend)
@@ -0,0 +1,287 @@
+"""
+Conditional-GET HTTP cache for scraper fetches.
+
+CachingTransport sits under the scraper's httpx.AsyncClient, above the rate
+limiter (so every network request it makes, refetches included, is paced):
+
+- For each GET it sends If-None-Match / If-Modified-Since from the URL's
+  stored ETag / Last-Modified.
+- A 304 is turned into a 200 carrying the cached body and the
+  `x-cache: revalidated` header, so callers that need the page (listing
+  pages) keep working while callers that only extract data (product pages)
+  can skip parsing and snapshotting.
+- A 200 with validators stores the body. Requests carrying the
+  `no_cache` extension (streamed sitemaps) pass straight through, so large
+  bodies are never read into memory.
+
+Bodies are stored once per content hash (sha1), zlib-compressed, under
+<directory>/bodies/. An SQLite index (stdlib sqlite3) holds the per-URL
+validators and per-body size and last access; when the stored total exceeds
+max_bytes, least recently used bodies are evicted.
+
+The index is shared by every worker process, so it runs in WAL mode with a
+busy timeout. Store calls run in a thread (off the event loop), and any
+cache error is treated as a miss: the request goes out unconditionally and
+the fetch itself never fails because of the cache.
+"""
+
+import asyncio
+import functools
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+
+# Header added to responses rebuilt from the cache after a 304
+CACHE_STATUS_HEADER = "x-cache"
+REVALIDATED = "revalidated"
+
+# Request extension that skips the cache (response is streamed as-is)
+NO_CACHE_EXTENSION = "no_cache"
+
+# Response headers kept with a cached body
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+# How long a write waits for another process holding the index lock
+BUSY_TIMEOUT_SECONDS = 30
+
+
+def _locked(method: Callable) -> Callable:
+    """Serialize a store method on the store's lock (one sqlite3 connection)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class HttpCacheStore:
+    """Content-addressed, compressed body store with per-URL validators."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+
+        # Used from worker threads (see CachingTransport), serialized by _lock
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bodies (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_bodies_last_access ON bodies (last_access);
+        """)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, "bodies", digest[:2], f"{digest}.z")
+
+    @_locked
+    def validators(self, url: str) -> Optional[Dict]:
+        """Stored ETag / Last-Modified / content type / digest for a URL."""
+        row = self._db.execute(
+            "SELECT etag, last_modified, content_type, digest FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_type": row[2], "digest": row[3]}
+
+    @_locked
+    def load(self, digest: str) -> Optional[bytes]:
+        """Body for a digest (None if evicted), marking it recently used."""
+        try:
+            with open(self._path(digest), "rb") as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+        self._db.execute("UPDATE bodies SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        self._db.commit()
+        return body
+
+    @_locked
+    def save(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str], content_type: Optional[str]) -> None:
+        """Store a body (once per content hash) and the URL's validators."""
+        digest = hashlib.sha1(body).hexdigest()
+        path = self._path(digest)
+
+        if not os.path.exists(path):
+            compressed = zlib.compress(body, 6)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            stored_size = len(compressed)
+        else:
+            stored_size = os.path.getsize(path)
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO bodies (digest, size, stored_size, last_access) VALUES (?, ?, ?, ?)",
+            (digest, len(body), stored_size, time.time())
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (url, etag, last_modified, content_type, digest) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_type, digest)
+        )
+        self._db.commit()
+        self.evict()
+
+    @_locked
+    def forget(self, url: str) -> None:
+        self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+        self._db.commit()
+
+    @_locked
+    def total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM bodies").fetchone()[0]
+
+    @_locked
+    def evict(self) -> int:
+        """Drop least recently used bodies until the store fits max_bytes."""
+        excess = self.total_bytes() - self.max_bytes
+        evicted = 0
+
+        for digest, stored_size in self._db.execute(
+            "SELECT digest, stored_size FROM bodies ORDER BY last_access"
+        ).fetchall():
+            if excess <= 0:
+                break
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+            self._db.execute("DELETE FROM bodies WHERE digest = ?", (digest,))
+            self._db.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+            excess -= stored_size
+            evicted += 1
+
+        if evicted:
+            self._db.commit()
+        return evicted
+
+    @_locked
+    def close(self) -> None:
+        self._db.close()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport adding conditional GETs backed by an HttpCacheStore."""
+
+    def __init__(self, store: HttpCacheStore, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.store = store
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.requests = 0
+        self.hits = 0
+        self.bytes_saved = 0
+        self.errors = 0
+
+    async def _store_call(self, method: Callable, *args) -> Any:
+        """Run a store method in a thread; errors count as a cache miss (None)."""
+        try:
+            return await asyncio.to_thread(method, *args)
+        except (sqlite3.Error, OSError) as e:
+            self.errors += 1
+            print(f"HTTP cache error ({method.__name__}): {e}")
+            return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET" or request.extensions.get(NO_CACHE_EXTENSION):
+            return await self.transport.handle_async_request(request)
+
+        url = str(request.url)
+        cached = await self._store_call(self.store.validators, url)
+        if cached:
+            if cached["etag"]:
+                request.headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                request.headers["If-Modified-Since"] = cached["last_modified"]
+
+        self.requests += 1
+        response = await self.transport.handle_async_request(request)
+
+        if response.status_code == 304 and cached:
+            body = await self._store_call(self.store.load, cached["digest"])
+            await response.aclose()
+            if body is None:
+                # Body was evicted (or unreadable): fetch again without validators
+                await self._store_call(self.store.forget, url)
+                request.headers.pop("If-None-Match", None)
+                request.headers.pop("If-Modified-Since", None)
+                return await self.transport.handle_async_request(request)
+
+            self.hits += 1
+            self.bytes_saved += len(body)
+            headers = {name: cached[key] for name, key in (
+                ("content-type", "content_type"), ("etag", "etag"), ("last-modified", "last_modified")
+            ) if cached[key]}
+            headers[CACHE_STATUS_HEADER] = REVALIDATED
+            return httpx.Response(200, headers=headers, content=body, request=request)
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if response.status_code == 200 and (etag or last_modified):
+            # Store the decoded body; hand back a plain response with the same bytes
+            raw = httpx.Response(200, headers=response.headers, stream=response.stream, request=request)
+            body = await raw.aread()
+            await self._store_call(self.store.save, url, body, etag, last_modified, response.headers.get("content-type"))
+
+            headers = {name: value for name, value in response.headers.items() if name.lower() in _KEPT_HEADERS}
+            return httpx.Response(200, headers=headers, content=body, request=request)
+
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def stats(self) -> Dict:
+        """Cache hit rate and bytes not downloaded, for job stats."""
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.requests, 4) if self.requests else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "errors": self.errors,
+        }
+
+
+def make_caching_transport(transport: Optional[httpx.AsyncBaseTransport] = None) -> Optional[CachingTransport]:
+    """Transport over the configured cache directory (wrapping `transport`), or None when disabled."""
+    from app.core.config import settings
+
+    if not settings.HTTP_CACHE_ENABLED:
+        return None
+    try:
+        store = HttpCacheStore(settings.HTTP_CACHE_DIR, settings.HTTP_CACHE_MAX_BYTES)
+    except (sqlite3.Error, OSError) as e:
+        # Scrape uncached rather than fail
+        print(f"HTTP cache unavailable: {e}")
+        return None
+    return CachingTransport(store, transport)
+
+
+def is_revalidated(response: httpx.Response) -> bool:
+    """True if the response body came from the cache after a 304."""
+    return response.headers.get(CACHE_STATUS_HEADER) == REVALIDATED
@@ -0,0 +1,301 @@
+"""
+Product image ingestion.
+
+Scrapes record ProductImage rows with the retailer's src_url only. This stage
+(the "images" job kind, see app/worker.py) fills in the rest so the frontend
+serves our copies instead of hotlinking retailer images:
+
+1. Pending rows (no stored_url, no error, not backing off) are grouped by
+   src_url, so an image shared by several products is downloaded once.
+2. Downloads run concurrently through the scraper's FetchLimiter and the
+   per-host rate limiter, streamed and cut off past MAX_IMAGE_BYTES.
+3. Bodies are deduplicated by sha1: content already stored (by an earlier
+   run or another URL in this one) is reused without processing.
+4. New content is measured and thumbnailed in a process pool
+   (IMAGE_THUMBNAIL_SIZE square JPEG, letterboxed on white), then the
+   original and thumbnail are saved to the configured storage
+   (app/services/image_storage.py).
+
+Rows are updated in batches of IMAGE_BATCH_SIZE. Permanent failures (4xx
+other than 408/429, undecodable or oversized content) record an error and
+are not retried; transient ones (timeouts, connection errors, 5xx) stay
+pending with exponential backoff until MAX_IMAGE_ATTEMPTS.
+"""
+
+import asyncio
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+import httpx
+
+from app.core.config import settings
+from app.models.scraper import Product, ProductImage
+from app.services.frontier import is_retryable
+from app.services.image_storage import ImageStorage, get_image_storage
+from app.services.rate_limit import make_rate_limited_transport
+from app.services.scraper_service import FetchLimiter, PER_HOST_LIMIT
+
+
+# Rows written per commit
+IMAGE_BATCH_SIZE = 100
+
+# Larger downloads are rejected
+MAX_IMAGE_BYTES = 15 * 1024 * 1024
+
+# Transient failures are retried after IMAGE_RETRY_BASE_SECONDS * 2^(attempts - 1),
+# then recorded as an error after MAX_IMAGE_ATTEMPTS
+MAX_IMAGE_ATTEMPTS = 5
+IMAGE_RETRY_BASE_SECONDS = 300
+
+# Pillow format -> (file extension, content type) of stored originals
+IMAGE_FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "GIF": ("gif", "image/gif"),
+    "AVIF": ("avif", "image/avif"),
+}
+
+
+def pending_image_filter(now: datetime) -> List:
+    """Filter clauses for ProductImage rows due for ingestion."""
+    return [
+        ProductImage.stored_url.is_(None),
+        ProductImage.error.is_(None),
+        ProductImage.src_url.isnot(None),
+        or_(ProductImage.next_attempt_at.is_(None), ProductImage.next_attempt_at <= now),
+    ]
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """True for failures a retry cannot fix: client errors and bad content (ValueError)."""
+    return isinstance(error, ValueError) or not is_retryable(error)
+
+
+def process_image(data: bytes, size: int) -> Dict[str, Any]:
+    """
+    Measure an image and render its thumbnail (runs in a worker process).
+
+    Args:
+        data: Image file bytes
+        size: Thumbnail edge in pixels
+
+    Returns:
+        Dict with width, height, format (Pillow name) and thumbnail (JPEG bytes)
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+            image_format = image.format
+
+            thumbnail = ImageOps.exif_transpose(image)
+            if thumbnail.mode in ("RGBA", "LA", "P"):
+                # Flatten transparency on white (bottle shots are often PNG cut-outs)
+                rgba = thumbnail.convert("RGBA")
+                background = Image.new("RGB", rgba.size, (255, 255, 255))
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                thumbnail = background
+            else:
+                thumbnail = thumbnail.convert("RGB")
+
+            thumbnail = ImageOps.pad(thumbnail, (size, size), method=Image.Resampling.LANCZOS, color=(255, 255, 255))
+            output = io.BytesIO()
+            thumbnail.save(output, "JPEG", quality=85, optimize=True)
+    except UnidentifiedImageError:
+        raise ValueError("Not a supported image")
+    except (OSError, Image.DecompressionBombError) as e:
+        # Truncated or corrupt data, or absurd dimensions
+        raise ValueError(f"Unreadable image: {e}")
+
+    return {"width": width, "height": height, "format": image_format, "thumbnail": output.getvalue()}
+
+
+class ImageIngestor:
+    """Downloads, deduplicates, thumbnails and stores pending product images."""
+
+    def __init__(
+        self,
+        db: Session,
+        storage: Optional[ImageStorage] = None,
+        concurrency: int = 8,
+        thumbnail_size: int = 400,
+        process_workers: Optional[int] = None
+    ):
+        self.db = db
+        self.storage = storage or get_image_storage()
+        self.concurrency = concurrency
+        self.thumbnail_size = thumbnail_size
+        self.process_workers = process_workers
+
+    def pending_images(self, source_id: Optional[int] = None, limit: int = 1000) -> Dict[str, List[Tuple[int, int]]]:
+        """src_url -> (ID, attempts) of the pending ProductImage rows that use it."""
+        query = self.db.query(ProductImage.id, ProductImage.src_url, ProductImage.attempts).filter(
+            *pending_image_filter(datetime.utcnow())
+        )
+        if source_id:
+            query = query.join(Product, Product.id == ProductImage.product_id).filter(Product.source_id == source_id)
+
+        by_url: Dict[str, List[Tuple[int, int]]] = {}
+        for image_id, src_url, attempts in query.order_by(ProductImage.id).limit(limit):
+            by_url.setdefault(src_url, []).append((image_id, attempts or 0))
+        return by_url
+
+    async def run(self, source_id: Optional[int] = None, limit: int = 1000, stats: Optional[Dict] = None) -> Dict:
+        """
+        Ingest up to `limit` pending images.
+
+        Returns:
+            Dict with images, downloaded, deduplicated, stored, failed,
+            retrying, bytes_downloaded, errors and rate_limit
+        """
+        stats = stats if stats is not None else {}
+        stats.update({
+            "images": 0,
+            "downloaded": 0,
+            "deduplicated": 0,
+            "stored": 0,
+            "failed": 0,
+            "retrying": 0,
+            "bytes_downloaded": 0,
+            "errors": [],
+        })
+
+        by_url = self.pending_images(source_id, limit)
+        if not by_url:
+            return stats
+
+        urls = list(by_url)
+        limiter = FetchLimiter(self.concurrency, PER_HOST_LIMIT)
+        transport = make_rate_limited_transport(report=stats.setdefault("rate_limit", {}))
+        # Content hash -> its store task, shared by URLs serving the same bytes
+        stored: Dict[str, asyncio.Future] = {}
+
+        with ProcessPoolExecutor(max_workers=self.process_workers) as pool:
+            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, transport=transport) as client:
+                for batch_start in range(0, len(urls), IMAGE_BATCH_SIZE):
+                    batch = urls[batch_start:batch_start + IMAGE_BATCH_SIZE]
+                    results = await asyncio.gather(
+                        *(self._ingest(url, client, limiter, pool, stored, stats) for url in batch),
+                        return_exceptions=True
+                    )
+                    self._record(batch, results, by_url, stats)
+
+        return stats
+
+    async def _ingest(
+        self,
+        url: str,
+        client: httpx.AsyncClient,
+        limiter: FetchLimiter,
+        pool: ProcessPoolExecutor,
+        stored: Dict[str, asyncio.Future],
+        stats: Dict
+    ) -> Dict[str, Any]:
+        """Download one image and return its stored fields (sha1, URLs, dimensions)."""
+        data = await limiter.run(url, partial(self._download, url, client))
+        stats["downloaded"] += 1
+        stats["bytes_downloaded"] += len(data)
+
+        digest = hashlib.sha1(data).hexdigest()
+        if digest in stored:
+            stats["deduplicated"] += 1
+        else:
+            stored[digest] = asyncio.ensure_future(self._store(digest, data, pool, stats))
+        return {"sha1": digest, **await stored[digest]}
+
+    async def _download(self, url: str, client: httpx.AsyncClient) -> bytes:
+        """Stream an image body, giving up once it passes MAX_IMAGE_BYTES."""
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            length = response.headers.get("content-length", "")
+            if length.isdigit() and int(length) > MAX_IMAGE_BYTES:
+                raise ValueError(f"Image too large ({length} bytes)")
+
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    raise ValueError(f"Image too large (over {MAX_IMAGE_BYTES} bytes)")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def _store(self, digest: str, data: bytes, pool: ProcessPoolExecutor, stats: Dict) -> Dict[str, Any]:
+        """Stored fields for content, reusing an earlier copy of the same sha1."""
+        existing = self.db.query(
+            ProductImage.stored_url, ProductImage.thumb_url, ProductImage.width, ProductImage.height
+        ).filter(ProductImage.sha1 == digest, ProductImage.stored_url.isnot(None)).first()
+        if existing:
+            stats["deduplicated"] += 1
+            return dict(existing._mapping)
+
+        info = await asyncio.get_running_loop().run_in_executor(pool, process_image, data, self.thumbnail_size)
+        extension, content_type = IMAGE_FORMATS.get(info["format"], ("img", "application/octet-stream"))
+        prefix = f"{digest[:2]}/{digest}"
+
+        stored_url = await asyncio.to_thread(self.storage.save, f"originals/{prefix}.{extension}", data, content_type)
+        thumb_url = await asyncio.to_thread(
+            self.storage.save, f"thumbs/{self.thumbnail_size}/{prefix}.jpg", info["thumbnail"], "image/jpeg"
+        )
+        stats["stored"] += 1
+        return {"stored_url": stored_url, "thumb_url": thumb_url, "width": info["width"], "height": info["height"]}
+
+    def _record(
+        self,
+        urls: List[str],
+        results: List,
+        by_url: Dict[str, List[Tuple[int, int]]],
+        stats: Dict
+    ) -> None:
+        """Write a batch's outcomes to its ProductImage rows and commit."""
+        now = datetime.utcnow()
+        succeeded, failed, retrying = [], [], []
+        for url, result in zip(urls, results):
+            if not isinstance(result, Exception):
+                succeeded.extend({"id": image_id, **result, "fetched_at": now} for image_id, _ in by_url[url])
+                continue
+
+            error = str(result) or result.__class__.__name__
+            stats["errors"].append(f"Error ingesting image {url}: {error}")
+            permanent = is_permanent_failure(result)
+            for image_id, attempts in by_url[url]:
+                attempts += 1
+                if permanent or attempts >= MAX_IMAGE_ATTEMPTS:
+                    failed.append({"id": image_id, "error": error[:1000], "attempts": attempts, "fetched_at": now})
+                else:
+                    # Transient (timeout, connection reset, 5xx): stay pending, back off
+                    retry_at = now + timedelta(seconds=IMAGE_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+                    retrying.append({"id": image_id, "attempts": attempts, "next_attempt_at": retry_at, "fetched_at": now})
+
+        # One bulk UPDATE by primary key per set of changed columns
+        for rows in (succeeded, failed, retrying):
+            if rows:
+                self.db.execute(update(ProductImage), rows)
+        self.db.commit()
+
+        stats["images"] += len(succeeded) + len(failed) + len(retrying)
+        stats["failed"] += len(failed)
+        stats["retrying"] += len(retrying)
+
+
+async def ingest_images(
+    db: Session,
+    source_id: Optional[int] = None,
+    limit: int = 1000,
+    stats: Optional[Dict] = None
+) -> Dict:
+    """Run the image stage with settings (see ImageIngestor.run)."""
+    ingestor = ImageIngestor(
+        db,
+        concurrency=settings.IMAGE_CONCURRENCY,
+        thumbnail_size=settings.IMAGE_THUMBNAIL_SIZE,
+        process_workers=settings.IMAGE_PROCESS_WORKERS or None,
+    )
+    return await ingestor.run(source_id, limit, stats)
@@ -0,0 +1,133 @@
+"""
+Pluggable storage for ingested product images.
+
+The image pipeline (app/services/image_pipeline.py) stores each image once
+per content hash, plus a thumbnail, and records the URLs it gets back:
+
+- "local": files under IMAGE_STORAGE_DIR, served by the API at IMAGE_BASE_URL
+- "s3": objects in AWS_S3_BUCKET (needs boto3), public at AWS_S3_PUBLIC_URL
+  or the bucket's default endpoint
+
+Keys are content-addressed (originals/ab/abcdef....jpg), so saving the same key
+twice is a no-op and URLs never need invalidating.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class ImageStorage(ABC):
+    """Stores image bytes under a key and returns their public URL."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """True if an object is stored under key."""
+
+    @abstractmethod
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        """Store data (skipped if the key exists) and return its URL."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL of key."""
+
+
+class LocalImageStorage(ImageStorage):
+    """Files under a directory, served at base_url (see app.main)."""
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        path = self._path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return self.url(key)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3ImageStorage(ImageStorage):
+    """Objects in an S3 bucket."""
+
+    def __init__(
+        self,
+        bucket: str,
+        access_key_id: str = "",
+        secret_access_key: str = "",
+        public_url: str = ""
+    ):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("IMAGE_STORAGE=s3 requires boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.public_url = (public_url or f"https://{bucket}.s3.amazonaws.com").rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+        )
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return False
+        return True
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        if not self.exists(key):
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+                CacheControl="public, max-age=31536000, immutable",
+            )
+        return self.url(key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+_storage: Optional[ImageStorage] = None
+
+
+def get_image_storage() -> ImageStorage:
+    """The storage backend selected by IMAGE_STORAGE."""
+    global _storage
+    if _storage is None:
+        from app.core.config import settings
+
+        if settings.IMAGE_STORAGE == "s3":
+            if not settings.AWS_S3_BUCKET:
+                raise RuntimeError("IMAGE_STORAGE=s3 requires AWS_S3_BUCKET")
+            _storage = S3ImageStorage(
+                settings.AWS_S3_BUCKET,
+                settings.AWS_ACCESS_KEY_ID,
+                settings.AWS_SECRET_ACCESS_KEY,
+                settings.AWS_S3_PUBLIC_URL,
+            )
+        elif settings.IMAGE_STORAGE == "local":
+            _storage = LocalImageStorage(settings.IMAGE_STORAGE_DIR, settings.IMAGE_BASE_URL)
+        else:
+            raise RuntimeError(f"Unknown IMAGE_STORAGE: {settings.IMAGE_STORAGE}")
+    return _storage
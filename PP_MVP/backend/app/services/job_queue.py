@@ -0,0 +1,193 @@
+"""
+Database-backed job queue.
+
+The API enqueues jobs; worker processes (python -m app.worker) claim and run
+them. Any number of workers can poll the same table:
+
+- claim_job() picks the oldest queued job, or a running job whose lease
+  expired, with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers never
+  claim the same row and never wait on each other.
+- heartbeat() renews the lease and stores progress counters; it only succeeds
+  for the worker holding the lease.
+- complete_job() / fail_job() record the outcome.
+- reap_expired_jobs() fails jobs whose lease expired after max_attempts.
+
+Each function commits its own short transaction; use a session dedicated to
+job bookkeeping, not the one the job's work runs on.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Iterable
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+
+
+JOB_KINDS = ("scrape", "parse", "images")
+
+# Statuses a job can no longer leave
+FINISHED_STATUSES = ("completed", "failed")
+
+# Statuses of jobs still waiting or running
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    params: Dict,
+    max_attempts: int = 3,
+    commit: bool = True,
+    now: Optional[datetime] = None
+) -> Job:
+    """Insert a queued job and return it (commit=False: flush only, caller commits)."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    job = Job(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        status="queued",
+        params=params,
+        source_id=params.get("source_id"),
+        attempts=0,
+        max_attempts=max_attempts,
+        created_at=now or datetime.utcnow(),
+    )
+    db.add(job)
+    if not commit:
+        db.flush()
+        return job
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_job(
+    db: Session,
+    worker_id: str,
+    lease_seconds: int,
+    kinds: Optional[Iterable[str]] = None
+) -> Optional[Job]:
+    """
+    Claim the oldest runnable job for this worker.
+
+    Runnable means queued, or running with an expired lease and attempts
+    left. Rows locked by another worker's claim are skipped.
+
+    Returns:
+        The claimed job (status running, lease set), or None if there is none
+    """
+    now = datetime.utcnow()
+    query = db.query(Job).filter(or_(
+        Job.status == "queued",
+        and_(
+            Job.status == "running",
+            Job.lease_expires_at < now,
+            Job.attempts < Job.max_attempts,
+        ),
+    ))
+    if kinds:
+        query = query.filter(Job.kind.in_(list(kinds)))
+
+    job = query.order_by(Job.created_at, Job.id).with_for_update(skip_locked=True).first()
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.locked_by = worker_id
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = job.started_at or now
+    job.heartbeat_at = now
+    job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+    job.error = None
+    db.commit()
+    return job
+
+
+def heartbeat(
+    db: Session,
+    job_id: str,
+    worker_id: str,
+    lease_seconds: int,
+    progress: Optional[Dict] = None
+) -> bool:
+    """
+    Renew a job's lease and store its progress counters.
+
+    Returns:
+        False if the worker no longer holds the lease (the job was reclaimed)
+    """
+    now = datetime.utcnow()
+    values = {"heartbeat_at": now, "lease_expires_at": now + timedelta(seconds=lease_seconds)}
+    if progress is not None:
+        values["progress"] = progress
+
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "running")
+        .values(**values)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def _finish(db: Session, job_id: str, worker_id: str, values: Dict) -> bool:
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "running")
+        .values(completed_at=datetime.utcnow(), lease_expires_at=None, **values)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def complete_job(db: Session, job_id: str, worker_id: str, result: Dict, error: Optional[str] = None) -> bool:
+    """Mark a job completed with its final counters (error: non-fatal summary)."""
+    return _finish(db, job_id, worker_id, {
+        "status": "completed",
+        "result": result,
+        "progress": result,
+        "error": error,
+    })
+
+
+def fail_job(db: Session, job_id: str, worker_id: str, error: str, progress: Optional[Dict] = None) -> bool:
+    """Mark a job failed."""
+    values = {"status": "failed", "error": error}
+    if progress is not None:
+        values["progress"] = progress
+    return _finish(db, job_id, worker_id, values)
+
+
+def reap_expired_jobs(db: Session) -> int:
+    """Fail running jobs whose lease expired with no attempts left."""
+    now = datetime.utcnow()
+    result = db.execute(
+        update(Job)
+        .where(
+            Job.status == "running",
+            Job.lease_expires_at < now,
+            Job.attempts >= Job.max_attempts,
+        )
+        .values(status="failed", error="Lease expired (worker lost)", completed_at=now, lease_expires_at=None)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def get_job(db: Session, job_id: str) -> Optional[Job]:
+    return db.query(Job).filter(Job.id == job_id).first()
+
+
+def list_jobs(db: Session, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    """Most recent jobs first."""
+    query = db.query(Job)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    if status:
+        query = query.filter(Job.status == status)
+    return query.order_by(Job.created_at.desc()).limit(limit).all()
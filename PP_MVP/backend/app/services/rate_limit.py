@@ -0,0 +1,332 @@
+"""
+Per-host adaptive rate limiting for outbound requests to retailer sites.
+
+RateLimitedTransport wraps the httpx transport of every client that talks to
+retailers (scraper, selector detection, selector testing). Each request
+first takes a slot from its host's token bucket in the process-wide
+HostRateLimiter:
+
+- Buckets start at RATE_LIMIT_DEFAULT_RPS with a RATE_LIMIT_BURST burst.
+- robots.txt is read once per host (re-read daily); a Crawl-delay caps the
+  host's rate at one request per delay.
+- 429 and 503 halve the rate (down to RATE_LIMIT_MIN_RPS) and honor
+  Retry-After; the request is retried when the wait is short.
+- Every RAMP_UP_AFTER consecutive successes raise the rate by RAMP_UP_FACTOR,
+  up to RATE_LIMIT_MAX_RPS or the Crawl-delay cap.
+
+Buckets are reserved synchronously (no awaits between reading and updating a
+bucket), so concurrent coroutines share them without locks and the limiter
+works across event loops (the worker runs one loop per job).
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Set
+
+import httpx
+
+
+# Adaptive backoff / ramp-up
+BACKOFF_FACTOR = 0.5
+RAMP_UP_FACTOR = 1.25
+RAMP_UP_AFTER = 20
+THROTTLE_STATUSES = (429, 503)
+
+# Retry throttled requests when the server asks us to wait at most this long
+MAX_RETRY_AFTER_SECONDS = 60
+MAX_RETRIES = 2
+
+# robots.txt is re-read after this long
+ROBOTS_TTL_SECONDS = 24 * 3600
+ROBOTS_POLL_SECONDS = 0.05
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def robots_crawl_delay(robots_txt: str, user_agent: str = "*") -> Optional[float]:
+    """
+    Crawl-delay for a user agent from robots.txt (the "*" group as fallback).
+
+    urllib.robotparser only accepts whole seconds, so groups are read here.
+
+    Examples:
+        >>> robots_crawl_delay("User-agent: *\\nCrawl-delay: 0.5\\n")
+        0.5
+        >>> robots_crawl_delay("User-agent: bot\\nCrawl-delay: 5\\n\\nUser-agent: *\\nDisallow: /cart")
+    """
+    delays: Dict[str, float] = {}
+    agents = []
+    in_rules = False
+    for line in robots_txt.splitlines():
+        key, _, value = line.split("#", 1)[0].partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if key == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+        elif key:
+            in_rules = True
+            if key == "crawl-delay":
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for agent in agents:
+                    delays.setdefault(agent, delay)
+
+    user_agent = user_agent.lower()
+    for agent, delay in delays.items():
+        if agent != "*" and agent in user_agent:
+            return delay
+    return delays.get("*")
+
+
+class HostBucket:
+    """Token bucket for one host, kept in GCRA form (theoretical arrival time)."""
+
+    def __init__(self, rate: float, burst: int, min_rate: float, max_rate: float):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.crawl_delay: Optional[float] = None
+        self.robots_checked_at: Optional[float] = None
+        self.robots_pending = False
+        self.tat = 0.0  # Time the bucket would be full again
+        self.blocked_until = 0.0  # Retry-After deadline
+        self.successes = 0
+        self.requests = 0
+        self.throttled = 0
+
+    @property
+    def ceiling(self) -> float:
+        """Highest allowed rate (Crawl-delay caps it)."""
+        if self.crawl_delay:
+            return min(self.max_rate, 1.0 / self.crawl_delay)
+        return self.max_rate
+
+    def reserve(self, now: float) -> float:
+        """Take the next slot; returns seconds to wait before sending."""
+        interval = 1.0 / self.rate
+        # With a Crawl-delay, requests are spaced evenly (no burst)
+        tolerance = 0.0 if self.crawl_delay else (self.burst - 1) * interval
+        start = max(now, self.tat - tolerance, self.blocked_until)
+        self.tat = max(self.tat, start) + interval
+        self.requests += 1
+        return start - now
+
+    def on_success(self) -> None:
+        self.successes += 1
+        if self.successes >= RAMP_UP_AFTER:
+            self.successes = 0
+            self.rate = min(self.ceiling, self.rate * RAMP_UP_FACTOR)
+
+    def on_throttled(self, now: float, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self.successes = 0
+        self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+        wait = retry_after if retry_after is not None else 1.0 / self.rate
+        self.blocked_until = max(self.blocked_until, now + wait)
+
+    def set_crawl_delay(self, delay: Optional[float]) -> None:
+        self.crawl_delay = delay if delay and delay > 0 else None
+        self.rate = min(self.rate, self.ceiling)
+
+    def state(self, now: float) -> Dict:
+        return {
+            "rate": round(self.rate, 3),
+            "crawl_delay": self.crawl_delay,
+            "blocked_for": round(max(0.0, self.blocked_until - now), 1),
+            "requests": self.requests,
+            "throttled": self.throttled,
+        }
+
+
+class HostRateLimiter:
+    """Process-wide per-host buckets."""
+
+    def __init__(
+        self,
+        default_rate: float = 2.0,
+        burst: int = 4,
+        min_rate: float = 0.1,
+        max_rate: float = 8.0,
+        respect_robots: bool = True
+    ):
+        self.default_rate = default_rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.respect_robots = respect_robots
+        self.buckets: Dict[str, HostBucket] = {}
+
+    def bucket(self, host: str) -> HostBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(min(self.default_rate, self.max_rate), self.burst, self.min_rate, self.max_rate)
+            self.buckets[host] = bucket
+        return bucket
+
+    def needs_robots(self, host: str, now: float) -> bool:
+        """True once per ROBOTS_TTL_SECONDS per host (marks the check as started)."""
+        if not self.respect_robots:
+            return False
+        bucket = self.bucket(host)
+        if bucket.robots_checked_at is not None and now - bucket.robots_checked_at < ROBOTS_TTL_SECONDS:
+            return False
+        bucket.robots_checked_at = now
+        bucket.robots_pending = True
+        return True
+
+    def state(self, hosts: Optional[Set[str]] = None) -> Dict[str, Dict]:
+        now = time.monotonic()
+        return {
+            host: bucket.state(now)
+            for host, bucket in self.buckets.items()
+            if hosts is None or host in hosts
+        }
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that paces requests per host with a HostRateLimiter."""
+
+    def __init__(
+        self,
+        limiter: HostRateLimiter,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        report: Optional[Dict] = None
+    ):
+        """
+        Args:
+            limiter: Shared per-host buckets
+            transport: Transport that sends the requests (default: plain HTTP)
+            report: Optional dict kept up to date with stats() after every request
+        """
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.report = report
+        self.hosts: Set[str] = set()
+        self.waited_seconds = 0.0
+        self.retries = 0
+
+    async def _wait_for_slot(self, host: str) -> None:
+        wait = self.limiter.bucket(host).reserve(time.monotonic())
+        if wait > 0:
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+
+    async def _load_robots(self, request: httpx.Request) -> None:
+        """Read the host's robots.txt Crawl-delay (failures mean no delay)."""
+        host = request.url.host
+        robots_request = httpx.Request(
+            "GET",
+            request.url.copy_with(path="/robots.txt", query=None, fragment=None),
+            headers={"User-Agent": request.headers.get("User-Agent", "*")},
+        )
+        bucket = self.limiter.bucket(host)
+        await self._wait_for_slot(host)
+        try:
+            response = await self.transport.handle_async_request(robots_request)
+            body = await response.aread()
+            await response.aclose()
+            if response.status_code == 200:
+                robots_txt = body.decode("utf-8", errors="replace")
+                bucket.set_crawl_delay(robots_crawl_delay(robots_txt, request.headers.get("User-Agent", "*")))
+        except httpx.HTTPError:
+            pass
+        finally:
+            bucket.robots_pending = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.hosts.add(host)
+
+        bucket = self.limiter.bucket(host)
+        if request.url.path != "/robots.txt":
+            if self.limiter.needs_robots(host, time.monotonic()):
+                await self._load_robots(request)
+            # Requests arriving while another one reads robots.txt wait for its Crawl-delay
+            while bucket.robots_pending:
+                await asyncio.sleep(ROBOTS_POLL_SECONDS)
+        for attempt in range(MAX_RETRIES + 1):
+            await self._wait_for_slot(host)
+            response = await self.transport.handle_async_request(request)
+
+            if response.status_code not in THROTTLE_STATUSES:
+                # Only 2xx/3xx speed the host back up: errors are not a sign of spare capacity
+                if response.status_code < 400:
+                    bucket.on_success()
+                break
+
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            bucket.on_throttled(time.monotonic(), retry_after)
+            if attempt == MAX_RETRIES or (retry_after or 0) > MAX_RETRY_AFTER_SECONDS:
+                break
+
+            await response.aclose()
+            self.retries += 1
+
+        if self.report is not None:
+            self.report.update(self.stats())
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def stats(self) -> Dict:
+        """
+        Limiter activity for this client.
+
+        Returns:
+            Dict with waited_seconds (delay added, summed over requests),
+            retries (throttled requests re-sent) and hosts (state of each host
+            this client called)
+        """
+        return {
+            "waited_seconds": round(self.waited_seconds, 2),
+            "retries": self.retries,
+            "hosts": self.limiter.state(self.hosts),
+        }
+
+
+_limiter: Optional[HostRateLimiter] = None
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """The process-wide limiter, configured from settings."""
+    global _limiter
+    if _limiter is None:
+        from app.core.config import settings
+
+        _limiter = HostRateLimiter(
+            default_rate=settings.RATE_LIMIT_DEFAULT_RPS,
+            burst=settings.RATE_LIMIT_BURST,
+            min_rate=settings.RATE_LIMIT_MIN_RPS,
+            max_rate=settings.RATE_LIMIT_MAX_RPS,
+            respect_robots=settings.RATE_LIMIT_RESPECT_ROBOTS,
+        )
+    return _limiter
+
+
+def make_rate_limited_transport(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    report: Optional[Dict] = None
+) -> RateLimitedTransport:
+    """Transport for clients that call retailer sites (wraps `transport`)."""
+    return RateLimitedTransport(get_rate_limiter(), transport, report)
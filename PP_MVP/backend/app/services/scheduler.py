@@ -0,0 +1,169 @@
+"""
+Recurring scrape scheduler.
+
+Sources with a scrape_interval_minutes are scraped again once the interval
+has passed since their last run. Each tick (see app/scheduler.py):
+
+- A source is due at anchor + interval + its jitter offset. The anchor is
+  the later of last_run_at and its latest scrape job, so a failing source
+  waits a full interval instead of being re-queued every tick.
+- The jitter offset is a fixed per-source fraction of the interval
+  (SCHEDULER_JITTER_FRACTION), so sources added together drift apart instead
+  of all coming due at the same moment.
+- Sources with a queued or running scrape job are skipped.
+- Due sources are queued by priority (highest first), then by how overdue
+  they are, while fewer than SCHEDULER_MAX_ACTIVE_SCRAPES scrape jobs are
+  queued or running (manually triggered scrapes count too).
+- While scraped images are pending, one "images" job is kept queued
+  (see app/services/image_pipeline.py).
+
+The clock is injected, so ticks can be tested with a fake one.
+"""
+
+import zlib
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.models.scraper import ProductImage, Source
+from app.services.image_pipeline import pending_image_filter
+from app.services.job_queue import ACTIVE_STATUSES, enqueue_job
+
+
+def jitter_offset(source_id: int, interval: timedelta, fraction: float) -> timedelta:
+    """
+    Fixed per-source delay added to each interval (0 to fraction * interval).
+
+    Examples:
+        >>> jitter_offset(7, timedelta(hours=1), 0.1) == jitter_offset(7, timedelta(hours=1), 0.1)
+        True
+        >>> jitter_offset(7, timedelta(hours=1), 0.1) <= timedelta(minutes=6)
+        True
+    """
+    spread = (zlib.crc32(str(source_id).encode()) % 1000) / 1000
+    return interval * (fraction * spread)
+
+
+class ScrapeScheduler:
+    """Queues scrape jobs for sources whose interval has elapsed."""
+
+    def __init__(
+        self,
+        max_active: int = 4,
+        jitter_fraction: float = 0.1,
+        max_pages: int = 5,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        """
+        Args:
+            max_active: Cap on queued + running scrape jobs
+            jitter_fraction: Largest per-source offset, as a fraction of its interval
+            max_pages: max_pages passed to scheduled scrapes
+            clock: Returns the current naive UTC time (fake it in tests)
+        """
+        self.max_active = max_active
+        self.jitter_fraction = jitter_fraction
+        self.max_pages = max_pages
+        self.clock = clock
+
+    def _latest_jobs(self, db: Session) -> Dict[int, datetime]:
+        """Creation time of each source's latest scrape job."""
+        rows = (
+            db.query(Job.source_id, func.max(Job.created_at))
+            .filter(Job.kind == "scrape", Job.source_id.isnot(None))
+            .group_by(Job.source_id)
+            .all()
+        )
+        return {source_id: created_at for source_id, created_at in rows}
+
+    def due_sources(self, db: Session) -> List[Tuple[Source, datetime]]:
+        """
+        Scheduled sources that are due and have no active scrape job.
+
+        Returns:
+            (source, due_at) pairs, highest priority then most overdue first
+        """
+        now = self.clock()
+        sources = (
+            db.query(Source)
+            .filter(Source.enabled.is_(True), Source.scrape_interval_minutes.isnot(None))
+            .all()
+        )
+        latest_jobs = self._latest_jobs(db)
+        active = {
+            source_id for (source_id,) in
+            db.query(Job.source_id)
+            .filter(Job.kind == "scrape", Job.status.in_(ACTIVE_STATUSES), Job.source_id.isnot(None))
+            .all()
+        }
+
+        due = []
+        for source in sources:
+            if source.id in active:
+                continue
+            anchors = [at for at in (source.last_run_at, latest_jobs.get(source.id)) if at]
+            if not anchors:
+                due.append((source, now))  # Never run
+                continue
+            interval = timedelta(minutes=source.scrape_interval_minutes)
+            due_at = max(anchors) + interval + jitter_offset(source.id, interval, self.jitter_fraction)
+            if due_at <= now:
+                due.append((source, due_at))
+
+        due.sort(key=lambda item: (-(item[0].scrape_priority or 0), item[1], item[0].id))
+        return due
+
+    def tick(self, db: Session) -> List[Job]:
+        """
+        Queue scrape jobs for due sources, up to the concurrency cap, and an
+        images job when scraped images await ingestion.
+
+        Returns:
+            The jobs queued by this tick
+        """
+        jobs = self._queue_images(db)
+
+        active = (
+            db.query(func.count(Job.id))
+            .filter(Job.kind == "scrape", Job.status.in_(ACTIVE_STATUSES))
+            .scalar()
+        )
+        slots = self.max_active - active
+        if slots <= 0:
+            return jobs
+
+        now = self.clock()
+        jobs += [
+            enqueue_job(db, "scrape", {
+                "source_id": source.id,
+                "max_pages": self.max_pages,
+                "scheduled": True,
+            }, commit=False, now=now)
+            for source, _ in self.due_sources(db)[:slots]
+        ]
+        db.commit()
+        return jobs
+
+    def _queue_images(self, db: Session) -> List[Job]:
+        """One images job at a time, while ProductImage rows are pending."""
+        active = db.query(Job.id).filter(Job.kind == "images", Job.status.in_(ACTIVE_STATUSES)).first()
+        if active:
+            return []
+        pending = db.query(ProductImage.id).filter(*pending_image_filter(self.clock())).first()
+        if not pending:
+            return []
+        return [enqueue_job(db, "images", {"source_id": None, "scheduled": True}, now=self.clock())]
+
+
+def make_scheduler(clock: Optional[Callable[[], datetime]] = None) -> ScrapeScheduler:
+    """Scheduler configured from settings."""
+    from app.core.config import settings
+
+    return ScrapeScheduler(
+        max_active=settings.SCHEDULER_MAX_ACTIVE_SCRAPES,
+        jitter_fraction=settings.SCHEDULER_JITTER_FRACTION,
+        max_pages=settings.SCHEDULER_MAX_PAGES,
+        clock=clock or datetime.utcnow,
+    )
@@ -4,16 +4,65 @@ Wine scraper service.
 Handles scraping wine products from retailer websites.
 """
 
-import hashlib
-import re
+import asyncio
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import partial
+from typing import List, Dict, Any, Optional, Awaitable, Callable, Tuple
+from urllib.parse import urljoin, urlparse
+from sqlalchemy import func, insert, update
 from sqlalchemy.orm import Session
-from bs4 import BeautifulSoup
 import httpx
 
-from app.models.scraper import Source, ScrapedWine, Product, ProductSnapshot, ProductImage
-from app.schemas.scraper import ProductSnapshotCreate
+from app.core.config import settings
+from app.models.scraper import Source, ScrapedWine, Product, ProductSnapshot, ProductImage, CrawlFrontierEntry
+from app.services.catalog_api import CatalogUnavailable, catalog_platforms, iter_catalog_pages
+from app.services.dedupe_index import index_new_wines
+from app.services import frontier
+from app.services.extract import extract_product_details, parse_price
+from app.services.html_archive import get_archive, archive_page, record_archived_pages
+from app.services.html_parser import parse_html
+from app.services.http_cache import make_caching_transport, is_revalidated
+from app.services.rate_limit import make_rate_limited_transport
+from app.services.sitemaps import SITEMAP_BATCH_SIZE, discover_urls, plan_sitemap_fetches
+from app.services.snapshots import mark_seen, record_snapshots, with_latest_snapshot
+
+
+# Product pages fetched in parallel per source (1 = sequential)
+DEFAULT_CONCURRENCY = 8
+
+# Politeness cap on simultaneous requests to one host
+PER_HOST_LIMIT = 4
+
+# Frontier retries due within this long are waited for instead of left to the next run
+FRONTIER_RETRY_WAIT_SECONDS = 60
+
+# Product titles that are collection/navigation pages, not wines
+JUNK_PRODUCT_TITLES = [
+    'Collection:Wine', 'Wine', 'Sparkling', 'Champagne', 'Pink', 'Orange', 'White', 'Red',
+    'Unicorn Wines', 'Staff Favorites', 'Merch + Lifestyle', 'Gifts',
+]
+
+
+def normalize_product_url(url: str) -> str:
+    """Product URL as stored (canonical, see app.services.frontier.canonical_product_url)."""
+    return frontier.canonical_product_url(url)
+
+
+class FetchLimiter:
+    """Bounds in-flight fetches overall and per host."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, per_host: int = PER_HOST_LIMIT):
+        self.per_host = max(1, per_host)
+        self._overall = asyncio.Semaphore(max(1, concurrency))
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def run(self, url: str, fetch: Callable[[], Awaitable]):
+        """Call and await fetch() once both the host and the overall slot are free."""
+        host = urlparse(url).netloc
+        host_slot = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with host_slot:
+            async with self._overall:
+                return await fetch()
 
 
 class WineScraperService:
@@ -21,21 +70,46 @@ class WineScraperService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.archive = get_archive()
 
     async def scrape_source(
         self, 
         source_id: int, 
-        max_pages: int = 5
+        max_pages: int = 5,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        stats: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Scrape a source and return statistics.
         
+        Sources with a catalog strategy are read from their Shopify or
+        WooCommerce JSON catalog, falling back to HTML when the store does not
+        serve it. The "sitemap" strategy takes product URLs from the site's
+        sitemaps instead of listing pages.
+        
+        HTML and sitemap crawls run over the source's persistent frontier
+        (see app/services/frontier.py): listing and product pages are fetched
+        in mixed batches (at most `concurrency` in flight for the source,
+        PER_HOST_LIMIT per host) while this coroutine stays the only writer to
+        the session. A pass interrupted by a crash is resumed by the next run.
+        
         Args:
             source_id: ID of the source to scrape
             max_pages: Maximum number of pages to scrape
+            concurrency: Product pages fetched in parallel (1 = sequential)
+            stats: Dict to collect statistics in (updated live, for job progress)
             
         Returns:
-            Dict with statistics: products_found, wines_created, snapshots_created
+            Dict with statistics: products_found, wines_created, snapshots_created,
+            errors, strategy ("html", "sitemap", "shopify" or "woocommerce"),
+            sitemap (discovery counts), pages_scraped, resumed, frontier
+            (entries per state), not_modified, http_cache (requests,
+            hits, hit_rate, bytes_saved, errors) and rate_limit (waited_seconds, retries,
+            per-host rate / crawl_delay / throttled counts)
+
+        Raises:
+            Exception: When the scrape fails outright (nothing could be
+                fetched, database error); the error is also in stats["errors"]
         """
         source = self.db.query(Source).filter(Source.id == source_id).first()
         if not source:
@@ -44,168 +118,486 @@ class WineScraperService:
         if not source.enabled:
             raise ValueError(f"Source {source.name} is disabled")
 
-        stats = {
+        stats = stats if stats is not None else {}
+        stats.update({
             "products_found": 0,
             "wines_created": 0,
             "snapshots_created": 0,
             "errors": []
-        }
+        })
+
+        limiter = FetchLimiter(concurrency, PER_HOST_LIMIT)
+        # Paces every request to the retailer (catalog, sitemaps, pages); state is live in stats
+        transport = make_rate_limited_transport(report=stats.setdefault("rate_limit", {}))
+        # The cache sits on top, so its own refetches are paced too
+        cache = make_caching_transport(transport)
+        transport = cache or transport
 
         try:
             # Simple scraping logic - can be extended with Playwright
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                current_url = source.base_url
-                pages_scraped = 0
-
-                while current_url and pages_scraped < max_pages:
-                    try:
-                        response = await client.get(current_url)
-                        response.raise_for_status()
-                        soup = BeautifulSoup(response.text, 'html.parser')
-
-                        # Find product links
-                        if source.product_link_selector:
-                            product_links = soup.select(source.product_link_selector)
-                            
-                            for link in product_links:
-                                product_url = link.get('href', '')
-                                if not product_url:
-                                    continue
-
-                                # Make absolute URL
-                                if not product_url.startswith('http'):
-                                    from urllib.parse import urljoin
-                                    product_url = urljoin(source.base_url, product_url)
-
-                                # Process product
-                                try:
-                                    await self._process_product(source, product_url, client)
-                                    stats["products_found"] += 1
-                                except Exception as e:
-                                    stats["errors"].append(f"Error processing {product_url}: {str(e)}")
-
-                        # Find next page
-                        current_url = None
-                        if source.pagination_next_selector:
-                            next_link = soup.select_one(source.pagination_next_selector)
-                            if next_link:
-                                next_url = next_link.get('href', '')
-                                if next_url:
-                                    from urllib.parse import urljoin
-                                    current_url = urljoin(source.base_url, next_url)
-
-                        pages_scraped += 1
-
-                    except Exception as e:
-                        stats["errors"].append(f"Error scraping page {current_url}: {str(e)}")
+            async with httpx.AsyncClient(timeout=30.0, transport=transport) as client:
+                stats["strategy"] = "html"
+                for platform in catalog_platforms(source.scrape_strategy):
+                    if await self._scrape_catalog(source, platform, client, max_pages, stats):
+                        stats["strategy"] = platform
                         break
 
+                if source.scrape_strategy == "sitemap":
+                    stats["strategy"] = "sitemap"
+                    await self._scrape_sitemaps(source, client, limiter, max_pages, stats)
+                elif stats["strategy"] == "html":
+                    await self._scrape_listing_pages(source, client, limiter, max_pages, stats)
+
+            if stats["errors"] and not (stats["products_found"] or stats.get("pages_scraped")):
+                # Nothing could be fetched (source down, blocked, wrong URL): fail the job
+                raise RuntimeError(f"Nothing fetched from {source.base_url}: {stats['errors'][0]}")
+
             # Update source last_run_at
             source.last_run_at = datetime.utcnow()
             self.db.commit()
 
         except Exception as e:
+            # Recorded for the job's progress; re-raised so the worker marks the job failed
+            self.db.rollback()
             stats["errors"].append(f"Fatal error: {str(e)}")
+            raise
+
+        finally:
+            if cache:
+                stats["http_cache"] = cache.stats()
+                cache.store.close()
 
         return stats
 
-    async def _process_product(
-        self, 
-        source: Source, 
-        product_url: str, 
-        client: httpx.AsyncClient
+    async def _scrape_catalog(
+        self,
+        source: Source,
+        platform: str,
+        client: httpx.AsyncClient,
+        max_pages: int,
+        stats: Dict[str, Any]
+    ) -> bool:
+        """
+        Scrape a source from its Shopify/WooCommerce JSON catalog.
+        
+        Each catalog page (up to 250 products) is saved as one batch.
+        
+        Returns:
+            False if the store does not serve the catalog (caller falls back to HTML)
+        """
+        try:
+            async for products in iter_catalog_pages(client, platform, source.base_url, max_pages):
+                fetched = [(product["product_url"], product) for product in products]
+                try:
+                    stats["snapshots_created"] += self._save_products(source, fetched)
+                    stats["products_found"] += len(fetched)
+                except Exception as e:
+                    self.db.rollback()
+                    stats["errors"].append(f"Error saving {platform} catalog page: {str(e)}")
+        except CatalogUnavailable:
+            return False
+        except Exception as e:
+            stats["errors"].append(f"Error reading {platform} catalog: {str(e)}")
+        return True
+
+    async def _scrape_sitemaps(
+        self,
+        source: Source,
+        client: httpx.AsyncClient,
+        limiter: "FetchLimiter",
+        max_pages: int,
+        stats: Dict[str, Any]
     ) -> None:
         """
-        Process a single product page.
+        Discover product URLs from the site's sitemaps and crawl them.
         
-        Args:
-            source: Source object
-            product_url: URL of the product
-            client: HTTP client
+        URLs changed since the last run go first; known products whose
+        lastmod predates it are skipped. At most max_pages *
+        SITEMAP_BATCH_SIZE products seed the frontier pass. An unfinished
+        pass is resumed without re-reading the sitemaps.
         """
-        # Check if product already exists
-        existing_product = self.db.query(Product).filter(
-            Product.product_url == product_url
-        ).first()
-
-        if not existing_product:
-            # Create new product
-            product = Product(
-                source_id=source.id,
-                product_url=product_url,
-                title_raw="",  # Will be filled by detailed scraper
-                created_at=datetime.utcnow()
+        if not frontier.has_pending(self.db, source.id):
+            sitemap_stats = {}
+            entries = await discover_urls(
+                client,
+                source.base_url,
+                pattern=source.sitemap_url_pattern,
+                since=source.last_run_at,
+                stats=sitemap_stats
             )
-            self.db.add(product)
-            self.db.flush()
+            stats["errors"].extend(sitemap_stats.pop("errors"))
+
+            # Stored product URL -> last time a scrape saw it (latest snapshot)
+            last_seen = func.coalesce(ProductSnapshot.last_seen_at, ProductSnapshot.fetched_at)
+            known = dict(
+                with_latest_snapshot(self.db.query(Product.product_url), last_seen)
+                .filter(Product.source_id == source.id)
+            )
+            normalized = {normalize_product_url(url): lastmod for url, lastmod in entries.items()}
+            product_urls, skipped = plan_sitemap_fetches(normalized, known, since=source.last_run_at)
+
+            sitemap_stats["skipped_unchanged"] = skipped
+            stats["sitemap"] = sitemap_stats
+            frontier.start_pass(self.db, source.id, [
+                (url, "product") for url in product_urls[:max_pages * SITEMAP_BATCH_SIZE]
+            ])
         else:
-            product = existing_product
+            stats["resumed"] = True
 
-        # Fetch product details
-        try:
-            response = await client.get(product_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Extract basic data (this is a simple example - customize per source)
-            title = soup.find('h1')
-            title_text = title.get_text(strip=True) if title else ""
-
-            # Try to find price (common selectors)
-            price_text = None
-            for selector in ['.price', '.product-price', '[itemprop="price"]']:
-                price_elem = soup.select_one(selector)
-                if price_elem:
-                    price_text = price_elem.get_text(strip=True)
-                    break
+        await self._crawl_frontier(source, client, limiter, max_pages, stats)
+
+    async def _scrape_listing_pages(
+        self,
+        source: Source,
+        client: httpx.AsyncClient,
+        limiter: "FetchLimiter",
+        max_pages: int,
+        stats: Dict[str, Any]
+    ) -> None:
+        """Crawl listing pages from base_url (or resume the unfinished pass), following the pagination selector."""
+        if frontier.has_pending(self.db, source.id):
+            stats["resumed"] = True
+        else:
+            frontier.start_pass(self.db, source.id, [(frontier.canonicalize_url(source.base_url), "listing")])
 
-            # Parse price
-            price_cents = self._parse_price(price_text) if price_text else None
-
-            # Create snapshot
-            snapshot = ProductSnapshot(
-                product_id=product.id,
-                fetched_at=datetime.utcnow(),
-                price_cents=price_cents,
-                currency="USD",
-                in_stock=True,  # Simplified - should check stock status
-                title_raw=title_text,
-                availability_raw="In Stock"  # Simplified
+        await self._crawl_frontier(source, client, limiter, max_pages, stats)
+
+    async def _crawl_frontier(
+        self,
+        source: Source,
+        client: httpx.AsyncClient,
+        limiter: "FetchLimiter",
+        max_pages: int,
+        stats: Dict[str, Any]
+    ) -> None:
+        """
+        Work through the source's frontier pass in batches.
+        
+        Each batch mixes listing pages and product pages, so products of one
+        page are fetched while the next listing page is. Entries waiting on a
+        retry backoff are waited for when due within FRONTIER_RETRY_WAIT_SECONDS;
+        later ones are given up on when the pass is closed.
+        """
+        while True:
+            now = datetime.utcnow()
+            batch = frontier.next_batch(self.db, source.id, now)
+            if not batch:
+                retry_at = frontier.next_eligible_at(self.db, source.id)
+                if retry_at is None or (retry_at - now).total_seconds() > FRONTIER_RETRY_WAIT_SECONDS:
+                    break
+                await asyncio.sleep(max(0.0, (retry_at - now).total_seconds()))
+                continue
+
+            await self._crawl_batch(source, batch, client, limiter, max_pages, stats)
+
+        frontier.finish_pass(self.db, source.id)
+        stats["frontier"] = frontier.frontier_counts(self.db, source.id)
+
+    async def _crawl_batch(
+        self,
+        source: Source,
+        batch: List[CrawlFrontierEntry],
+        client: httpx.AsyncClient,
+        limiter: "FetchLimiter",
+        max_pages: int,
+        stats: Dict[str, Any]
+    ) -> None:
+        """
+        Fetch a batch of frontier entries concurrently and record the results.
+        
+        Listing results (new frontier entries, entry states) are committed
+        first; fetched products are then saved together with their entries'
+        fetched state, so a crash never marks an unsaved product fetched.
+        """
+        product_entries = [entry for entry in batch if entry.kind == "product"]
+        known_urls = {
+            url for (url,) in self.db.query(Product.product_url).filter(
+                Product.product_url.in_([entry.url for entry in product_entries])
             )
-            self.db.add(snapshot)
+        }
+
+        fetches = []
+        for entry in batch:
+            if entry.kind == "listing":
+                fetch = partial(self._fetch_listing, entry.url, client, source)
+            else:
+                fetch = partial(
+                    self._fetch_product,
+                    entry.url,
+                    client,
+                    skip_unchanged=entry.url in known_urls,
+                    source_id=source.id,
+                    parser_backend=source.parser_backend
+                )
+            fetches.append(asyncio.ensure_future(limiter.run(entry.url, fetch)))
+
+        fetched = []
+        fetched_entries = []
+        not_modified = []
+        done_ids = []
+        failures = []
+        archived = []
+        try:
+            for entry, fetch in zip(batch, fetches):
+                try:
+                    result = await fetch
+                except Exception as e:
+                    kind = "page" if entry.kind == "listing" else "product"
+                    stats["errors"].append(f"Error scraping {kind} {entry.url}: {str(e)}")
+                    failures.append((entry, str(e) or e.__class__.__name__, frontier.is_retryable(e)))
+                    continue
+
+                if entry.kind == "listing":
+                    product_urls, next_url, page = result
+                    frontier.enqueue(self.db, source.id, product_urls, "product", depth=entry.depth)
+                    # Pagination stops after max_pages listing pages
+                    if next_url and entry.depth + 1 < max_pages:
+                        frontier.enqueue(self.db, source.id, [next_url], "listing", depth=entry.depth + 1)
+                    if page:
+                        archived.append(page)
+                    done_ids.append(entry.id)
+                    stats["pages_scraped"] = stats.get("pages_scraped", 0) + 1
+                elif result is None:
+                    # 304 Not Modified: nothing to parse, the latest snapshot was seen again
+                    not_modified.append(entry.url)
+                    done_ids.append(entry.id)
+                    stats["products_found"] += 1
+                    stats["not_modified"] = stats.get("not_modified", 0) + 1
+                else:
+                    fetched.append((entry.url, result))
+                    fetched_entries.append(entry)
+        finally:
+            # A failed batch must not leave fetches running against a closed client
+            for fetch in fetches:
+                fetch.cancel()
+
+        frontier.mark_fetched(self.db, done_ids)
+        frontier.mark_failed(self.db, failures)
+        record_archived_pages(self.db, archived)
+        if not_modified:
+            product_ids = [
+                product_id for (product_id,) in
+                self.db.query(Product.id).filter(Product.product_url.in_(not_modified))
+            ]
+            mark_seen(self.db, product_ids)
+        self.db.commit()
 
-            # Update product title if empty
-            if not product.title_raw:
-                product.title_raw = title_text
+        if not fetched:
+            return
 
+        try:
+            frontier.mark_fetched(self.db, [entry.id for entry in fetched_entries])
+            stats["snapshots_created"] += self._save_products(source, fetched)
+            stats["products_found"] += len(fetched)
+        except Exception as e:
+            self.db.rollback()
+            stats["errors"].extend(
+                f"Error processing {product_url}: {str(e)}" for product_url, _ in fetched
+            )
+            frontier.mark_failed(self.db, [(entry, f"Save failed: {str(e)}", True) for entry in fetched_entries])
             self.db.commit()
 
+    async def _fetch_listing(
+        self,
+        page_url: str,
+        client: httpx.AsyncClient,
+        source: Source
+    ) -> Tuple[List[str], Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Fetch and parse a listing page (network only, no database access).
+        
+        Returns:
+            (canonical product URLs, canonical next page URL or None, archived_pages row or None)
+        """
+        response = await client.get(page_url)
+        response.raise_for_status()
+        # Partial parse: only the elements the listing selectors can match
+        soup = parse_html(
+            response.text,
+            source.parser_backend,
+            only=[source.product_link_selector, source.pagination_next_selector]
+        )
+
+        page = None
+        if self.archive and not is_revalidated(response):
+            page = await archive_page(self.archive, source.id, page_url, response.content, kind="listing")
+
+        # Find product links
+        product_urls = []
+        if source.product_link_selector:
+            for link in soup.select(source.product_link_selector):
+                href = link.get('href', '')
+                if not href:
+                    continue
+                product_url = normalize_product_url(urljoin(page_url, href))
+                if product_url.startswith(('http://', 'https://')):
+                    product_urls.append(product_url)
+
+        # Find next page
+        next_url = None
+        if source.pagination_next_selector:
+            next_link = soup.select_one(source.pagination_next_selector)
+            if next_link and next_link.get('href', ''):
+                next_url = frontier.canonicalize_url(next_link.get('href'), base=page_url)
+
+        return product_urls, next_url, page
+
+    async def _fetch_product(
+        self,
+        product_url: str,
+        client: httpx.AsyncClient,
+        skip_unchanged: bool = False,
+        source_id: Optional[int] = None,
+        parser_backend: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and parse a product page (network only, no database access).
+        
+        Args:
+            product_url: URL of the product
+            client: HTTP client
+            skip_unchanged: Return None instead of parsing when the HTTP cache
+                revalidated the page (304 Not Modified)
+            source_id: Source the page belongs to (enables the HTML archive)
+            parser_backend: HTML parser backend of the source
+        
+        Returns:
+            Dict of extracted fields (see extract_product_details) and the
+            archived_pages row (if archived), or None for a skipped page
+        """
+        try:
+            response = await client.get(product_url)
+            response.raise_for_status()
+            if skip_unchanged and is_revalidated(response):
+                return None
+
+            details = extract_product_details(response.text, parser_backend)
+            details["images"] = [urljoin(product_url, src) for src in details["images"]]
+
+            # Keep the raw page for offline re-parsing
+            if self.archive and source_id and not is_revalidated(response):
+                details["archived"] = await archive_page(self.archive, source_id, product_url, response.content)
+
         except Exception as e:
             print(f"Error fetching product details from {product_url}: {e}")
             raise
 
-    def _parse_price(self, price_text: str) -> Optional[int]:
+        return details
+
+    def _insert_missing_products(self, source: Source, product_urls: List[str]) -> List[int]:
+        """
+        INSERT ... ON CONFLICT (product_url) DO NOTHING RETURNING id.
+        
+        Returns:
+            IDs of the products that were actually created
         """
-        Parse price text to cents.
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            # Other dialects: plain insert of the URLs not yet stored
+            existing = {
+                url for (url,) in self.db.query(Product.product_url).filter(
+                    Product.product_url.in_(product_urls)
+                )
+            }
+            new_rows = [
+                Product(source_id=source.id, product_url=url, title_raw="", created_at=datetime.utcnow())
+                for url in product_urls if url not in existing
+            ]
+            self.db.add_all(new_rows)
+            self.db.flush()
+            return [product.id for product in new_rows]
+
+        now = datetime.utcnow()
+        statement = dialect_insert(Product).values([
+            {
+                "source_id": source.id,
+                "product_url": url,
+                "title_raw": "",  # Filled from the first snapshot below
+                "created_at": now,
+            }
+            for url in product_urls
+        ]).on_conflict_do_nothing(index_elements=["product_url"]).returning(Product.id)
+
+        return [product_id for (product_id,) in self.db.execute(statement)]
+
+    def _save_products(self, source: Source, fetched: List[tuple]) -> int:
+        """
+        Upsert a page of fetched products and record their snapshots.
+        
+        One insert for missing products, one query mapping URLs to IDs, bulk
+        snapshot writes (change-only unless SCRAPER_SNAPSHOT_MODE is
+        "append"), bulk product updates and image rows, and a single commit.
         
         Args:
-            price_text: Price string like "$25.99" or "25,99 €"
+            source: Source object
+            fetched: (product_url, details) pairs from _fetch_product or the
+                JSON catalog (see extract_product_details; catalogs add data_raw)
             
         Returns:
-            Price in cents, or None if parse fails
+            Number of new snapshot rows
         """
-        if not price_text:
-            return None
+        # Same URL listed twice on a page: keep the last fetch
+        details_by_url = {normalize_product_url(url): details for url, details in fetched}
+        product_urls = list(details_by_url)
+
+        created_ids = set(self._insert_missing_products(source, product_urls))
+
+        products = self.db.query(Product.id, Product.product_url, Product.title_raw, Product.external_sku).filter(
+            Product.product_url.in_(product_urls)
+        ).all()
+
+        snapshots = []
+        product_updates = []
+        images = []
+        for product_id, product_url, title_raw, external_sku in products:
+            details = details_by_url[product_url]
+            snapshots.append({
+                "product_id": product_id,
+                "price_cents": details["price_cents"],
+                "currency": details.get("currency", "USD"),
+                "in_stock": details.get("in_stock"),  # None when the page does not say
+                "title_raw": details["title_raw"],
+                "availability_raw": details.get("availability_raw"),
+                "normalized": details.get("normalized"),
+            })
+
+            # Update product title if empty; structured data also carries SKU (and catalogs a raw record)
+            changes = {}
+            if not title_raw and details["title_raw"]:
+                changes["title_raw"] = details["title_raw"]
+            if details.get("external_sku") and details["external_sku"] != external_sku:
+                changes["external_sku"] = details["external_sku"]
+            if product_id in created_ids and details.get("data_raw"):
+                changes["data_raw"] = details["data_raw"]
+            if changes:
+                product_updates.append({"id": product_id, **changes})
+
+            if product_id in created_ids:
+                images.extend({"product_id": product_id, "src_url": src} for src in details.get("images", ()))
+
+        record_archived_pages(self.db, [details["archived"] for _, details in fetched if details.get("archived")])
+
+        written = record_snapshots(
+            self.db, snapshots, change_only=settings.SCRAPER_SNAPSHOT_MODE != "append"
+        )
+        # One bulk UPDATE by primary key per set of changed columns
+        for keys in {tuple(sorted(changes)) for changes in product_updates}:
+            self.db.execute(update(Product), [
+                changes for changes in product_updates if tuple(sorted(changes)) == keys
+            ])
+        if images:
+            self.db.execute(insert(ProductImage), images)
 
-        # Remove currency symbols and extract numbers
-        price_text = re.sub(r'[^\d.,]', '', price_text)
-        price_text = price_text.replace(',', '.')
+        self.db.commit()
+        return written["created"]
 
-        try:
-            price_float = float(price_text)
-            return int(price_float * 100)  # Convert to cents
-        except (ValueError, TypeError):
-            return None
+    def _parse_price(self, price_text: str) -> Optional[int]:
+        """Parse price text to cents (see app.services.extract.parse_price)."""
+        return parse_price(price_text)
 
     def create_wine_from_product(self, product: Product) -> Optional[ScrapedWine]:
         """
@@ -233,7 +625,95 @@ class WineScraperService:
         
         # Link product to wine
         product.wine_id = wine.id
+        index_new_wines(self.db, ScrapedWine, [wine])
         self.db.commit()
         
         return wine
 
+
+    async def parse_products(
+        self,
+        source_id: Optional[int] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Parse products without a wine into ScrapedWine entries (AI title parsing).
+        
+        Commits every 10 wines so progress survives a crash; wines are scored
+        against their dedupe block on each commit.
+        
+        Args:
+            source_id: Only this source's products (all sources if None)
+            stats: Dict to collect statistics in (updated live, for job progress)
+            
+        Returns:
+            Dict with statistics: products_total, products_processed, wines_created, errors
+        """
+        from app.services.wine_parser import parse_wine_name
+
+        stats = stats if stats is not None else {}
+        stats.update({"products_total": 0, "products_processed": 0, "wines_created": 0, "errors": []})
+
+        # Query products that don't have associated scraped wines yet
+        query = self.db.query(Product).filter(
+            Product.wine_id.is_(None),  # No wine associated yet
+            Product.title_raw.isnot(None),
+            Product.title_raw != '',
+            # Filter out junk collection pages
+            Product.title_raw.notin_(JUNK_PRODUCT_TITLES)
+        )
+
+        if source_id:
+            query = query.filter(Product.source_id == source_id)
+
+        # Get products with valid wine titles, each with its latest snapshot (one query)
+        rows = with_latest_snapshot(query).all()
+        stats["products_total"] = len(rows)
+        unindexed = []  # New wines not yet scored against their dedupe block
+
+        for product, snapshot in rows:
+            try:
+                # Product.title_raw is only set from the first scrape; prefer the current title
+                title = (snapshot.title_raw if snapshot else None) or product.title_raw
+
+                # Parse wine name with AI
+                parsed = await parse_wine_name(title)
+
+                # Create ScrapedWine entry
+                wine = ScrapedWine(
+                    producer=parsed.get("producer"),
+                    cuvee=parsed.get("cuvee") or parsed.get("producer"),  # Fallback to producer if no cuvee
+                    vintage=str(parsed.get("vintage")) if parsed.get("vintage") else "NV",
+                    region=parsed.get("region"),
+                    appellation=parsed.get("appellation"),
+                    volume_ml=parsed.get("bottle_size_ml", 750),
+                    style=parsed.get("style"),
+                    created_at=datetime.utcnow()
+                )
+
+                self.db.add(wine)
+                self.db.flush()
+
+                # Link product to wine
+                product.wine_id = wine.id
+                unindexed.append(wine)
+
+                stats["wines_created"] += 1
+                stats["products_processed"] += 1
+
+                # Commit every 10 wines to avoid losing progress
+                if stats["wines_created"] % 10 == 0:
+                    index_new_wines(self.db, ScrapedWine, unindexed)
+                    unindexed = []
+                    self.db.commit()
+
+            except Exception as e:
+                stats["errors"].append(f"Product {product.id}: {str(e)}")
+                stats["products_processed"] += 1
+                continue
+
+        # Final commit
+        index_new_wines(self.db, ScrapedWine, unindexed)
+        self.db.commit()
+
+        return stats
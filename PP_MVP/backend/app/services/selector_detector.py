@@ -5,13 +5,19 @@ Uses OpenAI GPT-4 to analyze HTML and suggest optimal CSS selectors.
 """
 
 import httpx
-from bs4 import BeautifulSoup
 from openai import AsyncOpenAI
 from typing import Dict, Any
 import os
 import re
 
 from app.schemas.scraper import DetectSelectorsResponse
+from app.services.catalog_api import detect_platform
+from app.services.html_parser import make_soup
+from app.services.rate_limit import make_rate_limited_transport
+
+
+# Platforms whose JSON catalog the scraper can read instead of HTML
+CATALOG_STRATEGY_BY_PLATFORM = {"Shopify": "shopify", "WooCommerce": "woocommerce"}
 
 
 class SelectorDetectorService:
@@ -50,13 +56,16 @@ class SelectorDetectorService:
             product_link_selector=suggestions.get("product_selector"),
             pagination_next_selector=suggestions.get("pagination_selector"),
             requires_playwright=suggestions.get("requires_playwright", False),
+            suggested_strategy=CATALOG_STRATEGY_BY_PLATFORM.get(snippets['framework']),
             confidence=suggestions.get("confidence", "medium"),
             notes=suggestions.get("notes")
         )
     
     async def _fetch_html(self, url: str) -> str:
         """Fetch HTML from URL."""
-        async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
+        async with httpx.AsyncClient(
+            follow_redirects=True, timeout=15.0, transport=make_rate_limited_transport()
+        ) as client:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             }
@@ -66,7 +75,7 @@ class SelectorDetectorService:
     
     def _extract_key_snippets(self, html: str) -> Dict[str, str]:
         """Extract relevant HTML snippets for analysis."""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         snippets = {}
         
@@ -95,13 +104,7 @@ class SelectorDetectorService:
         snippets['pagination_examples'] = pagination_candidates[:3]
         
         # Detect common frameworks
-        html_lower = html.lower()
-        snippets['framework'] = (
-            'Shopify' if 'shopify' in html_lower else
-            'WooCommerce' if 'woocommerce' in html_lower else
-            'Magento' if 'magento' in html_lower else
-            'Custom'
-        )
+        snippets['framework'] = detect_platform(html)
         
         return snippets
     
@@ -0,0 +1,231 @@
+"""
+"Find similar wines" lookup.
+
+Returns the top-k wines most similar to a (producer, cuvee, vintage) query
+without a block scan:
+
+- PostgreSQL: the pg_trgm `%` operator over GIN trigram indexes on
+  norm_producer / norm_cuvee (migration 010) pulls a small candidate pool.
+- Other databases (SQLite in tests): an in-memory trigram index, built on first
+  use and rebuilt when the table changes.
+
+Candidates are rescored with calculate_similarity() so scores are on the same
+0-100 scale as the duplicate candidates.
+"""
+
+from collections import Counter
+from typing import List, Dict, Optional, Set, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.services.dedupe import (
+    normalize_text,
+    calculate_similarity,
+    cuvee_column,
+)
+
+
+# Default minimum score (0-100) for a wine to be returned
+DEFAULT_MIN_SCORE = 60.0
+
+# Candidates fetched per requested result before rescoring
+CANDIDATE_POOL_FACTOR = 10
+MIN_CANDIDATE_POOL = 50
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Trigrams of each word, padded like pg_trgm ("  word ").
+
+    Examples:
+        >>> sorted(trigrams("clos"))
+        ['  c', ' cl', 'clo', 'los', 'os ']
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NGramIndex:
+    """In-memory inverted trigram index over wine dicts."""
+
+    def __init__(self):
+        self.wines: List[Dict] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.sizes: List[int] = []
+
+    def add(self, wine: Dict) -> None:
+        position = len(self.wines)
+        grams = trigrams(f"{wine.get('norm_producer') or ''} {wine.get('norm_cuvee') or ''}")
+        self.wines.append(wine)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(position)
+
+    def search(self, text: str, vintage: Optional[str] = None, limit: int = MIN_CANDIDATE_POOL) -> List[Dict]:
+        """Wines sharing the most trigrams with text (Jaccard), best first."""
+        grams = trigrams(text)
+        if not grams:
+            return []
+
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self.postings.get(gram, ()))
+
+        ranked = sorted(
+            (
+                (shared / (len(grams) + self.sizes[position] - shared), position)
+                for position, shared in overlap.items()
+                if vintage is None or self.wines[position].get("vintage") == vintage
+            ),
+            key=lambda item: (-item[0], item[1])
+        )
+        return [self.wines[position] for _, position in ranked[:limit]]
+
+
+# (bind URL, table name) -> (table signature, index)
+_INDEXES: Dict[Tuple[str, str], Tuple[Tuple, NGramIndex]] = {}
+
+
+def _table_signature(db: Session, model_class) -> Tuple:
+    """Cheap change detector: active count, max ID, last update."""
+    return tuple(db.query(
+        func.count(model_class.id),
+        func.max(model_class.id),
+        func.max(model_class.updated_at),
+    ).filter(model_class.is_active == True).one())
+
+
+def _wine_dicts(rows) -> List[Dict]:
+    return [
+        {
+            "id": wine_id,
+            "producer": producer,
+            "cuvee": cuvee,
+            "vintage": vintage,
+            "norm_producer": norm_producer,
+            "norm_cuvee": norm_cuvee,
+        }
+        for wine_id, producer, cuvee, vintage, norm_producer, norm_cuvee in rows
+    ]
+
+
+def _base_query(db: Session, model_class):
+    return db.query(
+        model_class.id,
+        model_class.producer,
+        cuvee_column(model_class),
+        model_class.vintage,
+        model_class.norm_producer,
+        model_class.norm_cuvee,
+    ).filter(model_class.is_active == True)
+
+
+def get_ngram_index(db: Session, model_class) -> NGramIndex:
+    """In-memory index for a table, rebuilt when its signature changes."""
+    key = (str(db.get_bind().url), model_class.__tablename__)
+    signature = _table_signature(db, model_class)
+
+    cached = _INDEXES.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    index = NGramIndex()
+    for wine in _wine_dicts(_base_query(db, model_class).order_by(model_class.id).yield_per(2000)):
+        index.add(wine)
+
+    _INDEXES[key] = (signature, index)
+    return index
+
+
+def _trigram_candidates(
+    db: Session,
+    model_class,
+    norm_producer: str,
+    norm_cuvee: str,
+    vintage: Optional[str],
+    pool: int
+) -> List[Dict]:
+    """Candidate pool from the pg_trgm GIN indexes."""
+    conditions = []
+    ranks = []
+    if norm_producer:
+        conditions.append(model_class.norm_producer.op("%")(norm_producer))
+        ranks.append(func.similarity(model_class.norm_producer, norm_producer))
+    if norm_cuvee:
+        conditions.append(model_class.norm_cuvee.op("%")(norm_cuvee))
+        ranks.append(func.similarity(model_class.norm_cuvee, norm_cuvee))
+
+    query = _base_query(db, model_class).filter(or_(*conditions))
+    if vintage:
+        query = query.filter(model_class.vintage == vintage)
+
+    rank = ranks[0] if len(ranks) == 1 else func.greatest(*ranks)
+    return _wine_dicts(query.order_by(rank.desc()).limit(pool).all())
+
+
+def find_similar_wines(
+    db: Session,
+    model_class,
+    producer: Optional[str] = None,
+    cuvee: Optional[str] = None,
+    vintage: Optional[str] = None,
+    limit: int = 10,
+    min_score: float = DEFAULT_MIN_SCORE
+) -> List[Dict]:
+    """
+    Find the wines most similar to a producer/cuvee/vintage query.
+
+    Args:
+        db: Database session
+        model_class: SQLAlchemy model class (Wine or ScrapedWine)
+        producer: Producer name (raw, normalized here)
+        cuvee: Cuvee/wine name; a full label works too when producer is unknown
+        vintage: Only match this vintage when given
+        limit: Maximum number of results
+        min_score: Minimum similarity score (0-100)
+
+    Returns:
+        List of dicts (id, producer, cuvee, vintage, score), highest score first
+    """
+    query_wine = {
+        "norm_producer": normalize_text(producer),
+        "norm_cuvee": normalize_text(cuvee),
+        "vintage": vintage,
+    }
+    full_text = f"{query_wine['norm_producer']} {query_wine['norm_cuvee']}".strip()
+    if not full_text:
+        return []
+
+    pool = max(limit * CANDIDATE_POOL_FACTOR, MIN_CANDIDATE_POOL)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Without a producer the label may hold it, so search both columns with it
+        candidates = _trigram_candidates(
+            db,
+            model_class,
+            query_wine["norm_producer"] or full_text,
+            query_wine["norm_cuvee"] or full_text,
+            vintage,
+            pool
+        )
+    else:
+        candidates = get_ngram_index(db, model_class).search(full_text, vintage, pool)
+
+    results = []
+    for wine in candidates:
+        score = calculate_similarity(query_wine, wine)
+        if score >= min_score:
+            results.append({
+                "id": wine["id"],
+                "producer": wine["producer"],
+                "cuvee": wine["cuvee"],
+                "vintage": wine["vintage"],
+                "score": round(score, 2),
+            })
+
+    results.sort(key=lambda result: (-result["score"], result["id"]))
+    return results[:limit]
+
@@ -0,0 +1,232 @@
+"""
+Sitemap-driven product discovery.
+
+For sources with the "sitemap" strategy the scraper skips listing pages and
+pagination: product URLs come from the store's sitemaps, so product fetches
+can fan out immediately.
+
+- Sitemaps are the `Sitemap:` lines of robots.txt, else /sitemap.xml.
+- Sitemap indexes are followed; child sitemaps whose lastmod is older than
+  the source's last run are skipped.
+- Bodies are streamed through an incremental XML parser (gzip handled), so a
+  50,000-URL sitemap is never held in memory as a tree. Sitemap requests
+  bypass the HTTP cache, which would otherwise read the whole body.
+- URLs are filtered with the source's sitemap_url_pattern (a regex).
+
+plan_sitemap_fetches() orders the result: URLs changed since the last run
+(newest lastmod first), then new URLs, then undated known URLs least
+recently fetched first; URLs of known products whose lastmod predates the
+last run are skipped.
+"""
+
+import re
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import httpx
+
+from app.services.http_cache import NO_CACHE_EXTENSION
+
+
+# Sitemap files read per discovery run (indexes included)
+MAX_SITEMAPS = 500
+
+# Nesting followed below a sitemap index
+MAX_INDEX_DEPTH = 3
+
+# Product URLs handed to the fetcher at a time in sitemap mode
+SITEMAP_BATCH_SIZE = 100
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    W3C datetime from a sitemap as naive UTC (None if missing or invalid).
+
+    Examples:
+        >>> parse_lastmod("2024-05-01T10:30:00+02:00")
+        datetime.datetime(2024, 5, 1, 8, 30)
+        >>> parse_lastmod("2024-05-01")
+        datetime.datetime(2024, 5, 1, 0, 0)
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+async def robots_sitemaps(client: httpx.AsyncClient, base_url: str) -> List[str]:
+    """Sitemap URLs listed in robots.txt, else the conventional /sitemap.xml."""
+    parsed = urlparse(base_url)
+    root = f"{parsed.scheme}://{parsed.netloc}"
+
+    sitemaps = []
+    try:
+        response = await client.get(f"{root}/robots.txt")
+        if response.status_code == 200:
+            for line in response.text.splitlines():
+                key, _, value = line.partition(":")
+                if key.strip().lower() == "sitemap" and value.strip():
+                    sitemaps.append(urljoin(root, value.strip()))
+    except httpx.HTTPError:
+        pass
+
+    return sitemaps or [f"{root}/sitemap.xml"]
+
+
+async def iter_sitemap(client: httpx.AsyncClient, url: str) -> AsyncIterator[Tuple[str, Optional[datetime], bool]]:
+    """
+    Stream one sitemap file.
+
+    Yields:
+        (loc, lastmod, is_sitemap) per <url> or <sitemap> entry, as parsed
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    decompressor = None
+    first_chunk = True
+
+    async with client.stream("GET", url, extensions={NO_CACHE_EXTENSION: True}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if first_chunk:
+                # .xml.gz files are served as gzip bodies, not Content-Encoding
+                if chunk[:2] == b"\x1f\x8b":
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                first_chunk = False
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            parser.feed(chunk)
+
+            for event, elem in parser.read_events():
+                if event == "start":
+                    root = elem if root is None else root
+                    continue
+
+                name = _local_name(elem.tag)
+                if name not in ("url", "sitemap"):
+                    continue
+
+                loc = lastmod = None
+                for child in elem:
+                    child_name = _local_name(child.tag)
+                    if child_name == "loc":
+                        loc = (child.text or "").strip()
+                    elif child_name == "lastmod":
+                        lastmod = parse_lastmod(child.text)
+                if loc:
+                    yield loc, lastmod, name == "sitemap"
+
+                # Drop parsed entries so memory stays flat on large files
+                root.clear()
+
+    try:
+        parser.close()
+    except ParseError:
+        pass
+
+
+async def discover_urls(
+    client: httpx.AsyncClient,
+    base_url: str,
+    pattern: Optional[str] = None,
+    since: Optional[datetime] = None,
+    stats: Optional[Dict] = None
+) -> Dict[str, Optional[datetime]]:
+    """
+    Product URLs from a site's sitemaps.
+
+    Args:
+        client: HTTP client
+        base_url: Any URL of the site (robots.txt is read from its root)
+        pattern: Regex a URL must match to count as a product (all URLs if None)
+        since: Skip child sitemaps last modified before this (naive UTC)
+        stats: Optional dict updated with sitemaps / urls / matched counts
+
+    Returns:
+        Dict of product URL -> lastmod (None when the sitemap has none)
+    """
+    matcher = re.compile(pattern) if pattern else None
+    stats = stats if stats is not None else {}
+    stats.update({"sitemaps": 0, "urls": 0, "matched": 0, "errors": []})
+
+    queue = [(url, 0) for url in await robots_sitemaps(client, base_url)]
+    seen: Set[str] = set()
+    found: Dict[str, Optional[datetime]] = {}
+
+    while queue and stats["sitemaps"] < MAX_SITEMAPS:
+        sitemap_url, depth = queue.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        stats["sitemaps"] += 1
+
+        try:
+            async for loc, lastmod, is_sitemap in iter_sitemap(client, sitemap_url):
+                if is_sitemap:
+                    unchanged = since and lastmod and lastmod < since
+                    if depth < MAX_INDEX_DEPTH and not unchanged:
+                        queue.append((urljoin(sitemap_url, loc), depth + 1))
+                    continue
+
+                stats["urls"] += 1
+                if matcher and not matcher.search(loc):
+                    continue
+                stats["matched"] += 1
+                found[loc] = lastmod
+        except (httpx.HTTPError, ParseError, zlib.error) as e:
+            stats["errors"].append(f"Error reading sitemap {sitemap_url}: {str(e)}")
+
+    return found
+
+
+def plan_sitemap_fetches(
+    entries: Dict[str, Optional[datetime]],
+    known: Dict[str, Optional[datetime]],
+    since: Optional[datetime] = None
+) -> Tuple[List[str], int]:
+    """
+    Order discovered URLs for fetching.
+
+    Changed URLs (lastmod after `since`) come first, newest first, then URLs
+    not stored yet, then known URLs that cannot be skipped (no lastmod, or no
+    previous run), least recently fetched first. Callers fetch a prefix of
+    the list, so undated sitemaps still reach new products and rotate
+    through the known ones. Known URLs whose lastmod is not after `since`
+    are left out.
+
+    Args:
+        entries: Discovered URL -> sitemap lastmod (None if undated)
+        known: Stored product URL -> when it was last fetched (None if never)
+        since: Previous run of the source
+
+    Returns:
+        (urls to fetch, number of unchanged URLs skipped)
+    """
+    changed, new, stale = [], [], []
+    skipped = 0
+
+    for url, lastmod in entries.items():
+        if since is not None and lastmod is not None and lastmod > since:
+            changed.append((lastmod, url))
+        elif url not in known:
+            new.append(url)
+        elif since is None or lastmod is None:
+            stale.append((known[url] or datetime.min, url))
+        else:
+            skipped += 1
+
+    changed.sort(key=lambda item: item[0], reverse=True)
+    stale.sort(key=lambda item: item[0])
+    return [url for _, url in changed] + new + [url for _, url in stale], skipped
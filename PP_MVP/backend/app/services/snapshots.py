@@ -0,0 +1,228 @@
+"""
+Change-only product snapshot storage.
+
+A scrape only adds a ProductSnapshot row when price_cents, in_stock or
+title_raw differ from the product's latest snapshot; otherwise the latest
+row's last_seen_at is moved forward. Each row therefore covers the range
+fetched_at .. last_seen_at during which the product looked the same.
+
+- latest_snapshots() / with_latest_snapshot() read each product's latest
+  snapshot (highest id) in one query, via ix_product_snapshots_latest.
+- record_snapshots() is the writer used by the scraper (bulk, no commit).
+- mark_seen() extends the latest snapshot of products whose page was not
+  modified (HTTP 304), so last_seen_at keeps advancing without a download.
+- compact_snapshots() collapses runs of identical rows written before
+  change-only mode (or with SCRAPER_SNAPSHOT_MODE=append).
+- price_history() returns a product's series with each run expanded to its
+  first and last observation, so the step function matches the full
+  per-scrape history.
+"""
+
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Tuple
+from sqlalchemy import func, insert, update, delete, select
+from sqlalchemy.orm import Session, Query, aliased
+
+from app.models.scraper import Product, ProductSnapshot
+
+
+# Snapshot fields compared to decide whether a product changed
+CHANGE_FIELDS = ("price_cents", "in_stock", "title_raw")
+
+# Products handled per compaction batch (one commit each)
+COMPACT_BATCH_PRODUCTS = 500
+
+
+def _change_key(row) -> Tuple:
+    if isinstance(row, dict):
+        return tuple(row.get(field) for field in CHANGE_FIELDS)
+    return tuple(getattr(row, field) for field in CHANGE_FIELDS)
+
+
+def latest_snapshots(db: Session, product_ids: Iterable[int]) -> Dict[int, ProductSnapshot]:
+    """Latest snapshot per product (highest id) for many products in one query."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+
+    latest_ids = db.query(func.max(ProductSnapshot.id)).filter(
+        ProductSnapshot.product_id.in_(product_ids)
+    ).group_by(ProductSnapshot.product_id)
+
+    return {
+        snapshot.product_id: snapshot
+        for snapshot in db.query(ProductSnapshot).filter(ProductSnapshot.id.in_(latest_ids.scalar_subquery()))
+    }
+
+
+def with_latest_snapshot(query: Query, *columns) -> Query:
+    """
+    Join a Product query with each product's latest snapshot.
+
+    The snapshot is outer-joined on a correlated max(id) per product, so
+    filters, ordering and paging on the products still apply first and each
+    row costs one probe of ix_product_snapshots_latest.
+
+    Args:
+        query: A query over Product (filtered/ordered as needed)
+        columns: Snapshot columns/expressions to add instead of the entity
+
+    Returns:
+        Query yielding the query's row plus the ProductSnapshot (or the given
+        columns), None when the product has no snapshot
+    """
+    candidate = aliased(ProductSnapshot)
+    latest_id = select(func.max(candidate.id)).where(
+        candidate.product_id == Product.id
+    ).correlate(Product).scalar_subquery()
+
+    query = query.add_columns(*columns) if columns else query.add_entity(ProductSnapshot)
+    return query.outerjoin(ProductSnapshot, ProductSnapshot.id == latest_id)
+
+
+def record_snapshots(
+    db: Session,
+    rows: List[Dict],
+    change_only: bool = True,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Write a batch of snapshot rows (ProductSnapshot column dicts).
+
+    In change-only mode, rows identical to the product's latest snapshot only
+    extend that snapshot's last_seen_at. The caller commits.
+
+    Returns:
+        Dict with counts: created, unchanged
+    """
+    now = now or datetime.utcnow()
+    latest = latest_snapshots(db, [row["product_id"] for row in rows]) if change_only else {}
+
+    inserts = []
+    touched = []
+    for row in rows:
+        current = latest.get(row["product_id"])
+        if current is not None and _change_key(current) == _change_key(row):
+            touched.append({"id": current.id, "last_seen_at": now})
+        else:
+            inserts.append({"fetched_at": now, **row, "last_seen_at": now})
+
+    if inserts:
+        db.execute(insert(ProductSnapshot), inserts)
+    if touched:
+        db.execute(update(ProductSnapshot), touched)
+
+    return {"created": len(inserts), "unchanged": len(touched)}
+
+
+def mark_seen(db: Session, product_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+    """
+    Move the latest snapshot's last_seen_at forward for unchanged products.
+
+    Same effect as record_snapshots() with an identical row; the caller
+    commits. Products without a snapshot are skipped.
+
+    Returns:
+        Number of snapshots updated
+    """
+    now = now or datetime.utcnow()
+    touched = [{"id": snapshot.id, "last_seen_at": now} for snapshot in latest_snapshots(db, product_ids).values()]
+    if touched:
+        db.execute(update(ProductSnapshot), touched)
+    return len(touched)
+
+
+def compact_snapshots(
+    db: Session,
+    batch_products: int = COMPACT_BATCH_PRODUCTS,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Collapse consecutive identical snapshots of each product into one row.
+
+    The first row of each run is kept and its last_seen_at set to the last
+    observation of the run; the other rows are deleted. Pages through
+    products by ID and commits once per batch.
+
+    Returns:
+        Dict with counts: products, runs, deleted
+    """
+    last_product_id = 0
+    stats = {"products": 0, "runs": 0, "deleted": 0}
+
+    while True:
+        product_ids = [
+            product_id for (product_id,) in db.query(ProductSnapshot.product_id).filter(
+                ProductSnapshot.product_id > last_product_id
+            ).distinct().order_by(ProductSnapshot.product_id).limit(batch_products)
+        ]
+        if not product_ids:
+            break
+
+        snapshots = db.query(
+            ProductSnapshot.id,
+            ProductSnapshot.product_id,
+            ProductSnapshot.fetched_at,
+            ProductSnapshot.last_seen_at,
+            *[getattr(ProductSnapshot, field) for field in CHANGE_FIELDS]
+        ).filter(
+            ProductSnapshot.product_id.in_(product_ids)
+        ).order_by(ProductSnapshot.product_id, ProductSnapshot.fetched_at, ProductSnapshot.id).all()
+
+        updates = []
+        deletes = []
+        head = None
+        head_seen = None
+
+        def close_run():
+            if head is not None and head_seen != head.last_seen_at:
+                updates.append({"id": head.id, "last_seen_at": head_seen})
+
+        for snapshot in snapshots:
+            seen = snapshot.last_seen_at or snapshot.fetched_at
+            if head is not None and head.product_id == snapshot.product_id and _change_key(head) == _change_key(snapshot):
+                deletes.append(snapshot.id)
+                head_seen = max(filter(None, (head_seen, seen)), default=None)
+                continue
+
+            close_run()
+            head, head_seen = snapshot, seen
+            stats["runs"] += 1
+        close_run()
+
+        if not dry_run:
+            if updates:
+                db.execute(update(ProductSnapshot), updates)
+            if deletes:
+                db.execute(delete(ProductSnapshot.__table__).where(ProductSnapshot.id.in_(deletes)))
+            db.commit()
+
+        stats["products"] += len(product_ids)
+        stats["deleted"] += len(deletes)
+        last_product_id = product_ids[-1]
+
+        print(f"Compacted {stats['products']} products ({stats['deleted']} snapshots removed)...")
+
+    return stats
+
+
+def price_history(db: Session, product_id: int) -> List[Dict]:
+    """
+    Price/stock series for a product, oldest first.
+
+    Each stored run yields a point at fetched_at and, when it was seen again
+    later, a second point at last_seen_at.
+    """
+    points = []
+    for snapshot in db.query(ProductSnapshot).filter(
+        ProductSnapshot.product_id == product_id
+    ).order_by(ProductSnapshot.fetched_at, ProductSnapshot.id):
+        point = {
+            "price_cents": snapshot.price_cents,
+            "currency": snapshot.currency,
+            "in_stock": snapshot.in_stock,
+        }
+        points.append({"at": snapshot.fetched_at, **point})
+        if snapshot.last_seen_at and snapshot.last_seen_at > snapshot.fetched_at:
+            points.append({"at": snapshot.last_seen_at, **point})
+    return points
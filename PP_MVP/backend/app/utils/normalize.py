@@ -3,55 +3,164 @@ Wine name normalization utilities for fuzzy matching.
 
 This module provides functions to normalize wine names by removing diacritics,
 special characters, and extra whitespace to enable consistent fuzzy matching.
+It is the single normalizer used by dedupe, matching and imports.
+
+The hot path is one str.translate() over a precompiled table (lowercase Latin
+letters with diacritics -> ASCII, punctuation -> space, apostrophes dropped)
+followed by a split/join to collapse whitespace. Only text that is still
+non-ASCII afterwards goes through unicodedata.
+
+Repeated strings (producers, appellations) are served from a bounded LRU
+cache; see set_cache_size().
 """
 import re
 import unicodedata
+from functools import lru_cache
+from typing import Tuple
+
+
+# Version of normalize_name() output. Bump whenever results change: values
+# stored with an older version (norm_* columns, duplicate candidates) are then
+# treated as stale.
+NORMALIZER_VERSION = 2
+
+# Default number of distinct strings kept in the LRU cache (0 disables it)
+DEFAULT_CACHE_SIZE = 65536
+
+# Apostrophes are removed so "d'Arenberg" and "dArenberg" normalize the same
+_APOSTROPHES = "'`´‘’ʼ"
+
+# Letters that do not decompose under NFKD
+_SPECIAL_LETTERS = {
+    "ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d",
+    "ð": "d", "þ": "th", "ı": "i", "ħ": "h", "ŀ": "l",
+}
+
+# Leftover non-ASCII after the slow path
+_NON_ASCII_ALNUM = re.compile(r'[^a-z0-9\s]')
+
+
+def _strip_marks(text: str) -> str:
+    """Remove diacritics (decompose unicode, strip combining marks)."""
+    return ''.join(
+        char for char in unicodedata.normalize('NFKD', text)  # K: also folds fullwidth forms
+        if unicodedata.category(char) != 'Mn'  # Mn = Mark, Nonspacing
+    )
+
+
+def _build_table() -> dict:
+    """Translation table for the fast path (applied after lower())."""
+    table = {}
+
+    # ASCII punctuation and control characters -> space
+    for code in range(128):
+        char = chr(code)
+        if not char.isalnum():
+            table[code] = ' '
+
+    # Latin-1 Supplement, Latin Extended-A/B: fold diacritics to ASCII
+    for code in range(0x80, 0x250):
+        char = chr(code)
+        if char in _SPECIAL_LETTERS:
+            table[code] = _SPECIAL_LETTERS[char]
+            continue
+        folded = _strip_marks(char)
+        if folded.isascii() and folded.isalnum():
+            table[code] = folded.lower()
+        elif not char.isalnum():
+            table[code] = ' '  # Latin-1 punctuation (« », ¡, ¿, ·, NBSP)
+
+    # Common typographic punctuation
+    for char in "\u2010\u2011\u2012\u2013\u2014\u2015\u201c\u201d\u201e\u2026\u2022\u2009\u202f":
+        table[ord(char)] = ' '
+
+    for char in _APOSTROPHES:
+        table[ord(char)] = ''
+
+    return table
+
+
+_TRANSLATION_TABLE = _build_table()
+
+
+def _normalize(name: str) -> str:
+    """Uncached normalization of a non-empty string."""
+    normalized = name.lower().translate(_TRANSLATION_TABLE)
+
+    if not normalized.isascii():
+        # Rare: characters outside the table (other scripts, combining marks)
+        normalized = _strip_marks(normalized).translate(_TRANSLATION_TABLE)
+        normalized = _NON_ASCII_ALNUM.sub(' ', normalized)
 
+    # Collapse whitespace and strip
+    return ' '.join(normalized.split())
 
-def normalize_name(name: str | None) -> str:
+
+_cached_normalize = lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_normalize)
+
+
+def set_cache_size(maxsize: int) -> None:
+    """
+    Resize (and clear) the normalization cache.
+
+    Args:
+        maxsize: Maximum number of cached strings; 0 disables caching
+    """
+    global _cached_normalize
+    _cached_normalize = lru_cache(maxsize=maxsize)(_normalize) if maxsize else _normalize
+
+
+def cache_info():
+    """LRU cache statistics (hits, misses, maxsize, currsize), or None when disabled."""
+    return _cached_normalize.cache_info() if hasattr(_cached_normalize, "cache_info") else None
+
+
+def normalize_name(name: str | None, cache: bool = True) -> str:
     """
     Normalize a wine name for consistent fuzzy matching.
-    
+
     Steps:
     1. Handle None/empty strings
     2. Lowercase
-    3. Remove diacritics (é → e, ñ → n)
-    4. Remove special characters (quotes, punctuation except spaces)
+    3. Remove diacritics (é → e, ñ → n, ß → ss)
+    4. Drop apostrophes, turn other special characters into spaces
     5. Collapse multiple spaces
     6. Strip leading/trailing whitespace
-    
+
     Args:
         name: Wine name to normalize (can be None)
-        
+        cache: Use the LRU cache (turn off for one-shot bulk passes)
+
     Returns:
         Normalized lowercase string suitable for matching
-        
+
     Examples:
         >>> normalize_name("Gatinois \"Grand Cru\" Brut Réserve")
         'gatinois grand cru brut reserve'
         >>> normalize_name("  Raventós   i   Blanc  ")
         'raventos i blanc'
+        >>> normalize_name("Château d'Yquem, Sauternes")
+        'chateau dyquem sauternes'
+        >>> normalize_name("Weingut Müller-Catoir Grüner Veltliner")
+        'weingut muller catoir gruner veltliner'
         >>> normalize_name(None)
         ''
     """
     if not name:
         return ""
-    
-    # Lowercase
-    normalized = name.lower()
-    
-    # Remove diacritics (decompose unicode, strip combining marks)
-    normalized = unicodedata.normalize('NFD', normalized)
-    normalized = ''.join(
-        char for char in normalized
-        if unicodedata.category(char) != 'Mn'  # Mn = Mark, Nonspacing
-    )
-    
-    # Remove special characters (keep only alphanumeric and spaces)
-    normalized = re.sub(r'[^a-z0-9\s]', ' ', normalized)
-    
-    # Collapse multiple spaces and strip
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
-    
-    return normalized
 
+    return _cached_normalize(name) if cache else _normalize(name)
+
+
+def normalize_versioned(name: str | None) -> Tuple[int, str]:
+    """
+    Normalize and tag the result with NORMALIZER_VERSION.
+
+    Store the version next to the normalized value so it can be detected as
+    stale after the rules change.
+
+    Examples:
+        >>> normalize_versioned("Clos Rougeard")
+        (2, 'clos rougeard')
+    """
+    return NORMALIZER_VERSION, normalize_name(name)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Background job worker.
+
+Claims scrape, parse and image jobs queued by the API (jobs table, see
+app/services/job_queue.py) and runs them, one at a time per process. Run as
+many workers as needed; they coordinate through SELECT ... FOR UPDATE SKIP
+LOCKED and leases renewed by heartbeats, so a job whose worker dies is picked
+up again by another one.
+
+Usage:
+  python -m app.worker
+
+  # Only scrape jobs, with a fixed worker name
+  python -m app.worker --kinds scrape --worker-id scraper-1
+
+  # Run at most one job, then exit
+  python -m app.worker --once
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Optional
+
+import app.db.base  # noqa: F401 - loads all models first (avoids circular import)
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import job_queue
+from app.services.image_pipeline import ingest_images
+from app.services.scraper_service import WineScraperService, DEFAULT_CONCURRENCY
+
+
+# Errors kept in a job's progress/result (the full count is kept as error_count)
+MAX_STORED_ERRORS = 20
+
+
+async def run_scrape(db, params: Dict[str, Any], stats: Dict[str, Any]):
+    return await WineScraperService(db).scrape_source(
+        params["source_id"],
+        params.get("max_pages", 5),
+        concurrency=params.get("concurrency", DEFAULT_CONCURRENCY),
+        stats=stats
+    )
+
+
+async def run_parse(db, params: Dict[str, Any], stats: Dict[str, Any]):
+    return await WineScraperService(db).parse_products(params.get("source_id"), stats=stats)
+
+
+async def run_images(db, params: Dict[str, Any], stats: Dict[str, Any]):
+    return await ingest_images(db, params.get("source_id"), params.get("limit", 1000), stats=stats)
+
+
+JOB_HANDLERS = {
+    "scrape": run_scrape,
+    "parse": run_parse,
+    "images": run_images,
+}
+
+
+def _progress(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe snapshot of a job's live stats (errors truncated)."""
+    progress = {key: value for key, value in stats.items() if key != "errors"}
+    errors = stats.get("errors") or []
+    progress["error_count"] = len(errors)
+    progress["errors"] = list(errors[:MAX_STORED_ERRORS])
+    return progress
+
+
+async def _heartbeat_loop(job_id: str, worker_id: str, stats: Dict[str, Any]) -> None:
+    """Renew the lease and publish progress until the lease is lost."""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        db = SessionLocal()
+        try:
+            held = job_queue.heartbeat(db, job_id, worker_id, settings.JOB_LEASE_SECONDS, _progress(stats))
+        finally:
+            db.close()
+        if not held:
+            return
+
+
+async def run_job(job_id: str, kind: str, params: Dict[str, Any], worker_id: str) -> str:
+    """
+    Run a claimed job to completion and record the outcome.
+
+    The work runs on its own session; job bookkeeping uses short-lived
+    sessions. If the lease is lost (the job was reclaimed), the work is
+    cancelled and nothing is recorded.
+
+    Returns:
+        Final status: "completed", "failed" or "lost"
+    """
+    stats: Dict[str, Any] = {}
+    db = SessionLocal()
+    work = asyncio.ensure_future(JOB_HANDLERS[kind](db, params, stats))
+    lease = asyncio.ensure_future(_heartbeat_loop(job_id, worker_id, stats))
+    error: Optional[str] = None
+
+    try:
+        await asyncio.wait({work, lease}, return_when=asyncio.FIRST_COMPLETED)
+        if not work.done():
+            work.cancel()
+            return "lost"
+        try:
+            work.result()
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+    finally:
+        lease.cancel()
+        db.close()
+
+    bookkeeping = SessionLocal()
+    try:
+        if error:
+            job_queue.fail_job(bookkeeping, job_id, worker_id, error, _progress(stats))
+            return "failed"
+        summary = "; ".join(stats["errors"][:5]) if stats.get("errors") else None  # First 5 errors
+        job_queue.complete_job(bookkeeping, job_id, worker_id, _progress(stats), summary)
+        return "completed"
+    finally:
+        bookkeeping.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run background scrape/parse/image jobs')
+    parser.add_argument('--kinds', type=str, default=None,
+                        help=f'Comma-separated job kinds to run (default: all of {", ".join(job_queue.JOB_KINDS)})')
+    parser.add_argument('--worker-id', type=str, default=f"{socket.gethostname()}:{os.getpid()}",
+                        help='Name recorded on claimed jobs (default: host:pid)')
+    parser.add_argument('--once', action='store_true',
+                        help='Run at most one job, then exit')
+
+    args = parser.parse_args()
+    kinds = [kind.strip() for kind in args.kinds.split(",")] if args.kinds else None
+
+    stopping = []
+
+    def request_stop(signum, frame):
+        print(f"🛑 Signal {signum}: finishing the current job, then exiting")
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    print(f"👷 Worker {args.worker_id} polling for {', '.join(kinds or job_queue.JOB_KINDS)} jobs")
+
+    while not stopping:
+        db = SessionLocal()
+        try:
+            reaped = job_queue.reap_expired_jobs(db)
+            if reaped:
+                print(f"⚠️  Failed {reaped} jobs whose workers were lost too many times")
+            job = job_queue.claim_job(db, args.worker_id, settings.JOB_LEASE_SECONDS, kinds)
+            claimed = (job.id, job.kind, dict(job.params or {}), job.attempts) if job else None
+        finally:
+            db.close()
+
+        if claimed is None:
+            if args.once:
+                break
+            time.sleep(settings.JOB_POLL_SECONDS)
+            continue
+
+        job_id, kind, params, attempt = claimed
+        print(f"▶️  {kind} job {job_id} (attempt {attempt}): {params}")
+        started = time.perf_counter()
+        outcome = asyncio.run(run_job(job_id, kind, params, args.worker_id))
+        icon = {"completed": "✅", "failed": "❌"}.get(outcome, "⚠️ ")
+        print(f"{icon} {kind} job {job_id} {outcome} in {time.perf_counter() - started:.1f}s")
+
+        if args.once:
+            break
+
+
+if __name__ == "__main__":
+    main()